@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark and load-test tooling for the J Signup Validation module.
+These scripts are developer tools and are not part of the Odoo addon.
+"""
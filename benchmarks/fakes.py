@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+"""
+Local Network Stand-ins
+Fake DNS, TempMailDetector and SMTP servers with configurable latency and
+failure injection, so benchmarks never depend on the real internet.
+"""
+
+import json
+import logging
+import random
+import socket
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import dns.flags
+import dns.message
+import dns.rcode
+import dns.rdataclass
+import dns.rdatatype
+import dns.rrset
+
+_logger = logging.getLogger(__name__)
+
+
+class FaultProfile:
+    """
+    Latency and failure injection settings shared by the fake servers.
+
+    Args:
+        latency_ms (float): Base latency added to every answer
+        jitter_ms (float): Random extra latency in [0, jitter_ms]
+        failure_rate (float): Probability [0-1] of answering with an error
+        timeout_rate (float): Probability [0-1] of never answering
+        seed (int): Seed for reproducible fault sequences
+    """
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, failure_rate=0.0, timeout_rate=0.0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.timeout_rate = timeout_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self):
+        """Sleep for the configured latency plus jitter."""
+        with self._lock:
+            jitter = self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0
+        total = (self.latency_ms + jitter) / 1000.0
+        if total > 0:
+            time.sleep(total)
+
+    def outcome(self):
+        """
+        Draw the outcome of one request.
+
+        Returns:
+            str: 'ok', 'fail' or 'timeout'
+        """
+        with self._lock:
+            draw = self._random.random()
+        if draw < self.timeout_rate:
+            return 'timeout'
+        if draw < self.timeout_rate + self.failure_rate:
+            return 'fail'
+        return 'ok'
+
+
+class FakeDNSServer:
+    """
+    Minimal UDP DNS server answering MX and A queries from a static zone.
+
+    Unknown names get NXDOMAIN, names listed in ``no_mx`` get an empty
+    MX answer (NoAnswer) with a valid A record, and injected failures are
+    answered with SERVFAIL or dropped to simulate timeouts.
+    """
+
+    def __init__(self, mx_domains=None, no_mx=None, host='127.0.0.1', port=0, faults=None):
+        self.mx_domains = {d.lower().rstrip('.') for d in (mx_domains or [])}
+        self.no_mx = {d.lower().rstrip('.') for d in (no_mx or [])}
+        self.faults = faults or FaultProfile()
+        self.queries = 0
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.bind((host, port))
+        self.host, self.port = self._socket.getsockname()
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, name='fake-dns', daemon=True)
+        self._thread.start()
+        _logger.info("Fake DNS server listening on %s:%s", self.host, self.port)
+        return self
+
+    def stop(self):
+        self._running = False
+        self._socket.close()
+
+    def _serve(self):
+        while self._running:
+            try:
+                wire, addr = self._socket.recvfrom(4096)
+            except OSError:
+                break
+            # Answer concurrently so injected latency does not serialize clients
+            threading.Thread(target=self._answer, args=(wire, addr), daemon=True).start()
+
+    def _answer(self, wire, addr):
+        self.queries += 1
+        try:
+            query = dns.message.from_wire(wire)
+        except Exception:
+            return
+
+        outcome = self.faults.outcome()
+        if outcome == 'timeout':
+            return
+        self.faults.delay()
+
+        response = dns.message.make_response(query)
+        response.flags |= dns.flags.AA
+        if outcome == 'fail':
+            response.set_rcode(dns.rcode.SERVFAIL)
+        else:
+            question = query.question[0]
+            name = question.name.to_text().lower().rstrip('.')
+            if name in self.mx_domains:
+                if question.rdtype == dns.rdatatype.MX:
+                    response.answer.append(dns.rrset.from_text(
+                        question.name, 300, dns.rdataclass.IN, dns.rdatatype.MX, '10 mx.%s.' % name))
+                elif question.rdtype == dns.rdatatype.A:
+                    response.answer.append(dns.rrset.from_text(
+                        question.name, 300, dns.rdataclass.IN, dns.rdatatype.A, '127.0.0.1'))
+            elif name in self.no_mx:
+                if question.rdtype == dns.rdatatype.A:
+                    response.answer.append(dns.rrset.from_text(
+                        question.name, 300, dns.rdataclass.IN, dns.rdatatype.A, '127.0.0.1'))
+            else:
+                response.set_rcode(dns.rcode.NXDOMAIN)
+
+        try:
+            self._socket.sendto(response.to_wire(), addr)
+        except OSError:
+            pass
+
+    def install_as_default_resolver(self, timeout=2.0):
+        """
+        Point dnspython's default resolver at this server (in-process only).
+        """
+        import dns.resolver
+        resolver = dns.resolver.Resolver(configure=False)
+        resolver.nameservers = [self.host]
+        resolver.port = self.port
+        resolver.timeout = timeout
+        resolver.lifetime = timeout
+        dns.resolver.default_resolver = resolver
+        return resolver
+
+
+class FakeTempMailDetector:
+    """
+    HTTP stand-in for the TempMailDetector ``/check`` endpoint.
+
+    Domains listed in ``blocked_domains`` are reported as block-listed with
+    a score of 100, every other domain scores 0. Injected failures answer
+    HTTP 500 and injected timeouts hold the connection open past the
+    client timeout.
+    """
+
+    def __init__(self, blocked_domains=None, host='127.0.0.1', port=0, faults=None, timeout_hold=15.0):
+        self.blocked_domains = {d.lower() for d in (blocked_domains or [])}
+        self.faults = faults or FaultProfile()
+        self.timeout_hold = timeout_hold
+        self.requests = 0
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address
+        self._thread = None
+
+    @property
+    def url(self):
+        return 'http://%s:%s/check' % (self.host, self.port)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-tempmail', daemon=True)
+        self._thread.start()
+        _logger.info("Fake TempMailDetector listening on %s", self.url)
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                fake.requests += 1
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+
+                outcome = fake.faults.outcome()
+                if outcome == 'timeout':
+                    time.sleep(fake.timeout_hold)
+                    return
+                fake.faults.delay()
+
+                if outcome == 'fail' or not self.headers.get('Authorization'):
+                    self._reply(500, {'error': 'injected failure'})
+                    return
+
+                try:
+                    domain = (json.loads(body or b'{}').get('domain') or '').lower()
+                except ValueError:
+                    self._reply(400, {'error': 'invalid json'})
+                    return
+
+                blocked = domain in fake.blocked_domains
+                self._reply(200, {
+                    'domain': domain,
+                    'score': 100 if blocked else 0,
+                    'meta': {'block_list': blocked},
+                })
+
+            def _reply(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+class FakeSMTPServer:
+    """
+    SMTP stand-in answering RCPT TO probes from a static mailbox list.
+
+    Recipients listed in ``mailboxes`` are accepted, domains listed in
+    ``catch_all_domains`` accept any recipient and everything else is
+    rejected with 550. Injected failures answer RCPT with a temporary 451
+    and injected timeouts stall the reply past the client timeout. The
+    latency of the fault profile is added to every reply.
+    """
+
+    def __init__(self, mailboxes=None, catch_all_domains=None, host='127.0.0.1', port=0, faults=None,
+                 timeout_hold=15.0):
+        self.mailboxes = {m.lower() for m in (mailboxes or [])}
+        self.catch_all_domains = {d.lower() for d in (catch_all_domains or [])}
+        self.faults = faults or FaultProfile()
+        self.timeout_hold = timeout_hold
+        self.connections = 0
+        self.rcpt_commands = 0
+        self._lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address
+        self._thread = None
+
+    @property
+    def address(self):
+        return '%s:%s' % (self.host, self.port)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-smtp', daemon=True)
+        self._thread.start()
+        _logger.info("Fake SMTP server listening on %s", self.address)
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _accepts(self, recipient):
+        recipient = recipient.strip().strip('<>').lower()
+        domain = recipient.rpartition('@')[2]
+        return recipient in self.mailboxes or domain in self.catch_all_domains
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write(('%s\r\n' % line).encode())
+
+            def handle(self):
+                with fake._lock:
+                    fake.connections += 1
+                fake.faults.delay()
+                self.reply('220 fake-smtp ESMTP ready')
+                for raw in self.rfile:
+                    line = raw.decode(errors='replace').strip()
+                    verb = line[:4].upper()
+                    if verb in ('EHLO', 'HELO'):
+                        self.reply('250 fake-smtp')
+                    elif verb == 'MAIL':
+                        self.reply('250 2.1.0 Ok')
+                    elif verb == 'RCPT':
+                        with fake._lock:
+                            fake.rcpt_commands += 1
+                        outcome = fake.faults.outcome()
+                        if outcome == 'timeout':
+                            time.sleep(fake.timeout_hold)
+                            return
+                        fake.faults.delay()
+                        if outcome == 'fail':
+                            self.reply('451 4.3.0 Injected temporary failure')
+                        elif fake._accepts(line.partition(':')[2]):
+                            self.reply('250 2.1.5 Ok')
+                        else:
+                            self.reply('550 5.1.1 No such user')
+                    elif verb in ('RSET', 'NOOP'):
+                        self.reply('250 2.0.0 Ok')
+                    elif verb == 'QUIT':
+                        self.reply('221 2.0.0 Bye')
+                        return
+                    else:
+                        self.reply('502 5.5.2 Command not implemented')
+
+        return Handler
@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+"""
+Signup Performance Benchmark
+Drives the real controller paths of j_signup_validation in-process through
+Odoo's WSGI application against a test database, with local DNS,
+TempMailDetector and SMTP stand-ins, and records throughput, latency
+percentiles and SQL query counts per path.
+
+Usage (from the repository root):
+
+    python -m benchmarks.signup_bench -d bench_signup \\
+        --addons-path /path/to/odoo/addons,. --init \\
+        --iterations 200 --dns-latency-ms 20 --disposable-method api \\
+        --output bench_results/run.json --compare bench_results/previous.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+
+from . import stats
+from .fakes import FakeDNSServer, FakeSMTPServer, FakeTempMailDetector, FaultProfile
+
+_logger = logging.getLogger('signup_bench')
+
+MODULE = 'j_signup_validation'
+BENCH_PASSWORD = 'Bench-Passw0rd!'
+MX_DOMAINS = ['bench-mail.test', 'bench-corp.test', 'bench-isp.test']
+BLOCKED_DOMAINS = ['bench-disposable.test']
+
+PATHS = ('form_get', 'countries', 'country_search', 'validate_email', 'validate_phone', 'validate_password', 'submit', 'mailbox_probe', 'revalidate')
+
+# Addresses checked per mailbox_probe iteration, one in four has no mailbox
+MAILBOX_BATCH = 20
+# Addresses checked per revalidate iteration, spread over the MX domains
+REVALIDATION_BATCH = 100
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-d', '--database', required=True, help='Test database to run against')
+    parser.add_argument('-c', '--config', help='Odoo configuration file')
+    parser.add_argument('--addons-path', help='Odoo addons path (must include this repository)')
+    parser.add_argument('--init', action='store_true', help='Create the database and install the module if needed')
+    parser.add_argument('--paths', default=','.join(PATHS), help='Comma-separated subset of: %s' % ', '.join(PATHS))
+    parser.add_argument('--iterations', type=int, default=200, help='Measured requests per path')
+    parser.add_argument('--warmup', type=int, default=20, help='Unmeasured warm-up requests per path')
+    parser.add_argument('--seed', type=int, default=1, help='Seed for generated data and fault injection')
+    parser.add_argument('--dns-latency-ms', type=float, default=0.0)
+    parser.add_argument('--dns-jitter-ms', type=float, default=0.0)
+    parser.add_argument('--dns-failure-rate', type=float, default=0.0, help='Share of SERVFAIL answers')
+    parser.add_argument('--dns-timeout-rate', type=float, default=0.0, help='Share of dropped DNS queries')
+    parser.add_argument('--disposable-method', choices=['library', 'api'], default='library')
+    parser.add_argument('--api-latency-ms', type=float, default=0.0)
+    parser.add_argument('--api-jitter-ms', type=float, default=0.0)
+    parser.add_argument('--api-failure-rate', type=float, default=0.0, help='Share of HTTP 500 answers')
+    parser.add_argument('--api-timeout-rate', type=float, default=0.0, help='Share of requests held past the timeout')
+    parser.add_argument('--smtp-latency-ms', type=float, default=0.0)
+    parser.add_argument('--smtp-jitter-ms', type=float, default=0.0)
+    parser.add_argument('--smtp-failure-rate', type=float, default=0.0, help='Share of temporary RCPT failures')
+    parser.add_argument('--smtp-timeout-rate', type=float, default=0.0, help='Share of stalled RCPT replies')
+    parser.add_argument('--output', default=None, help='Results file (JSON); defaults to bench_results/<timestamp>.json')
+    parser.add_argument('--compare', default=None, help='Previous results file to print deltas against')
+    return parser.parse_args(argv)
+
+
+def bootstrap_odoo(args):
+    """
+    Configure Odoo for the benchmark database and load its registry.
+
+    Returns:
+        tuple: (odoo package, registry)
+    """
+    import odoo
+    from odoo.tools import config
+
+    odoo_args = ['-d', args.database, '--db-filter', '^%s$' % args.database, '--log-level', 'warn']
+    if args.config:
+        odoo_args += ['-c', args.config]
+    if args.addons_path:
+        odoo_args += ['--addons-path', args.addons_path]
+    config.parse_config(odoo_args)
+
+    update_module = False
+    if args.init:
+        try:
+            odoo.service.db._create_empty_database(args.database)
+            _logger.info("Created benchmark database %s", args.database)
+        except odoo.service.db.DatabaseExists:
+            pass
+        config['init'][MODULE] = 1
+        config['without_demo'] = 'all'
+        update_module = True
+
+    odoo.service.server.load_server_wide_modules()
+    registry = odoo.modules.registry.Registry.new(args.database, update_module=update_module)
+    return odoo, registry
+
+
+def configure_database(odoo, registry, args, tempmail):
+    """
+    Point the module's settings at the local stand-ins.
+
+    Returns:
+        int: Database id of the default phone country (Saudi Arabia)
+    """
+    with registry.cursor() as cr:
+        env = odoo.api.Environment(cr, odoo.SUPERUSER_ID, {})
+        params = env['ir.config_parameter']
+        params.set_param('%s.email_mx_verification' % MODULE, 'True')
+        params.set_param('%s.email_disposable_check' % MODULE, 'True')
+        params.set_param('%s.temp_mail_detection_method' % MODULE, args.disposable_method)
+        params.set_param('%s.temp_mail_api_key' % MODULE, 'bench-key')
+        params.set_param('%s.temp_mail_api_url' % MODULE, tempmail.url)
+        params.set_param('%s.registration_auto_login' % MODULE, 'True')
+        return env.ref('base.sa').id
+
+
+class SignupWorkload:
+    """
+    Generates requests for each benchmarked path and executes them against
+    Odoo's WSGI application with werkzeug's test client.
+    """
+
+    def __init__(self, odoo, country_id, seed, smtp=None):
+        from werkzeug.test import Client
+
+        self._client_class = Client
+        self.app = odoo.http.root
+        self.client = Client(self.app)
+        self.country_id = country_id
+        self.random = random.Random(seed)
+        self.run_id = uuid.uuid4().hex[:8]
+        self.counter = 0
+        self.smtp = smtp
+
+    def next_email(self):
+        self.counter += 1
+        return 'bench-%s-%d@%s' % (self.run_id, self.counter, self.random.choice(MX_DOMAINS))
+
+    def next_phone(self):
+        return '+966 5%d %03d %04d' % (
+            self.random.randint(0, 9), self.random.randint(0, 999), self.random.randint(0, 9999))
+
+    def _json_rpc(self, client, path, params):
+        body = json.dumps({'jsonrpc': '2.0', 'method': 'call', 'params': params, 'id': self.counter})
+        response = client.post(path, data=body, content_type='application/json')
+        if response.status_code != 200:
+            return False
+        payload = json.loads(response.get_data(as_text=True))
+        return 'error' not in payload and not payload.get('result', {}).get('throttled')
+
+    def form_get(self):
+        response = self.client.get('/%s/signup' % MODULE)
+        return response.status_code == 200
+
+    def countries(self):
+        # Revalidation of the cached country list, as done by returning browsers
+        response = self.client.get('/%s/countries.json' % MODULE)
+        etag = response.headers.get('ETag')
+        if response.status_code != 200 or not etag:
+            return False
+        response = self.client.get('/%s/countries.json' % MODULE, headers={'If-None-Match': etag})
+        return response.status_code == 304
+
+    def country_search(self):
+        return self._json_rpc(self.client, '/%s/countries/search' % MODULE, {
+            'query': self.random.choice(['sa', 'uni', '96', 'jo', 'ger']),
+        })
+
+    def validate_email(self):
+        return self._json_rpc(self.client, '/%s/validate_email' % MODULE, {'email': self.next_email()})
+
+    def validate_phone(self):
+        return self._json_rpc(self.client, '/%s/validate_phone' % MODULE, {
+            'phone': self.next_phone(),
+            'country_id': self.country_id,
+        })
+
+    def validate_password(self):
+        return self._json_rpc(self.client, '/%s/validate_password' % MODULE, {'password': BENCH_PASSWORD})
+
+    def submit(self):
+        # Fresh client per submit: auto-login must not leak into the next signup
+        client = self._client_class(self.app)
+        response = client.post('/%s/submit' % MODULE, data={
+            'account_type': 'individual',
+            'first_name': 'Bench',
+            'last_name': 'User %d' % self.counter,
+            'email': self.next_email(),
+            'phone': self.next_phone(),
+            'phone_country': str(self.country_id),
+            'password': BENCH_PASSWORD,
+            'confirm_password': BENCH_PASSWORD,
+        })
+        location = response.headers.get('Location', '')
+        return response.status_code in (302, 303) and 'error=' not in location
+
+    def mailbox_probe(self):
+        # Same prober as the background job, pointed at the SMTP stand-in
+        from odoo.addons.j_signup_validation.tools.mailbox_probe import MailboxProber, STATUS_UNKNOWN
+
+        emails = [self.next_email() for _i in range(MAILBOX_BATCH)]
+        self.smtp.mailboxes.update(e.lower() for i, e in enumerate(emails) if i % 4)
+        prober = MailboxProber('bench.local', 'postmaster@bench.local', timeout=2.0,
+                               mx_override=self.smtp.address)
+        results = prober.probe(emails)
+        return all(status != STATUS_UNKNOWN for status, _detail in results.values())
+
+    def revalidate(self):
+        # Batch email check of the revalidation job: one lookup per domain
+        from odoo.addons.j_signup_validation.tools.signup_validators import EmailSettings, validate_emails
+
+        emails = [self.next_email() for _i in range(REVALIDATION_BATCH)]
+        results = validate_emails(emails, EmailSettings(disposable_check=False))
+        return all(result.valid for result in results)
+
+
+def measure(workload, path, iterations, warmup):
+    """
+    Run one path ``warmup + iterations`` times and summarize the measured part.
+    """
+    action = getattr(workload, path)
+    current_thread = threading.current_thread()
+
+    for _i in range(warmup):
+        action()
+
+    latencies, queries = [], []
+    errors = 0
+    started = time.perf_counter()
+    for _i in range(iterations):
+        current_thread.query_count = 0
+        t0 = time.perf_counter()
+        try:
+            ok = action()
+        except Exception:
+            _logger.exception("Request on path %s crashed", path)
+            ok = False
+        latencies.append(time.perf_counter() - t0)
+        queries.append(getattr(current_thread, 'query_count', 0))
+        if not ok:
+            errors += 1
+    elapsed = time.perf_counter() - started
+    return stats.summarize(latencies, elapsed, errors=errors, queries=queries)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    selected = [p.strip() for p in args.paths.split(',') if p.strip()]
+    unknown = set(selected) - set(PATHS)
+    if unknown:
+        raise SystemExit('Unknown paths: %s' % ', '.join(sorted(unknown)))
+
+    dns_faults = FaultProfile(args.dns_latency_ms, args.dns_jitter_ms, args.dns_failure_rate,
+                              args.dns_timeout_rate, seed=args.seed)
+    api_faults = FaultProfile(args.api_latency_ms, args.api_jitter_ms, args.api_failure_rate,
+                              args.api_timeout_rate, seed=args.seed + 1)
+    dns_server = FakeDNSServer(mx_domains=MX_DOMAINS + BLOCKED_DOMAINS, faults=dns_faults).start()
+    tempmail = FakeTempMailDetector(blocked_domains=BLOCKED_DOMAINS, faults=api_faults).start()
+    smtp_faults = FaultProfile(args.smtp_latency_ms, args.smtp_jitter_ms, args.smtp_failure_rate,
+                               args.smtp_timeout_rate, seed=args.seed + 2)
+    smtp_server = FakeSMTPServer(faults=smtp_faults, timeout_hold=3.0).start()
+    dns_server.install_as_default_resolver()
+
+    try:
+        odoo, registry = bootstrap_odoo(args)
+        country_id = configure_database(odoo, registry, args, tempmail)
+        workload = SignupWorkload(odoo, country_id, args.seed, smtp=smtp_server)
+
+        results = {}
+        for path in selected:
+            _logger.info("Benchmarking %s (%d iterations)", path, args.iterations)
+            results[path] = measure(workload, path, args.iterations, args.warmup)
+    finally:
+        dns_server.stop()
+        tempmail.stop()
+        smtp_server.stop()
+
+    meta = stats.run_metadata({
+        'database': args.database,
+        'iterations': args.iterations,
+        'warmup': args.warmup,
+        'seed': args.seed,
+        'disposable_method': args.disposable_method,
+        'dns_faults': vars(args_subset(args, 'dns_')),
+        'api_faults': vars(args_subset(args, 'api_')),
+        'smtp_faults': vars(args_subset(args, 'smtp_')),
+        'dns_queries': dns_server.queries,
+        'api_requests': tempmail.requests,
+        'smtp_connections': smtp_server.connections,
+        'smtp_rcpt_commands': smtp_server.rcpt_commands,
+    })
+    output = args.output or os.path.join('bench_results', 'signup-%s.json' % time.strftime('%Y%m%d-%H%M%S'))
+    stats.write_results(output, meta, results)
+
+    baseline = stats.load_results(args.compare) if args.compare else None
+    stats.print_table(results, baseline)
+    print('\nResults written to %s' % output)
+
+
+def args_subset(args, prefix):
+    """Return a namespace holding only the arguments starting with ``prefix``."""
+    return argparse.Namespace(**{k: v for k, v in vars(args).items() if k.startswith(prefix)})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,507 @@
+# -*- coding: utf-8 -*-
+"""
+Signup Burst Load Test
+Drives many concurrent browser-like sessions through the real multi-step
+signup flow of a running Odoo instance (form GET, debounced AJAX
+validations, submit, auto-login redirect) while sampling PostgreSQL for
+lock waits, deadlocks and serialization failures.
+
+Usage (from the repository root, against a local test instance):
+
+    python -m benchmarks.signup_load --url http://localhost:8069 \\
+        --email-domain "$LOAD_EMAIL_DOMAIN" \\
+        --sessions 300 --concurrency 100 --ramp-up 5 \\
+        --db-dsn "dbname=bench_signup user=odoo" \\
+        --odoo-log /var/log/odoo/odoo.log --output bench_results/load.json
+
+Preparing the instance: all sessions come from one address and use one
+email domain, so the rate limiter of the AJAX validators and the
+registration velocity checks would throttle or block most of the run.
+Throttled validations are counted as failures. Turn both off (or raise
+their limits) for the load run, from an Odoo shell of the instance:
+
+    env['ir.config_parameter'].set_param('j_signup_validation.rate_limit_enabled', 'False')
+    env['ir.config_parameter'].set_param('j_signup_validation.velocity_enabled', 'False')
+    env.cr.commit()
+
+and set them back to 'True' afterwards.
+
+``--email-domain`` is required: generated emails go through the
+instance's MX check, which resolves with the instance's own DNS, so the
+domain needs an MX record there. Reserved domains such as example.com
+have none, and every submit would measure a rejection. Alternatively,
+turn the check off with ``j_signup_validation.email_mx_verification``.
+Use a domain nobody reads mail for if the instance sends emails.
+
+To measure the validation fast path, run once with and once without
+``signup_fast_validation = True`` in the instance configuration and pass
+the first results file to ``--compare``.
+
+The ``double_submit`` scenario instead fires ``--burst`` identical submits
+of each form at once, with one idempotency key, and checks in the database
+(``--db-dsn``) that exactly one account was created per form:
+
+    python -m benchmarks.signup_load --scenario double_submit --burst 8 \\
+        --email-domain "$LOAD_EMAIL_DOMAIN" \\
+        --sessions 50 --concurrency 10 --db-dsn "dbname=bench_signup user=odoo"
+
+``same_email`` sends the burst from separate browsers (distinct keys and
+sessions): exactly one submit may succeed, the others must be refused with
+the duplicate or in-progress message, and one account must exist per email.
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from . import stats
+
+_logger = logging.getLogger('signup_load')
+
+MODULE = 'j_signup_validation'
+LOAD_PASSWORD = 'Load-Passw0rd!'
+
+# Odoo logs these when a transaction is retried or aborted on contention
+SERIALIZATION_PATTERNS = re.compile(
+    r'could not serialize access|SerializationFailure|deadlock detected|'
+    r'LockNotAvailable|could not obtain lock|concurrent update'
+)
+
+# Answers refusing a concurrent signup for an already registered email
+DUPLICATE_REFUSAL = re.compile(r'already exists|already in progress')
+
+STEPS = ('form_get', 'validate_email', 'validate_phone', 'validate_password', 'submit', 'redirect',
+         'burst_submit')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:8069', help='Base URL of the Odoo instance')
+    parser.add_argument('--sessions', type=int, default=200, help='Total signup sessions to run')
+    parser.add_argument('--concurrency', type=int, default=50, help='Sessions running at the same time')
+    parser.add_argument('--ramp-up', type=float, default=0.0, help='Seconds over which session starts are spread')
+    parser.add_argument('--think-ms', type=float, default=500.0,
+                        help='Pause before each AJAX validation, mirroring the form debounce')
+    parser.add_argument('--email-domain', required=True,
+                        help='Domain for generated emails; it must have an MX record the instance can resolve '
+                             'unless the MX check is disabled (see above)')
+    parser.add_argument('--country-id', type=int, default=None,
+                        help='res.country id for the phone (defaults to the form default)')
+    parser.add_argument('--timeout', type=float, default=60.0, help='Per-request timeout in seconds')
+    parser.add_argument('--db-dsn', default=None, help='libpq DSN of the instance database for lock sampling')
+    parser.add_argument('--sample-interval', type=float, default=0.1, help='Seconds between lock samples')
+    parser.add_argument('--odoo-log', default=None, help='Odoo log file scanned for serialization failures')
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), default=None,
+                        help='Session behaviour: the full signup flow, or bursts of identical submits '
+                             '(double_submit) or of one email from several browsers (same_email)')
+    parser.add_argument('--burst', type=int, default=5,
+                        help='Simultaneous submits per form (double_submit and same_email scenarios)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', default=None, help='Results file (JSON); defaults to bench_results/<timestamp>.json')
+    parser.add_argument('--compare', default=None, help='Previous results file to print deltas against')
+    return parser.parse_args(argv)
+
+
+class StepRecorder:
+    """Thread-safe collection of per-step latencies and failures."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_samples = defaultdict(list)
+
+    def record(self, step, latency, ok, detail=None):
+        with self._lock:
+            self.latencies[step].append(latency)
+            if not ok:
+                self.errors[step] += 1
+                if detail and len(self.error_samples[step]) < 5:
+                    self.error_samples[step].append(detail)
+
+    def summary(self, elapsed):
+        results = {}
+        for step in STEPS:
+            if step in self.latencies:
+                results[step] = stats.summarize(self.latencies[step], elapsed, errors=self.errors[step])
+                if self.error_samples[step]:
+                    results[step]['error_samples'] = self.error_samples[step]
+        return results
+
+
+class SignupSession:
+    """
+    One virtual user walking through the signup form like the browser does.
+    """
+
+    def __init__(self, args, recorder, index, rng):
+        self.args = args
+        self.recorder = recorder
+        self.index = index
+        self.rng = rng
+        self.http = requests.Session()
+        self.email = 'load-%s-%d@%s' % (uuid.uuid4().hex[:10], index, args.email_domain)
+        self.phone = '+966 5%d %03d %04d' % (rng.randint(0, 9), rng.randint(0, 999), rng.randint(0, 9999))
+
+    def url(self, path):
+        return self.args.url.rstrip('/') + path
+
+    def timed(self, step, func):
+        t0 = time.perf_counter()
+        try:
+            ok, detail, value = func()
+        except requests.RequestException as e:
+            ok, detail, value = False, '%s: %s' % (type(e).__name__, e), None
+        self.recorder.record(step, time.perf_counter() - t0, ok, detail)
+        return ok, value
+
+    def think(self):
+        if self.args.think_ms:
+            time.sleep(self.args.think_ms / 1000.0 * self.rng.uniform(0.8, 1.2))
+
+    def json_rpc(self, path, params):
+        response = self.http.post(self.url(path), timeout=self.args.timeout, json={
+            'jsonrpc': '2.0', 'method': 'call', 'params': params, 'id': self.index,
+        })
+        if response.status_code != 200:
+            return False, 'HTTP %s' % response.status_code, None
+        payload = response.json()
+        if 'error' in payload:
+            return False, payload['error'].get('message'), None
+        result = payload.get('result') or {}
+        if result.get('throttled'):
+            # Refused by the rate limiter: the validation never ran
+            return False, 'throttled (retry after %ss)' % result.get('retry_after'), None
+        return True, None, result
+
+    def form_get(self):
+        response = self.http.get(self.url('/%s/signup' % MODULE), timeout=self.args.timeout)
+        if response.status_code != 200:
+            return False, 'HTTP %s' % response.status_code, None
+        match = re.search(r'<option value="(\d+)"[^>]*selected', response.text)
+        return True, None, int(match.group(1)) if match else None
+
+    def run(self):
+        ok, default_country = self.timed('form_get', self.form_get)
+        if not ok:
+            return 'form_failed'
+        country_id = self.args.country_id or default_country
+
+        self.think()
+        self.timed('validate_email', lambda: self.json_rpc(
+            '/%s/validate_email' % MODULE, {'email': self.email}))
+        self.think()
+        self.timed('validate_phone', lambda: self.json_rpc(
+            '/%s/validate_phone' % MODULE, {'phone': self.phone, 'country_id': country_id}))
+        self.think()
+        self.timed('validate_password', lambda: self.json_rpc(
+            '/%s/validate_password' % MODULE, {'password': LOAD_PASSWORD}))
+
+        ok, location = self.timed('submit', lambda: self.submit(country_id))
+        if not ok:
+            return 'submit_failed'
+        if location:
+            self.timed('redirect', lambda: self.follow(location))
+        return 'completed'
+
+    def submit_payload(self, country_id):
+        return {
+            'account_type': 'individual',
+            'first_name': 'Load',
+            'last_name': 'User %d' % self.index,
+            'email': self.email,
+            'phone': self.phone,
+            'phone_country': str(country_id or ''),
+            'password': LOAD_PASSWORD,
+            'confirm_password': LOAD_PASSWORD,
+        }
+
+    def submit(self, country_id, payload=None, http=None):
+        response = (http or self.http).post(self.url('/%s/submit' % MODULE),
+                                            data=payload or self.submit_payload(country_id),
+                                            allow_redirects=False, timeout=self.args.timeout)
+        location = response.headers.get('Location', '')
+        if response.status_code not in (302, 303):
+            return False, 'HTTP %s' % response.status_code, None
+        if 'error=' in location:
+            return False, requests.utils.unquote(location.split('error=', 1)[1])[:200], None
+        return True, None, location
+
+    def follow(self, location):
+        response = self.http.get(requests.compat.urljoin(self.args.url, location), timeout=self.args.timeout)
+        return response.status_code < 400, 'HTTP %s' % response.status_code, None
+
+
+class DoubleSubmitSession(SignupSession):
+    """
+    A user double-clicking the submit button: ``args.burst`` identical
+    submits of one form, sharing its idempotency key and session cookie,
+    sent at the same time. Every submit must get the same answer and the
+    database must hold exactly one account for the email.
+    """
+
+    def burst(self, payloads, share_cookies=True):
+        """
+        Send the payloads at the same instant, one thread each.
+
+        Returns:
+            list: (ok, error detail, redirect location) per payload
+        """
+        barrier = threading.Barrier(len(payloads))
+
+        def submit_once(payload):
+            http = requests.Session()
+            if share_cookies:
+                http.cookies.update(self.http.cookies)
+            barrier.wait()
+            t0 = time.perf_counter()
+            try:
+                answer = self.submit(None, payload, http)
+            except requests.RequestException as e:
+                answer = (False, '%s: %s' % (type(e).__name__, e), None)
+            self.recorder.record('burst_submit', time.perf_counter() - t0, answer[0], answer[1])
+            return answer
+
+        with ThreadPoolExecutor(max_workers=len(payloads)) as pool:
+            return list(pool.map(submit_once, payloads))
+
+    def run(self):
+        ok, default_country = self.timed('form_get', self.form_get)
+        if not ok:
+            return 'form_failed'
+        payload = self.submit_payload(self.args.country_id or default_country)
+        payload['idempotency_key'] = str(uuid.uuid4())
+
+        answers = self.burst([payload] * self.args.burst)
+        if not all(ok for ok, _detail, _location in answers):
+            return 'submit_failed'
+        if len({location for _ok, _detail, location in answers}) != 1:
+            return 'diverging_answers'
+        return self.check_accounts()
+
+    def check_accounts(self):
+        if self.args.db_dsn:
+            accounts = count_accounts(self.args.db_dsn, self.email)
+            if accounts != 1:
+                return 'accounts_%d' % accounts
+        return 'completed'
+
+
+class SameEmailSession(DoubleSubmitSession):
+    """
+    Several browsers registering the same email at once: ``args.burst``
+    submits with distinct idempotency keys and sessions. Exactly one must
+    succeed, the others must be refused with the duplicate or in-progress
+    message rather than a generic failure, and the database must hold
+    exactly one account for the email.
+    """
+
+    def run(self):
+        ok, default_country = self.timed('form_get', self.form_get)
+        if not ok:
+            return 'form_failed'
+        payload = self.submit_payload(self.args.country_id or default_country)
+        payloads = [dict(payload, idempotency_key=str(uuid.uuid4())) for _i in range(self.args.burst)]
+
+        answers = self.burst(payloads, share_cookies=False)
+        succeeded = sum(1 for ok, _detail, _location in answers if ok)
+        if succeeded != 1:
+            return 'succeeded_%d' % succeeded
+        refusals = [detail or '' for ok, detail, _location in answers if not ok]
+        if not all(DUPLICATE_REFUSAL.search(detail) for detail in refusals):
+            return 'unexpected_refusal'
+        return self.check_accounts()
+
+
+def count_accounts(dsn, email):
+    """Number of SaaS users registered with an email."""
+    import psycopg2
+
+    with psycopg2.connect(dsn) as conn, conn.cursor() as cr:
+        cr.execute("SELECT count(*) FROM saas_user WHERE su_email = %s", [email])
+        return cr.fetchone()[0]
+
+
+SCENARIOS = {
+    'flow': SignupSession,
+    'double_submit': DoubleSubmitSession,
+    'same_email': SameEmailSession,
+}
+
+
+class LockMonitor:
+    """
+    Samples pg_stat_activity for sessions waiting on locks and diffs the
+    deadlock and rollback counters of pg_stat_database over the run.
+    """
+
+    def __init__(self, dsn, interval):
+        import psycopg2
+
+        self.conn = psycopg2.connect(dsn)
+        self.conn.autocommit = True
+        self.interval = interval
+        self.samples = 0
+        self.lock_wait_samples = 0
+        self.max_lock_waiters = 0
+        self.waiting_relations = defaultdict(int)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='lock-monitor', daemon=True)
+        self._before = None
+
+    def _counters(self):
+        with self.conn.cursor() as cr:
+            cr.execute("""
+                SELECT deadlocks, xact_rollback, conflicts
+                  FROM pg_stat_database WHERE datname = current_database()
+            """)
+            deadlocks, rollbacks, conflicts = cr.fetchone()
+        return {'deadlocks': deadlocks, 'rollbacks': rollbacks, 'conflicts': conflicts}
+
+    def start(self):
+        self._before = self._counters()
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self.conn.cursor() as cr:
+                cr.execute("""
+                    SELECT COALESCE(c.relname, l.locktype)
+                      FROM pg_stat_activity a
+                      JOIN pg_locks l ON l.pid = a.pid AND NOT l.granted
+                 LEFT JOIN pg_class c ON c.oid = l.relation
+                     WHERE a.datname = current_database()
+                       AND a.wait_event_type = 'Lock'
+                """)
+                waiting = [row[0] for row in cr.fetchall()]
+            self.samples += 1
+            if waiting:
+                self.lock_wait_samples += 1
+                self.max_lock_waiters = max(self.max_lock_waiters, len(waiting))
+                for relation in waiting:
+                    self.waiting_relations[relation] += 1
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        after = self._counters()
+        self.conn.close()
+        return {
+            'samples': self.samples,
+            'samples_with_lock_waits': self.lock_wait_samples,
+            'lock_wait_ratio': round(self.lock_wait_samples / self.samples, 4) if self.samples else 0.0,
+            'max_concurrent_lock_waiters': self.max_lock_waiters,
+            'lock_waits_by_relation': dict(self.waiting_relations),
+            'deadlocks': after['deadlocks'] - self._before['deadlocks'],
+            'rollbacks': after['rollbacks'] - self._before['rollbacks'],
+            'conflicts': after['conflicts'] - self._before['conflicts'],
+        }
+
+
+def scan_log(path, offset):
+    """
+    Count serialization/lock failures logged by Odoo after ``offset``.
+    """
+    counts = defaultdict(int)
+    with open(path, errors='replace') as handle:
+        handle.seek(offset)
+        for line in handle:
+            match = SERIALIZATION_PATTERNS.search(line)
+            if match:
+                counts[match.group(0)] += 1
+    return dict(counts)
+
+
+def run_sessions(args, recorder, session_factory):
+    """
+    Run ``args.sessions`` sessions with bounded concurrency and ramp-up.
+
+    Returns:
+        tuple: (outcome counts, elapsed seconds)
+    """
+    rng = random.Random(args.seed)
+    outcomes = defaultdict(int)
+    outcome_lock = threading.Lock()
+    delay = args.ramp_up / args.sessions if args.ramp_up and args.sessions else 0.0
+
+    def worker(index):
+        session = session_factory(args, recorder, index, random.Random(rng.random()))
+        try:
+            outcome = session.run()
+        except Exception as e:
+            _logger.exception("Session %d crashed", index)
+            outcome = 'crashed: %s' % type(e).__name__
+        with outcome_lock:
+            outcomes[outcome] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for index in range(args.sessions):
+            pool.submit(worker, index)
+            if delay:
+                time.sleep(delay)
+    return dict(outcomes), time.perf_counter() - started
+
+
+def main(argv=None, session_factory=SignupSession, scenario='flow'):
+    args = parse_args(argv)
+    if args.scenario:
+        session_factory, scenario = SCENARIOS[args.scenario], args.scenario
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    monitor = LockMonitor(args.db_dsn, args.sample_interval).start() if args.db_dsn else None
+    log_offset = os.path.getsize(args.odoo_log) if args.odoo_log else 0
+
+    recorder = StepRecorder()
+    _logger.info("Running %d sessions with concurrency %d against %s", args.sessions, args.concurrency, args.url)
+    outcomes, elapsed = run_sessions(args, recorder, session_factory)
+
+    database = monitor.stop() if monitor else None
+    log_failures = scan_log(args.odoo_log, log_offset) if args.odoo_log else None
+
+    results = recorder.summary(elapsed)
+    completed = outcomes.get('completed', 0)
+    meta = stats.run_metadata({
+        'scenario': scenario,
+        'url': args.url,
+        'sessions': args.sessions,
+        'concurrency': args.concurrency,
+        'ramp_up': args.ramp_up,
+        'think_ms': args.think_ms,
+        'burst': args.burst if scenario in ('double_submit', 'same_email') else None,
+        'elapsed_s': round(elapsed, 2),
+        'completed_signups': completed,
+        'signups_per_second': round(completed / elapsed, 2) if elapsed else 0.0,
+        'session_outcomes': outcomes,
+        'database': database,
+        'serialization_failures_logged': log_failures,
+    })
+    output = args.output or os.path.join('bench_results', 'load-%s.json' % time.strftime('%Y%m%d-%H%M%S'))
+    stats.write_results(output, meta, results)
+
+    baseline = stats.load_results(args.compare) if args.compare else None
+    stats.print_table(results, baseline)
+    print('\nSessions: %s' % json.dumps(outcomes, sort_keys=True))
+    print('Completed signups/s: %.2f' % meta['signups_per_second'])
+    if database:
+        print('Database: %s' % json.dumps(database, sort_keys=True))
+    if log_failures is not None:
+        print('Serialization/lock failures in log: %s' % json.dumps(log_failures, sort_keys=True))
+    print('\nResults written to %s' % output)
+    return meta, results
+
+
+if __name__ == '__main__':
+    main()
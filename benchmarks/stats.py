@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark Statistics
+Latency summaries and machine-readable result files shared by the
+benchmark and load-test scripts.
+"""
+
+import json
+import math
+import os
+import platform
+import subprocess
+import time
+
+
+def percentile(sorted_values, pct):
+    """
+    Nearest-rank percentile of an already sorted list.
+
+    Args:
+        sorted_values (list): Ascending values
+        pct (float): Percentile in [0, 100]
+
+    Returns:
+        float: The percentile value, or 0.0 for an empty list
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies, elapsed, errors=0, queries=None):
+    """
+    Build the summary dictionary for one measured path.
+
+    Args:
+        latencies (list): Per-request latency in seconds
+        elapsed (float): Wall-clock duration of the measured run in seconds
+        errors (int): Number of failed requests
+        queries (list): Optional per-request SQL query counts
+
+    Returns:
+        dict: Throughput, latency percentiles (ms), error and query stats
+    """
+    ordered = sorted(latencies)
+    count = len(ordered)
+    summary = {
+        'requests': count,
+        'errors': errors,
+        'error_rate': round(errors / count, 4) if count else 0.0,
+        'throughput_rps': round(count / elapsed, 2) if elapsed > 0 else 0.0,
+        'mean_ms': round(sum(ordered) / count * 1000, 2) if count else 0.0,
+        'p50_ms': round(percentile(ordered, 50) * 1000, 2),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 2),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 2),
+        'max_ms': round(ordered[-1] * 1000, 2) if count else 0.0,
+    }
+    if queries:
+        summary['queries_mean'] = round(sum(queries) / len(queries), 2)
+        summary['queries_max'] = max(queries)
+    return summary
+
+
+def run_metadata(extra=None):
+    """
+    Describe the environment of a run so result files can be compared.
+    """
+    try:
+        revision = subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except Exception:
+        revision = None
+
+    meta = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'git_revision': revision,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+    }
+    meta.update(extra or {})
+    return meta
+
+
+def write_results(path, meta, results):
+    """
+    Write a results file as JSON.
+
+    Returns:
+        str: The path that was written
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as handle:
+        json.dump({'meta': meta, 'results': results}, handle, indent=2, sort_keys=True)
+    return path
+
+
+def print_table(results, baseline=None):
+    """
+    Print a human-readable table, with deltas against a baseline file.
+    """
+    header = '%-20s %8s %9s %9s %9s %9s %8s %7s' % (
+        'path', 'req', 'rps', 'p50 ms', 'p95 ms', 'p99 ms', 'queries', 'errors')
+    print(header)
+    print('-' * len(header))
+    for name, stats in results.items():
+        print('%-20s %8d %9.1f %9.1f %9.1f %9.1f %8s %7d' % (
+            name, stats['requests'], stats['throughput_rps'], stats['p50_ms'],
+            stats['p95_ms'], stats['p99_ms'], stats.get('queries_mean', '-'), stats['errors']))
+        previous = (baseline or {}).get(name)
+        if previous:
+            print('%-20s %8s %+8.1f%% %+8.1f%% %+8.1f%% %+8.1f%%' % (
+                '  vs baseline', '',
+                _delta(previous['throughput_rps'], stats['throughput_rps']),
+                _delta(previous['p50_ms'], stats['p50_ms']),
+                _delta(previous['p95_ms'], stats['p95_ms']),
+                _delta(previous['p99_ms'], stats['p99_ms'])))
+
+
+def load_results(path):
+    """Load the ``results`` section of a previous results file."""
+    with open(path) as handle:
+        return json.load(handle).get('results', {})
+
+
+def _delta(before, after):
+    if not before:
+        return 0.0
+    return (after - before) / before * 100.0
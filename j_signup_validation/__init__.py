@@ -5,4 +5,12 @@ Main initialization file for the custom user registration module.
 """
 
 from . import models
-from . import controllers
\ No newline at end of file
+from . import controllers
+
+def post_load():
+    """
+    Install the signup validation fast path when enabled in the server
+    configuration (see controllers/fast_validation.py).
+    """
+    from .controllers import fast_validation
+    fast_validation.install()
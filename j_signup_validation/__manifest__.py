@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 {
     'name': 'J Signup Validation',
-    'version': '17.0.1.0.0',
+    'version': '17.0.1.3.0',
     'category': 'Authentication',
     'summary': 'Custom user registration with advanced email/phone/password validation',
     'description': """
@@ -22,6 +22,7 @@
         'portal',
         'base_setup',
         'mail',
+        'website',
     ],
     'external_dependencies': {
         'python': [
@@ -35,22 +36,31 @@
         'security/ir.model.access.csv',
         'views/auth_login_templates.xml',
         'views/saas_user_views.xml',
+        'views/saas_user_archive_views.xml',
+        'views/saas_user_stats_views.xml',
         'views/res_users_views.xml',
         'views/res_config_settings_views.xml',
         'views/signup_configuration_views.xml',
+        'views/signup_trusted_domain_views.xml',
         'data/mail_templates.xml',
+        'data/ir_cron.xml',
     ],
     'assets': {
-        'web.assets_frontend': [
+        # Loaded by the signup page only (custom_signup_form), never by the
+        # global bundles; see scripts/check_signup_assets.py
+        'j_signup_validation.assets_signup': [
             'j_signup_validation/static/src/css/signup_form.css',
+            'j_signup_validation/static/src/js/signup_rpc.js',
             'j_signup_validation/static/src/js/password_strength.js',
-            'j_signup_validation/static/src/js/signup_validation.js',
             'j_signup_validation/static/src/js/country_phone_selector.js',
-        ],
-        'web.assets_backend': [
-            'j_signup_validation/static/src/css/signup_form.css',
+            'j_signup_validation/static/src/js/signup_field_typeahead.js',
+            'j_signup_validation/static/src/js/signup_upload.js',
+            'j_signup_validation/static/src/js/signup_validation.js',
         ],
     },
+    # Enables the validation fast path when signup_fast_validation is set
+    # in the server configuration
+    'post_load': 'post_load',
     'installable': True,
     'auto_install': False,
     'application': False,
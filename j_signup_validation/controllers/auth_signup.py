@@ -4,6 +4,7 @@ Authentication and Signup Controllers
 Custom controllers for handling user registration with advanced validation.
 """
 
+import hashlib
 import json
 import logging
 import re
@@ -11,35 +12,35 @@ import time
 from odoo import http, _
 from odoo.http import request
 from odoo.exceptions import ValidationError, UserError
+from psycopg2.errors import UniqueViolation
+from werkzeug import urls
 from werkzeug.exceptions import BadRequest
 
-# External validation libraries
-try:
-    from verify_email import verify_email
-except ImportError:
-    verify_email = None
-
-try:
-    from disposable_email_validator import is_disposable_email
-except ImportError:
-    is_disposable_email = None
-
-try:
-    import phonenumbers
-    from phonenumbers import NumberParseException
-except ImportError:
-    phonenumbers = None
-
-try:
-    import dns.resolver
-    DNS_AVAILABLE = True
-except ImportError:
-    DNS_AVAILABLE = False
-    dns = None
+from ..models.signup_idempotency import idempotency_key_hash
+from ..models.signup_trusted_domain import allowlist_hits
+from ..tools import signup_validators, validation_tokens
+from ..tools.signup_validators import EMAIL_CHECK_TIMEOUT, submit_check
+from ..tools.validation_pipeline import (
+    COST_CPU, COST_DATABASE, COST_FREE, COST_NETWORK,
+    ValidationContext, ValidationPipeline, ValidationStep,
+)
 
 _logger = logging.getLogger(__name__)
 
 
+def throttled_payload(retry_after):
+    """
+    429-style JSON payload answered to a throttled validation request.
+    """
+    return {
+        'valid': False,
+        'throttled': True,
+        'status': 429,
+        'retry_after': retry_after,
+        'messages': [_('Too many validation requests. Please wait %s seconds and try again.') % retry_after]
+    }
+
+
 class CustomAuthSignup(http.Controller):
     """
     Custom authentication controller for handling signup with validation.
@@ -68,21 +69,22 @@ class CustomAuthSignup(http.Controller):
             email_rules = config_settings.get_email_validation_rules()
             phone_rules = config_settings.get_phone_validation_rules()
             
-            # Get countries for phone number selection
-            countries = request.env['res.country'].sudo().search([
-                ('phone_code', '!=', False)
-            ], order='name')
+            # Only the default country is rendered; the picker loads the
+            # full list from the cached countries endpoint
+            default_country = request.env.ref('base.sa', raise_if_not_found=False)
             
             # Get dynamic fields configuration
-            dynamic_fields = request.env['signup.configuration'].sudo().get_dynamic_fields()
+            dynamic_fields = self._get_dynamic_fields()
             
             # Prepare context for template
             values = {
                 'password_rules': password_rules,
                 'email_rules': email_rules,
                 'phone_rules': phone_rules,
-                'countries': countries,
+                'default_country': default_country,
+                'countries_url': self._countries_url(),
                 'dynamic_fields': dynamic_fields,
+                'upload_rules': config_settings.get_upload_settings(),
                 'error': kw.get('error', ''),
                 'success': kw.get('success', ''),
             }
@@ -95,14 +97,52 @@ class CustomAuthSignup(http.Controller):
 
     @http.route(['/j_signup_validation/submit'], type='http', auth='public', methods=['POST'], csrf=False)
     def web_auth_signup_submit(self, **post):
+        """
+        Process signup form submission, once per idempotency key.
+        Repeated submissions of a form replay the response of the first one
+        without validating again or touching saas.user. Only successful
+        outcomes are kept: a rejected submission releases its key, so the
+        corrected form is processed even when the browser sends the same key.
+        """
+        email = post.get('email', '').strip().lower()
+        key_hash = idempotency_key_hash(post.get('idempotency_key'), email)
+        if key_hash:
+            idempotency = request.env['signup.idempotency'].sudo()
+            claimed, outcome = idempotency.claim(key_hash)
+            if not claimed:
+                _logger.info(f"Replaying signup submission for email: {email}")
+                if outcome:
+                    return request.redirect(outcome)
+                return self._redirect_with_success(_('Your registration is being processed.'))
+        
+        response = self._process_signup_submission(email, post)
+        
+        if key_hash:
+            if self._is_error_redirect(response):
+                idempotency.release(key_hash)
+            else:
+                idempotency.record_outcome(key_hash, response.location)
+        return response
+
+    def _process_signup_submission(self, email, post):
         """
         Process signup form submission with validation.
         """
         try:
-            email = post.get('email', '').strip().lower()
             request_id = f"{email}_{int(time.time() * 1000)}"
             _logger.info(f"Processing signup submission for email: {email}, request ID: {request_id}")
             
+            # Registration velocity counters run before any costly check
+            velocity_action = self._check_signup_velocity()
+            if velocity_action == 'block':
+                return self._redirect_with_error(_('Too many registrations from your network. Please try again later.'))
+            
+            # Concurrent submissions for the same email fail here, before
+            # any validation work; other emails never contend
+            if not self._lock_signup_email(email):
+                _logger.warning(f"Concurrent signup attempt for email: {email}, request ID: {request_id}")
+                return self._redirect_with_error(_('A registration for this email address is already in progress. Please wait a moment and try to login.'))
+            
             # COMPREHENSIVE DUPLICATE PREVENTION - Check for existing users first
             with request.env.cr.savepoint():
                 # Check for existing SaaS user
@@ -123,6 +163,14 @@ class CustomAuthSignup(http.Controller):
             # Validate all form fields
             validation_result = self._validate_signup_data(form_data)
             
+            # The email domain counts only for deliverable addresses
+            if validation_result['email_deliverable']:
+                domain_action = self._check_signup_domain_velocity(email)
+                if domain_action == 'block' and validation_result['valid']:
+                    return self._redirect_with_error(_('Too many registrations for this email domain. Please try again later.'))
+                velocity_action = velocity_action or domain_action
+            form_data['velocity_verification'] = velocity_action == 'verify'
+            
             if not validation_result['valid']:
                 _logger.warning(f"Signup validation failed: {validation_result['errors']}")
                 return self._redirect_with_error(validation_result['errors'])
@@ -137,6 +185,11 @@ class CustomAuthSignup(http.Controller):
                 
                 _logger.info(f"Successfully created SaaS user {saas_user.id} and portal user {portal_user.id}")
             
+            if self._requires_email_verification(form_data):
+                # The verification email is rendered and sent by cron, never inline
+                request.env['saas.user'].sudo()._trigger_verification_emails()
+                return self._redirect_with_success(_('Registration successful! Please check your email for verification.'))
+            
             # Auto-login if configured
             if self._should_auto_login():
                 self._auto_login_user(portal_user)
@@ -151,11 +204,138 @@ class CustomAuthSignup(http.Controller):
             _logger.error(f"Unexpected error during signup: {str(e)}")
             return self._redirect_with_error(_('Registration failed. Please try again.'))
 
+    @http.route('/j_signup_validation/verify', type='http', auth='public', methods=['GET'], sitemap=False)
+    def verify_email_link(self, token=None, **kw):
+        """
+        Activate an account from the link of the verification email.
+        """
+        status, saas_user = request.env['saas.user'].sudo().verify_email_token(token)
+        
+        if status == 'verified':
+            return request.redirect('/web/login?' + urls.url_encode({
+                'login': saas_user.su_email,
+                'message': _('Your email address has been verified. You can now log in.'),
+            }))
+        if status == 'already_verified':
+            return request.redirect('/web/login?' + urls.url_encode({'login': saas_user.su_email}))
+        if status == 'expired':
+            return self._redirect_with_error(_('This verification link has expired. Please contact support to receive a new one.'))
+        return self._redirect_with_error(_('This verification link is not valid.'))
+
+    @http.route('/j_signup_validation/countries.json', type='http', auth='public', methods=['GET'], csrf=False, sitemap=False)
+    def signup_countries(self, lang=None, v=None, **kw):
+        """
+        Compact country list for the phone country picker.
+        Versioned URLs (``v`` matching the content hash) are cached for a
+        year; other requests revalidate with the ETag.
+        """
+        countries = self._country_model(lang)
+        data = countries._get_signup_country_data()
+        
+        headers = [
+            ('ETag', f'"{data["etag"]}"'),
+            ('Cache-Control', 'public, max-age=31536000, immutable' if v == data['etag'] else 'public, no-cache'),
+        ]
+        if request.httprequest.if_none_match.contains(data['etag']):
+            return request.make_response(b'', headers=headers, status=304)
+        
+        headers.append(('Content-Type', 'application/json; charset=utf-8'))
+        return request.make_response(data['payload'], headers=headers)
+
+    @http.route('/j_signup_validation/countries/search', type='json', auth='public')
+    def search_signup_countries(self, query='', limit=20, lang=None):
+        """
+        Prefix search for the country picker typeahead.
+        """
+        throttled = self._check_rate_limit()
+        if throttled:
+            return throttled
+        
+        countries = self._country_model(lang)
+        return {'countries': countries.search_signup_countries(query, min(int(limit or 20), 50))}
+
+    @http.route('/j_signup_validation/field_options', type='json', auth='public')
+    def search_field_options(self, field_id, query='', offset=0, limit=20):
+        """
+        Paginated search of the records of a many2one dynamic field too large
+        to be embedded in the signup page.
+        """
+        throttled = self._check_rate_limit()
+        if throttled:
+            return throttled
+        
+        try:
+            result = request.env['signup.configuration'].sudo().search_field_options(
+                int(field_id), query=(query or '').strip(), offset=offset, limit=limit, **self._signup_scope())
+        except (TypeError, ValueError):
+            result = None
+        return result or {'options': [], 'more': False}
+
+    @http.route('/j_signup_validation/upload/start', type='json', auth='public')
+    def signup_upload_start(self, field_id, filename='', size=0, mimetype=''):
+        """
+        Open a chunked upload for a file field of the signup form.
+        """
+        throttled = self._check_rate_limit()
+        if throttled:
+            return throttled
+        
+        try:
+            upload = request.env['signup.upload'].sudo().start(
+                int(field_id), filename, int(size), mimetype, **self._signup_scope())
+        except (TypeError, ValueError):
+            return {'ok': False, 'message': _('Invalid upload request')}
+        except ValidationError as e:
+            return {'ok': False, 'message': str(e)}
+        return dict(upload, ok=True)
+
+    @http.route('/j_signup_validation/upload/chunk', type='http', auth='public', methods=['POST'], csrf=False, save_session=False)
+    def signup_upload_chunk(self, token='', offset='0', **kw):
+        """
+        Receive a chunk of an upload as the raw request body, streamed to the
+        filestore. Authenticated by the signed upload token.
+        """
+        httprequest = request.httprequest
+        if httprequest.content_length is None:
+            return request.make_json_response({'ok': False, 'message': _('Missing chunk length')}, status=411)
+        
+        try:
+            result = request.env['signup.upload'].sudo().write_chunk(
+                token, int(offset), httprequest.stream, httprequest.content_length)
+        except ValueError:
+            return request.make_json_response({'ok': False, 'message': _('Invalid upload request')}, status=400)
+        except ValidationError as e:
+            return request.make_json_response({'ok': False, 'message': str(e)}, status=422)
+        return request.make_json_response(dict(result, ok=True))
+
+    def _country_model(self, lang=None):
+        """
+        res.country in the requested language when it is installed, else the
+        request's language.
+        """
+        countries = request.env['res.country'].sudo()
+        if lang and lang in dict(request.env['res.lang'].get_installed()):
+            countries = countries.with_context(lang=lang)
+        return countries
+
+    def _countries_url(self):
+        """
+        Versioned URL of the country list in the request's language, changing
+        whenever the list does.
+        """
+        lang = request.env.lang or 'en_US'
+        data = request.env['res.country'].sudo().with_context(lang=lang)._get_signup_country_data()
+        return '/j_signup_validation/countries.json?' + urls.url_encode({'lang': lang, 'v': data['etag']})
+
     @http.route('/j_signup_validation/validate_email', type='json', auth='public')
     def validate_email_ajax(self, email):
         """
         AJAX endpoint for real-time email validation.
         """
+        throttled = self._check_rate_limit()
+        if throttled:
+            return throttled
+        
         try:
             _logger.info(f"Validating email via AJAX: {email}")
             
@@ -163,11 +343,9 @@ class CustomAuthSignup(http.Controller):
             email_rules = config_settings.get_email_validation_rules()
             
             validation_result = self._validate_email(email, email_rules)
-            
-            return {
-                'valid': validation_result['valid'],
-                'messages': validation_result['messages']
-            }
+            return self._email_ajax_result(
+                email, validation_result,
+                lambda value: self._sign_validation_token('email', value, email_rules))
             
         except Exception as e:
             _logger.error(f"Error in AJAX email validation: {str(e)}")
@@ -181,6 +359,10 @@ class CustomAuthSignup(http.Controller):
         """
         AJAX endpoint for real-time phone validation.
         """
+        throttled = self._check_rate_limit()
+        if throttled:
+            return throttled
+        
         try:
             _logger.info(f"Validating phone via AJAX: {phone}, Country ID: {country_id}")
             
@@ -197,12 +379,14 @@ class CustomAuthSignup(http.Controller):
             
             validation_result = self._validate_phone(phone, phone_rules, country_id)
             
-            return {
-                'valid': validation_result['valid'],
-                'messages': validation_result['messages'],
-                'formatted': validation_result.get('formatted', phone),
-                'phone_type': validation_result.get('phone_type', 'unknown')
-            }
+            if validation_result['valid']:
+                duplicate_messages = self._check_phone_duplicate(validation_result.get('e164'), phone_rules)
+                if duplicate_messages:
+                    validation_result.update(valid=False, messages=duplicate_messages)
+            
+            return self._phone_ajax_result(
+                phone, country_id, validation_result,
+                lambda value, extra: self._sign_validation_token('phone', value, phone_rules, extra=extra))
             
         except Exception as e:
             _logger.error(f"Error in AJAX phone validation: {str(e)}")
@@ -216,6 +400,11 @@ class CustomAuthSignup(http.Controller):
         """
         AJAX endpoint for real-time password strength validation.
         """
+        throttled = self._check_rate_limit()
+        if throttled:
+            throttled['score'] = 0
+            return throttled
+        
         try:
             _logger.info("Validating password strength via AJAX")
             
@@ -236,6 +425,102 @@ class CustomAuthSignup(http.Controller):
                 'messages': [_('Password validation service temporarily unavailable')]
             }
 
+    def _email_ajax_result(self, email, validation_result, sign):
+        """
+        JSON answer of the email validator, with a signed verdict when valid.
+        
+        Args:
+            sign (callable): Signs the verdict for the normalized email
+        """
+        result = {
+            'valid': validation_result['valid'],
+            'messages': validation_result['messages']
+        }
+        if validation_result['valid']:
+            result['token'] = sign(email.strip().lower())
+        return result
+
+    def _phone_ajax_result(self, phone, country_id, validation_result, sign):
+        """
+        JSON answer of the phone validator, with a signed verdict when valid.
+        
+        Args:
+            sign (callable): Signs the verdict for a token value and its extra data
+        """
+        result = {
+            'valid': validation_result['valid'],
+            'messages': validation_result['messages'],
+            'formatted': validation_result.get('formatted', phone),
+            'phone_type': validation_result.get('phone_type', 'unknown')
+        }
+        if validation_result['valid']:
+            result['token'] = sign(
+                self._phone_token_value(result['formatted'], country_id),
+                {'f': result['formatted'], 't': result['phone_type'], 'e': validation_result.get('e164')},
+            )
+        return result
+
+    def _get_dynamic_fields(self):
+        """
+        Dynamic fields of the signup configuration of the current website,
+        resolved through the cached configuration map.
+        """
+        return request.env['signup.configuration'].sudo().get_dynamic_fields(**self._signup_scope())
+
+    def _signup_scope(self):
+        """
+        Website and company selecting the signup configuration of the request.
+        """
+        website = request.env['website'].sudo().get_current_website()
+        return {
+            'website_id': website.id or None,
+            'company_id': (website.company_id or request.env.company).id,
+        }
+
+    def _field_option_exists(self, field_config, record_id):
+        """
+        Whether a record is a valid choice of a many2one dynamic field.
+        """
+        return request.env['signup.configuration'].sudo().field_option_exists(
+            field_config['field_id'], record_id, **self._signup_scope())
+
+    def _check_rate_limit(self):
+        """
+        Apply the per-IP and per-session token buckets to a validation request.
+        
+        Returns:
+            dict: 429-style JSON payload if the client is throttled, else None
+        """
+        retry_after = request.env['signup.rate.limit'].sudo().check_rate_limit(
+            request.httprequest.remote_addr,
+            request.session.sid,
+        )
+        if not retry_after:
+            return None
+        return throttled_payload(retry_after)
+
+    def _check_signup_velocity(self):
+        """
+        Count a signup submission in the per-IP and per-network velocity
+        counters.
+        
+        Returns:
+            str: 'block' or 'verify' if a limit is exceeded, else None
+        """
+        verdict = request.env['signup.velocity'].sudo().record_attempt(ip_address=request.httprequest.remote_addr)
+        return verdict['action']
+
+    def _check_signup_domain_velocity(self, email):
+        """
+        Count a signup submission with a deliverable address in the
+        per-domain velocity counter; trusted domains are not counted.
+        
+        Returns:
+            str: 'block' or 'verify' if the limit is exceeded, else None
+        """
+        verdict = request.env['signup.velocity'].sudo().record_attempt(email=email)
+        return verdict['action']
+
     def _extract_form_data(self, post):
         """
         Extract and sanitize form data from POST request.
@@ -251,12 +536,14 @@ class CustomAuthSignup(http.Controller):
             'confirm_password': post.get('confirm_password', ''),
             'account_type': post.get('account_type', 'individual').strip(),
             'vat_cr_number': post.get('vat_cr_number', '').strip(),
+            'email_validation_token': post.get('email_validation_token', ''),
+            'phone_validation_token': post.get('phone_validation_token', ''),
             'registration_ip': request.httprequest.environ.get('REMOTE_ADDR'),
             'user_agent': request.httprequest.environ.get('HTTP_USER_AGENT'),
         }
         
         # Extract dynamic fields
-        dynamic_fields = request.env['signup.configuration'].sudo().get_dynamic_fields()
+        dynamic_fields = self._get_dynamic_fields()
         form_data['dynamic_fields'] = {}
         
         for field_config in dynamic_fields:
@@ -277,8 +564,16 @@ class CustomAuthSignup(http.Controller):
                 except ValueError:
                     field_value = 0.0
             elif field_config['field_type'] == 'binary':
-                # Handle file uploads
-                field_value = post.get(field_name, None)
+                # Files are uploaded beforehand: only their reference is posted
+                field_value = request.env['signup.upload'].sudo().resolve_reference(
+                    str(field_value), field_config['field_id']) if field_value else False
+            elif field_config['field_type'] == 'many2one':
+                try:
+                    field_value = int(field_value) if field_value else False
+                except ValueError:
+                    field_value = False
+            elif field_config['field_type'] == 'selection':
+                field_value = str(field_value).strip() or False
             else:
                 # Default to string processing
                 field_value = str(field_value).strip() if field_value else ''
@@ -290,13 +585,70 @@ class CustomAuthSignup(http.Controller):
     def _validate_signup_data(self, form_data):
         """
         Comprehensive validation of signup data.
+        Runs the steps of ``_signup_validation_steps`` through the validation
+        pipeline: cheap checks first, costly ones skipped once the submission
+        is rejected unless all errors are to be reported.
         """
-        errors = []
-        email_validation = {'valid': False}
-        phone_validation = {'valid': False}
-        password_validation = {'valid': False, 'score': 0}
+        config_settings = request.env['res.config.settings']
+        config = request.env['ir.config_parameter'].sudo()
+        context = ValidationContext(
+            form_data,
+            email_rules=config_settings.get_email_validation_rules(),
+            phone_rules=config_settings.get_phone_validation_rules(),
+            password_score=0,
+        )
+        report_all = config.get_param('j_signup_validation.validation_report_all_errors', 'False') == 'True'
         
-        # Basic field validation
+        steps = self._signup_validation_steps(form_data)
+        ValidationPipeline(steps).run(context, report_all=report_all, timeout=EMAIL_CHECK_TIMEOUT)
+        errors = context.errors(steps)
+        
+        _logger.info(f"Signup validation outcomes: {context.outcomes}")
+        
+        return {
+            'valid': len(errors) == 0,
+            'errors': errors,
+            'password_score': context.state['password_score'],
+            'email_validated': bool(form_data['email']) and context.passed(
+                'email_syntax', 'email_mx', 'email_disposable', 'email_duplicate'),
+            'email_deliverable': bool(form_data['email']) and context.passed('email_syntax', 'email_mx'),
+            'phone_validated': bool(form_data['phone']) and context.passed('phone'),
+        }
+
+    def _signup_validation_steps(self, form_data):
+        """
+        Validation steps run on signup submission.
+        Modules extending this controller can register additional checks by
+        overriding this method and appending ``ValidationStep`` instances to
+        the list returned by ``super()``.
+        
+        Returns:
+            list: ValidationStep instances
+        """
+        return [
+            ValidationStep('required_fields', self._step_required_fields, COST_FREE, sequence=10),
+            ValidationStep('password_match', self._step_password_match, COST_FREE, sequence=20),
+            ValidationStep('email_syntax', self._step_email_syntax, COST_FREE, sequence=30),
+            ValidationStep('email_mx', self._step_email_mx, COST_NETWORK,
+                           depends=('email_syntax',), sequence=31, parallel=True),
+            ValidationStep('email_disposable', self._step_email_disposable, COST_NETWORK,
+                           depends=('email_syntax',), sequence=32, parallel=True),
+            ValidationStep('email_duplicate', self._step_email_duplicate, COST_DATABASE,
+                           depends=('email_syntax',), sequence=33),
+            ValidationStep('phone', self._step_phone, COST_CPU, sequence=40),
+            ValidationStep('phone_duplicate', self._step_phone_duplicate, COST_DATABASE,
+                           depends=('phone',), sequence=45),
+            ValidationStep('password_strength', self._step_password_strength, COST_CPU, sequence=50),
+            ValidationStep('vat_cr', self._step_vat_cr, COST_FREE, sequence=60),
+            ValidationStep('dynamic_fields', self._step_dynamic_fields, COST_DATABASE, sequence=70),
+        ]
+
+    def _step_required_fields(self, context):
+        """
+        Required fields based on account type, and common required fields.
+        """
+        form_data = context.form_data
+        errors = []
         account_type = form_data.get('account_type', 'individual')
         
         # Validate required fields based on account type
@@ -316,399 +668,350 @@ class CustomAuthSignup(http.Controller):
             errors.append(_('Phone number is required'))
         if not form_data['password']:
             errors.append(_('Password is required'))
-        if form_data['password'] != form_data['confirm_password']:
-            errors.append(_('Passwords do not match'))
+        return errors
+
+    def _step_password_match(self, context):
+        if context.form_data['password'] != context.form_data['confirm_password']:
+            return [_('Passwords do not match')]
+        return []
+
+    def _email_token_verdict(self, context):
+        """
+        Signed verdict of the AJAX email check, verified once per submission.
+        """
+        if 'email_token' not in context.state:
+            form_data = context.form_data
+            context.state['email_token'] = self._verify_validation_token(
+                form_data.get('email_validation_token'), 'email', form_data['email'], context.state['email_rules'])
+            if context.state['email_token']:
+                _logger.info(f"Reusing signed email verdict for {form_data['email']}")
+        return context.state['email_token']
+
+    def _step_email_syntax(self, context):
+        email = context.form_data['email']
+        if email and not self._email_syntax_valid(email, context.state['email_rules']):
+            return [_('Invalid email address format')]
+        return []
+
+    def _step_email_mx(self, context):
+        email = context.form_data['email']
+        domain = email.split('@')[1] if '@' in email else ''
+        if not domain or not context.state['email_rules'].get('mx_verification', True) \
+                or self._email_token_verdict(context) or self._email_domain_trusted(context):
+            return []
+        return submit_check(lambda: self._check_email_domain(domain)['messages'])
+
+    def _step_email_disposable(self, context):
+        email = context.form_data['email']
+        if not email or not context.state['email_rules'].get('disposable_check', True) \
+                or self._email_token_verdict(context) or self._email_domain_trusted(context):
+            return []
+        settings = self._get_disposable_email_settings()
+        return submit_check(lambda: self._check_disposable_email(email, settings)['messages'])
+
+    def _email_domain_trusted(self, context):
+        """
+        Allowlist lookup of the submitted email, done once per submission.
+        """
+        if 'email_trusted' not in context.state:
+            settings = signup_validators.EmailSettings(trusted_domains=self._trusted_email_domains())
+            context.state['email_trusted'] = self._email_allowlisted(context.form_data['email'], settings)
+        return context.state['email_trusted']
+
+    def _step_email_duplicate(self, context):
+        email = context.form_data['email']
+        if email and request.env['saas.user'].sudo().search([('su_email', '=', email)], limit=1):
+            return [_('An account with this email address already exists')]
+        return []
+
+    def _step_phone(self, context):
+        """
+        Phone validation against the selected country, reusing the signed
+        verdict of the AJAX check when it matches.
+        """
+        form_data = context.form_data
+        if not form_data['phone']:
+            return []
+        phone_rules = context.state['phone_rules']
         
-        # Email validation
-        if form_data['email']:
-            config_settings = request.env['res.config.settings']
-            email_rules = config_settings.get_email_validation_rules()
-            email_validation = self._validate_email(form_data['email'], email_rules)
-            if not email_validation['valid']:
-                errors.extend(email_validation['messages'])
+        # Debug logging for phone country issue
+        phone_country = form_data.get('phone_country')
+        _logger.info(f"Phone validation debug - Phone: {form_data['phone']}, Country: {phone_country}, Type: {type(phone_country)}")
         
-        # Phone validation
-        if form_data['phone']:
-            config_settings = request.env['res.config.settings']
-            phone_rules = config_settings.get_phone_validation_rules()
-            
-            # Debug logging for phone country issue
-            phone_country = form_data.get('phone_country')
-            _logger.info(f"Phone validation debug - Phone: {form_data['phone']}, Country: {phone_country}, Type: {type(phone_country)}")
-            
-            # Only use default Saudi Arabia if NO country is provided at all
-            if not phone_country or phone_country == '' or phone_country == 'None':
-                default_country = request.env.ref('base.sa', raise_if_not_found=False)
-                if default_country:
-                    phone_country = default_country.id
-                    _logger.info(f"No country provided - using default Saudi Arabia country ID: {phone_country}")
-            else:
-                _logger.info(f"User selected country ID: {phone_country}")
-            
-            phone_validation = self._validate_phone(form_data['phone'], phone_rules, phone_country)
-            if not phone_validation['valid']:
-                errors.extend(phone_validation['messages'])
-            else:
-                # Store phone type for later use in portal user creation
-                form_data['phone_type'] = phone_validation.get('phone_type', 'unknown')
-                form_data['formatted_phone'] = phone_validation.get('formatted', form_data['phone'])
-        
-        # Password validation
-        if form_data['password']:
-            config_settings = request.env['res.config.settings']
-            password_validation = config_settings.validate_password_strength(form_data['password'])
-            if not password_validation['valid']:
-                errors.extend(password_validation['messages'])
+        # Only use default Saudi Arabia if NO country is provided at all
+        if not phone_country or phone_country == '' or phone_country == 'None':
+            default_country = request.env.ref('base.sa', raise_if_not_found=False)
+            if default_country:
+                phone_country = default_country.id
+                _logger.info(f"No country provided - using default Saudi Arabia country ID: {phone_country}")
+        else:
+            _logger.info(f"User selected country ID: {phone_country}")
         
-        # VAT/CR validation for company accounts
-        if form_data.get('account_type') == 'company':
-            vat_cr = form_data.get('vat_cr_number', '').strip()
-            if not vat_cr:
-                errors.append(_('VAT/CR number is required for company accounts'))
-            elif len(vat_cr) < 10 or not re.match(r'^[A-Za-z0-9]+$', vat_cr):
-                errors.append(_('VAT/CR number must be at least 10 alphanumeric characters'))
+        phone_token = self._verify_validation_token(
+            form_data.get('phone_validation_token'), 'phone',
+            self._phone_token_value(form_data['phone'], phone_country), phone_rules)
+        if phone_token:
+            _logger.info(f"Reusing signed phone verdict for {form_data['phone']}")
+            phone_validation = {
+                'valid': True,
+                'messages': [],
+                'formatted': phone_token['x']['f'],
+                'phone_type': phone_token['x']['t'],
+                'e164': phone_token['x'].get('e'),
+            }
+        else:
+            phone_validation = self._validate_phone(form_data['phone'], phone_rules, phone_country)
+        if not phone_validation['valid']:
+            return phone_validation['messages']
         
-        # Dynamic fields validation
-        self._validate_dynamic_fields(form_data, errors)
+        # Store phone type for later use in portal user creation
+        form_data['phone_type'] = phone_validation.get('phone_type', 'unknown')
+        form_data['formatted_phone'] = phone_validation.get('formatted', form_data['phone'])
+        form_data['phone_e164'] = phone_validation.get('e164')
+        return []
+
+    def _step_phone_duplicate(self, context):
+        return self._check_phone_duplicate(context.form_data.get('phone_e164'), context.state['phone_rules'])
+
+    def _check_phone_duplicate(self, e164, rules, phone_registered=None):
+        """
+        Reject an already registered phone number when the uniqueness
+        policy is enabled: one probe of the normalized phone index.
         
-        return {
-            'valid': len(errors) == 0,
-            'errors': errors,
-            'password_score': password_validation.get('score', 0),
-            'email_validated': email_validation.get('valid', False),
-            'phone_validated': phone_validation.get('valid', False),
-        }
+        Returns:
+            list: Error messages
+        """
+        return list(signup_validators.check_phone_duplicate(
+            e164, signup_validators.PhoneSettings.from_rules(rules), phone_registered or self._phone_registered))
+
+    def _phone_registered(self, e164):
+        return bool(request.env['saas.user'].sudo().with_context(active_test=False).search_count(
+            [('su_phone_e164', '=', e164)], limit=1))
+
+    def _step_password_strength(self, context):
+        if not context.form_data['password']:
+            return []
+        password_validation = request.env['res.config.settings'].validate_password_strength(context.form_data['password'])
+        context.state['password_score'] = password_validation.get('score', 0)
+        return password_validation['messages'] if not password_validation['valid'] else []
 
-    def _check_disposable_email(self, email):
+    def _step_vat_cr(self, context):
         """
-        Check if email is disposable using configured method (library or API).
+        VAT/CR validation for company accounts.
         """
-        messages = []
-        
-        # Get temp mail detection configuration
-        config = request.env['ir.config_parameter'].sudo()
-        detection_method = config.get_param('j_signup_validation.temp_mail_detection_method', 'library')
-        
-        try:
-            if detection_method == 'api':
-                # Use TempMailDetector API
-                api_key = config.get_param('j_signup_validation.temp_mail_api_key', '')
-                if not api_key:
-                    _logger.warning("TempMailDetector API key not configured, falling back to library method")
-                    return self._check_disposable_email_library(email)
-                
-                return self._check_disposable_email_api(email, api_key)
-            else:
-                # Use library method (default)
-                return self._check_disposable_email_library(email)
-                
-        except Exception as e:
-            _logger.warning(f"Disposable email check failed for {email}: {str(e)}")
-            # If both methods fail, allow the email (don't block legitimate users)
-            return {'valid': True, 'messages': []}
+        if context.form_data.get('account_type') != 'company':
+            return []
+        vat_cr = context.form_data.get('vat_cr_number', '').strip()
+        if not vat_cr:
+            return [_('VAT/CR number is required for company accounts')]
+        if len(vat_cr) < 10 or not re.match(r'^[A-Za-z0-9]+$', vat_cr):
+            return [_('VAT/CR number must be at least 10 alphanumeric characters')]
+        return []
+
+    def _step_dynamic_fields(self, context):
+        errors = []
+        self._validate_dynamic_fields(context.form_data, errors)
+        return errors
 
-    def _check_disposable_email_library(self, email):
+    def _validation_settings_version(self, kind, rules):
         """
-        Check disposable email using disposable_email_validator library.
+        Fingerprint of the settings a verdict was computed with, so tokens
+        issued before a settings change are no longer accepted.
         """
-        messages = []
-        
-        try:
-            if is_disposable_email(email):
-                messages.append(_('Temporary or disposable email addresses are not allowed'))
-                return {'valid': False, 'messages': messages}
-        except Exception as e:
-            _logger.warning(f"Library disposable email check failed for {email}: {str(e)}")
-        
-        return {'valid': True, 'messages': messages}
+        detection_method = None
+        if kind == 'email':
+            detection_method = self._get_disposable_email_settings()['method']
+        return validation_tokens.settings_version(kind, rules, detection_method)
 
-    def _check_disposable_email_api(self, email, api_key):
+    def _phone_token_value(self, phone, country_id):
         """
-        Check disposable email using TempMailDetector API.
+        Normalized phone value a token is bound to: the country and the digits,
+        so the formatted number written back by the form still matches.
         """
-        import json
-        import requests
+        return f"{country_id or ''}:{re.sub(r'[^0-9+]', '', phone or '')}"
+
+    def _validation_token_secret(self):
+        return request.env['ir.config_parameter'].sudo().get_param('database.secret')
+
+    def _sign_validation_token(self, kind, value, rules, extra=None):
+        """
+        Create a short-lived HMAC-signed token for a positive verdict.
         
-        messages = []
-        domain = email.split('@')[1].lower()
+        Args:
+            kind (str): 'email' or 'phone'
+            value (str): Normalized value the verdict applies to
+            rules (dict): Validation rules used to compute the verdict
+            extra (dict): Additional verdict data to carry (e.g. phone format)
+            
+        Returns:
+            str: Token to be sent back with the signup form
+        """
+        return validation_tokens.sign_token(
+            self._validation_token_secret(), kind, value, self._validation_settings_version(kind, rules), extra)
+
+    def _verify_validation_token(self, token, kind, value, rules):
+        """
+        Check a token returned by an AJAX validator against the submitted value.
         
-        try:
-            API_URL = "https://api.tempmaildetector.com/check"
-            CONTENT_TYPE = "application/json"
-            request_body = json.dumps({"domain": domain})
-            headers = {
-                "Content-Type": CONTENT_TYPE,
-                "Authorization": api_key,
-            }
+        Returns:
+            dict: Token payload if it is authentic, unexpired, positive and bound
+                  to this value and the current settings, else None
+        """
+        payload, problem = validation_tokens.verify_token(
+            self._validation_token_secret(), token, kind, value, self._validation_settings_version(kind, rules))
+        if problem == 'signature':
+            _logger.warning(f"Rejected {kind} validation token with invalid signature")
+        elif problem:
+            _logger.warning(f"Malformed {kind} validation token")
+        return payload
 
-            response = requests.post(API_URL, data=request_body, headers=headers, timeout=10)
+    def _get_disposable_email_settings(self, env=None):
+        """
+        Read the disposable email detection settings on the request thread.
+        
+        Returns:
+            dict: Detection method, API key and API URL
+        """
+        return (env or request.env)['res.config.settings'].get_disposable_email_settings()
 
-            if response.status_code != 200:
-                _logger.warning(f"TempMailDetector API returned {response.status_code}: {response.text}")
-                # Fall back to library method on API failure
-                return self._check_disposable_email_library(email)
+    def _email_settings(self, rules, disposable_settings=None):
+        """
+        Email validator settings from the rules, reading the disposable email
+        detection parameters unless given.
+        """
+        if disposable_settings is None and rules.get('disposable_check', True):
+            disposable_settings = self._get_disposable_email_settings()
+        return signup_validators.EmailSettings.from_rules(rules, disposable_settings, self._trusted_email_domains())
 
-            response_data = response.json()
-            _logger.info(f'TempMailDetector response for {domain}: {response_data}')
-            
-            # Check if domain is in block list or has suspicious characteristics
-            meta = response_data.get('meta', {})
-            score = response_data.get('score', 0)
-            
-            # Block if domain is in block list or has high suspicion score
-            if meta.get('block_list', False) or score >= 90:
-                messages.append(_('Temporary or disposable email addresses are not allowed'))
-                return {'valid': False, 'messages': messages}
-                
-        except requests.exceptions.Timeout:
-            _logger.warning(f"TempMailDetector API timeout for {domain}")
-            # Fall back to library method on timeout
-            return self._check_disposable_email_library(email)
-        except Exception as e:
-            _logger.warning(f"TempMailDetector API check failed for {domain}: {str(e)}")
-            # Fall back to library method on API error
-            return self._check_disposable_email_library(email)
-        
-        return {'valid': True, 'messages': messages}
+    def _trusted_email_domains(self):
+        return request.env['signup.trusted.domain'].sudo().get_trusted_domains()
 
-    def _validate_email(self, email, rules):
+    def _email_allowlisted(self, email, settings, registry=None):
         """
-        Validate email address based on configuration rules.
+        Whether an email skips the network checks, counted for the
+        allowlist hit rate when the allowlist is in use.
         """
-        messages = []
-        
-        # Basic syntax check
-        if rules.get('syntax_check', True):
-            email_regex = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-            if not re.match(email_regex, email):
-                messages.append(_('Invalid email address format'))
-                return {'valid': False, 'messages': messages}
-        
-        # MX record verification and domain existence
-        if rules.get('mx_verification', True):
-            domain = email.split('@')[1] if '@' in email else ''
-            if domain:
-                domain_valid = False
-                
-                # First try DNS resolution
-                if DNS_AVAILABLE:
-                    try:
-                        # Try MX record first
-                        mx_records = dns.resolver.resolve(domain, 'MX')
-                        # Check if MX records point to valid mail servers
-                        valid_mx = False
-                        for mx in mx_records:
-                            mx_host = str(mx.exchange).rstrip('.')
-                            # Reject invalid/parked domain indicators
-                            if mx_host not in ['0.0.0.0', 'localhost', '127.0.0.1', ''] and not mx_host.startswith('0.'):
-                                valid_mx = True
-                                break
-                        
-                        if valid_mx:
-                            domain_valid = True
-                        else:
-                            messages.append(_('Email domain does not accept emails'))
-                            return {'valid': False, 'messages': messages}
-                            
-                    except dns.resolver.NXDOMAIN:
-                        messages.append(_('Email domain does not exist'))
-                        return {'valid': False, 'messages': messages}
-                    except dns.resolver.NoAnswer:
-                        try:
-                            # If MX fails, try A record
-                            dns.resolver.resolve(domain, 'A')
-                            # Domain exists but no mail service - still reject for email registration
-                            messages.append(_('Email domain does not support email delivery'))
-                            return {'valid': False, 'messages': messages}
-                        except dns.resolver.NXDOMAIN:
-                            messages.append(_('Email domain does not exist'))
-                            return {'valid': False, 'messages': messages}
-                        except:
-                            pass
-                    except Exception as e:
-                        _logger.warning(f"DNS check failed for {domain}: {str(e)}")
-                else:
-                    _logger.warning("dnspython not available for DNS verification")
-                
-                # If DNS checks failed but we have verify-email, try basic domain check
-                if not domain_valid:
-                    # Basic domain structure validation as fallback
-                    domain_parts = domain.split('.')
-                    if len(domain_parts) < 2 or len(domain_parts[-1]) < 2:
-                        messages.append(_('Email domain appears to be invalid'))
-                        return {'valid': False, 'messages': messages}
-                    
-                    # For common parked/invalid domains, reject them
-                    parked_domains = ['foo.com', 'bar.com', 'test.com', 'example.com', 'temp.com']
-                    if domain.lower() in parked_domains:
-                        messages.append(_('Email domain does not accept emails'))
-                        return {'valid': False, 'messages': messages}
-        
-        # Disposable email check
-        if rules.get('disposable_check', True):
-            temp_mail_result = self._check_disposable_email(email)
-            if not temp_mail_result['valid']:
-                messages.extend(temp_mail_result['messages'])
-                return {'valid': False, 'messages': messages}
-        
-        # Check for existing registration
-        existing_user = request.env['saas.user'].sudo().search([('su_email', '=', email)], limit=1)
-        if existing_user:
-            messages.append(_('An account with this email address already exists'))
+        trusted = signup_validators.email_domain_trusted(email, settings)
+        if settings.trusted_domains:
+            allowlist_hits.record(registry or request.env.registry, signup_validators.email_domain(email), trusted)
+        return trusted
+
+    def _check_disposable_email(self, email, settings=None):
+        """
+        Check if email is disposable using configured method (library or API).
+        Does not access the database when ``settings`` is given, so it can run
+        on the validation executor.
+        """
+        email_settings = signup_validators.EmailSettings.from_rules(
+            {}, settings if settings is not None else self._get_disposable_email_settings())
+        return vars(signup_validators.check_disposable_email(email, email_settings))
+
+    def _check_email_domain(self, domain):
+        """
+        MX record verification and domain existence check.
         
-        return {
-            'valid': len(messages) == 0,
-            'messages': messages
-        }
+        Returns:
+            dict: Validation result with lazily translated messages
+        """
+        return vars(signup_validators.check_email_domain(domain))
 
-    def _validate_phone(self, phone, rules, country_id=None):
+    def _email_syntax_valid(self, email, rules):
         """
-        Validate phone number based on configuration rules and selected country.
-        Enforces strict country matching and determines phone type for proper field assignment.
+        Basic syntax check, when enabled in the rules.
         """
-        messages = []
-        formatted_phone = phone
-        phone_type = None
+        return signup_validators.email_syntax_valid(email, signup_validators.EmailSettings.from_rules(rules))
+
+    def _start_email_checks(self, email, rules, disposable_settings=None):
+        """
+        Submit the network-bound email checks to the validation executor.
+        Settings are read here, on the request thread, unless given.
         
-        if not rules.get('validation_enabled', True):
-            return {'valid': True, 'messages': [], 'formatted': phone, 'phone_type': 'unknown'}
+        Returns:
+            list: (check name, future) tuples in merge order
+        """
+        settings = self._email_settings(rules, disposable_settings)
+        if signup_validators.email_syntax_valid(email, settings) and (settings.mx_verification or settings.disposable_check):
+            self._email_allowlisted(email, settings)
+        return signup_validators.start_email_checks(email, settings)
+
+    def _collect_email_checks(self, email, pending):
+        """
+        Wait for the checks started by ``_start_email_checks``.
         
-        if not phone.strip():
-            messages.append(_('Phone number is required'))
-            return {'valid': False, 'messages': messages, 'formatted': formatted_phone, 'phone_type': phone_type}
+        Returns:
+            dict: Validation result with translated messages
+        """
+        result = signup_validators.collect_email_checks(email, pending)
+        return {'valid': result.valid, 'messages': list(result.messages)}
+
+    def _validate_email(self, email, rules, pending=None, email_registered=None):
+        """
+        Validate email address based on configuration rules.
         
-        if phonenumbers:
-            try:
-                # Get country info from selected country - REQUIRED for strict validation
-                country = None
-                country_code = None
-                
-                if country_id:
-                    try:
-                        country = request.env['res.country'].sudo().browse(int(country_id))
-                        if country.exists():
-                            country_code = country.code  # e.g., 'SA', 'JO'
-                            _logger.info(f"Validating phone for country: {country.name} ({country_code})")
-                        else:
-                            _logger.error(f"Country with ID {country_id} does not exist")
-                    except Exception as e:
-                        _logger.error(f"Error accessing country with ID {country_id}: {str(e)}")
-                
-                # Country is REQUIRED for strict validation
-                if not country or not country_code:
-                    _logger.error(f"Country selection required for phone validation - country: {country}, country_id: {country_id}")
-                    messages.append(_('Please select a country for phone number validation'))
-                    return {'valid': False, 'messages': messages, 'formatted': formatted_phone, 'phone_type': phone_type}
-                
-                # STEP 1: Parse phone number with selected country region
-                parsed = None
-                try:
-                    # Parse with country region code (e.g., 'SA' for Saudi Arabia)
-                    parsed = phonenumbers.parse(phone, country_code)
-                    _logger.info(f"Parsed phone number '{phone}' with country region '{country_code}'")
-                except phonenumbers.NumberParseException as e:
-                    _logger.error(f"Failed to parse phone number '{phone}' with country '{country_code}': {str(e)}")
-                    messages.append(_('Invalid phone number format for %s') % country.name)
-                    return {'valid': False, 'messages': messages, 'formatted': formatted_phone, 'phone_type': phone_type}
-                
-                # STEP 2: Validate the parsed number
-                if not phonenumbers.is_valid_number(parsed):
-                    _logger.error(f"Phone number '{phone}' is not valid")
-                    messages.append(_('Invalid phone number'))
-                    return {'valid': False, 'messages': messages, 'formatted': formatted_phone, 'phone_type': phone_type}
-                
-                # STEP 3: CRITICAL - Enforce strict country matching
-                number_region = phonenumbers.region_code_for_number(parsed)
-                if number_region != country_code:
-                    _logger.warning(f"COUNTRY MISMATCH: Phone number region '{number_region}' does not match selected country '{country_code}'")
-                    messages.append(_('Phone number must belong to %s. The number you entered belongs to a different country.') % country.name)
-                    return {'valid': False, 'messages': messages, 'formatted': formatted_phone, 'phone_type': phone_type}
-                
-                # STEP 4: Determine phone number type using phonenumbers library
-                from phonenumbers import NumberParseException, number_type, PhoneNumberType
-                
-                num_type = number_type(parsed)
-                if num_type == PhoneNumberType.MOBILE:
-                    phone_type = 'mobile'
-                    _logger.info(f"Phone number identified as MOBILE: {phone}")
-                elif num_type == PhoneNumberType.FIXED_LINE:
-                    phone_type = 'fixed_line'
-                    _logger.info(f"Phone number identified as FIXED_LINE: {phone}")
-                elif num_type == PhoneNumberType.FIXED_LINE_OR_MOBILE:
-                    phone_type = 'fixed_line_or_mobile'
-                    _logger.info(f"Phone number identified as FIXED_LINE_OR_MOBILE: {phone}")
-                else:
-                    _logger.warning(f"Phone number type not recognized: {num_type}")
-                    messages.append(_('Phone number type not supported'))
-                    return {'valid': False, 'messages': messages, 'formatted': formatted_phone, 'phone_type': phone_type}
-                
-                # STEP 5: Check mobile requirement if configured
-                if rules.get('require_mobile', False):
-                    if phone_type not in ['mobile', 'fixed_line_or_mobile']:
-                        messages.append(_('Only mobile phone numbers are allowed'))
-                        return {'valid': False, 'messages': messages, 'formatted': formatted_phone, 'phone_type': phone_type}
-                
-                # STEP 6: Format for storage (international format)
-                formatted_phone = phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.INTERNATIONAL)
-                
-                _logger.info(f"Phone validation SUCCESS: {formatted_phone} (Type: {phone_type}, Country: {country_code})")
-                
-            except Exception as e:
-                _logger.error(f"Phone validation error: {str(e)}")
-                messages.append(_('Phone validation failed. Please enter a valid phone number.'))
-                return {'valid': False, 'messages': messages, 'formatted': formatted_phone, 'phone_type': phone_type}
-        else:
-            # Basic validation if phonenumbers library is not available
-            if not re.match(r'^\+?[1-9]\d{1,14}$', phone.replace(' ', '').replace('-', '')):
-                messages.append(_('Invalid phone number format'))
-            else:
-                phone_type = 'unknown'  # Can't determine type without phonenumbers library
+        Args:
+            email (str): Email address to validate
+            rules (dict): Email validation rules
+            pending (list): Checks already started with ``_start_email_checks``
+            email_registered (callable): Duplicate lookup taking the email,
+                defaults to a saas.user search
+            
+        Returns:
+            dict: Validation result with 'valid' and 'messages'
+        """
+        if pending is None and self._email_syntax_valid(email, rules):
+            pending = self._start_email_checks(email, rules)
+        return signup_validators.validate_email(
+            email, signup_validators.EmailSettings.from_rules(rules),
+            email_registered=email_registered or self._email_registered,
+            pending=pending or [],
+        ).as_dict()
+
+    def _email_registered(self, email):
+        return bool(request.env['saas.user'].sudo().search([('su_email', '=', email)], limit=1))
+
+    def _validate_phone(self, phone, rules, country_id=None, country=None):
+        """
+        Validate phone number based on configuration rules and selected country.
         
-        return {
-            'valid': len(messages) == 0,
-            'messages': messages,
-            'formatted': formatted_phone,
-            'phone_type': phone_type
-        }
+        ``country`` (anything with code, name and phone_code) replaces the
+        lookup of ``country_id`` when the caller already has it.
+        """
+        if country is None:
+            country = self._phone_country(country_id)
+        return signup_validators.validate_phone(
+            phone, signup_validators.PhoneSettings.from_rules(rules), country).as_dict()
+
+    def _phone_country(self, country_id):
+        """
+        Selected phone country record, empty if unknown.
+        """
+        country = request.env['res.country']
+        try:
+            if country_id:
+                country = country.sudo().browse(int(country_id)).exists()
+        except (TypeError, ValueError):
+            pass
+        if country_id and not country:
+            _logger.error(f"Country with ID {country_id} does not exist")
+        return country
+
+    def _normalize_phone(self, phone, country_id=None, country=None):
+        """
+        E.164 form of a phone number for the selected country, as stored in
+        saas.user.su_phone_e164.
+        """
+        if country is None:
+            country = self._phone_country(country_id)
+        return signup_validators.normalize_phone(phone, country)
 
     def _validate_dynamic_fields(self, form_data, errors):
         """
         Validate required dynamic fields.
         """
         try:
-            # Get dynamic fields configuration
-            dynamic_fields = request.env['signup.configuration'].sudo().get_dynamic_fields()
-            
-            for field_config in dynamic_fields:
-                field_name = field_config['field_name']
-                field_label = field_config['field_label']
-                is_required = field_config['required']
-                field_type = field_config['field_type']
-                
-                # Check if field is required
-                if is_required:
-                    field_value = form_data.get('dynamic_fields', {}).get(field_name)
-                    
-                    # Validate based on field type
-                    if field_type == 'boolean':
-                        # Boolean fields are always valid (True or False)
-                        continue
-                    elif field_type == 'binary':
-                        # Check if file was uploaded
-                        if not field_value:
-                            errors.append(_('%s is required') % field_label)
-                    else:
-                        # String, text, integer, float, date, datetime fields
-                        if not field_value or (isinstance(field_value, str) and not field_value.strip()):
-                            errors.append(_('%s is required') % field_label)
-                        
-                        # Additional validation for numeric fields
-                        if field_type in ['integer', 'float'] and field_value == 0:
-                            # Check if 0 is a valid value or if it means empty
-                            raw_value = request.httprequest.form.get(field_name, '').strip()
-                            if not raw_value:
-                                errors.append(_('%s is required') % field_label)
-                                
+            errors.extend(signup_validators.validate_dynamic_fields(
+                self._get_dynamic_fields(), form_data.get('dynamic_fields', {}), request.httprequest.form,
+                option_exists=self._field_option_exists))
         except Exception as e:
             _logger.error(f"Dynamic fields validation error: {str(e)}")
             # Don't add error here as it might be configuration issue
@@ -767,20 +1070,35 @@ class CustomAuthSignup(http.Controller):
                     saas_user_vals['su_phone_country_id'] = default_country.id
                     _logger.info(f"Using default country {default_country.id} (Saudi Arabia) - no country provided")
             
+            if self._requires_email_verification(form_data):
+                saas_user_vals.update(request.env['saas.user'].sudo()._prepare_email_verification_vals())
+            
             # Create SaaS user with dynamic fields and phone type in context
             # The create method will automatically create the portal user
             saas_user_model = request.env['saas.user'].sudo()
-            dynamic_fields = form_data.get('dynamic_fields', {})
+            dynamic_fields = dict(form_data.get('dynamic_fields', {}))
+            # Uploaded files are moved to the new user's fields as attachments
+            dynamic_attachments = {
+                field_config['field_name']: dynamic_fields.pop(field_config['field_name'])
+                for field_config in self._get_dynamic_fields()
+                if field_config['field_type'] == 'binary' and dynamic_fields.get(field_config['field_name'])
+            }
             phone_type = form_data.get('phone_type', 'unknown')
             formatted_phone = form_data.get('formatted_phone', form_data.get('phone', ''))
             
             # Create with explicit context to prevent duplicate creation
-            saas_user = saas_user_model.with_context(
-                dynamic_fields=dynamic_fields,
-                phone_type=phone_type,
-                formatted_phone=formatted_phone,
-                from_signup_form=True  # Flag to indicate this is from signup form
-            ).create(saas_user_vals)
+            try:
+                saas_user = saas_user_model.with_context(
+                    dynamic_fields=dynamic_fields,
+                    dynamic_attachments=dynamic_attachments,
+                    phone_type=phone_type,
+                    formatted_phone=formatted_phone,
+                    from_signup_form=True  # Flag to indicate this is from signup form
+                ).create(saas_user_vals)
+            except UniqueViolation:
+                # Account committed by a submission that started before this
+                # transaction's snapshot; the caller's savepoint rolls back
+                raise ValidationError(_('An account with this email address already exists. Please try to login instead.'))
             
             # Verify portal user was created
             if not saas_user.su_portal_user_id:
@@ -794,6 +1112,28 @@ class CustomAuthSignup(http.Controller):
             _logger.error(f"Error creating user accounts for {form_data.get('email', 'unknown')}: {str(e)}")
             raise
 
+    def _lock_signup_email(self, email):
+        """
+        Take the transaction-level advisory lock of an email address, held
+        until the submission's transaction ends.
+        
+        Returns:
+            bool: False if another submission for the email holds the lock
+        """
+        digest = hashlib.sha256(f'j_signup_validation.signup:{email}'.encode()).digest()
+        request.env.cr.execute("SELECT pg_try_advisory_xact_lock(%s)", [int.from_bytes(digest[:8], 'big', signed=True)])
+        return request.env.cr.fetchone()[0]
+
+    def _requires_email_verification(self, form_data=None):
+        """
+        Check if new accounts must confirm their email before activation.
+        Signups over a velocity limit with the 'verify' action always must.
+        """
+        if form_data and form_data.get('velocity_verification'):
+            return True
+        config = request.env['ir.config_parameter'].sudo()
+        return config.get_param('j_signup_validation.registration_require_email_verification', 'False') == 'True'
+
     def _should_auto_login(self):
         """
         Check if auto-login is enabled in configuration.
@@ -818,6 +1158,12 @@ class CustomAuthSignup(http.Controller):
         error_message = '; '.join(errors) if isinstance(errors, list) else str(errors)
         return request.redirect(f'/j_signup_validation/signup?error={error_message}')
 
+    def _is_error_redirect(self, response):
+        """
+        Check if a signup response redirects back to the form with errors.
+        """
+        return 'error' in urls.url_parse(response.location or '').decode_query()
+
     def _redirect_with_success(self, message):
         """
         Redirect to signup form with success message.
@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+"""
+Signup Validation Fast Path
+Serves the public AJAX validators (email, phone, password) from a minimal
+WSGI handler placed in front of Odoo's dispatcher: no session load, no
+request environment, no ir.http routing. Settings are read once into a
+snapshot reused for SNAPSHOT_TTL seconds, and a database cursor is only
+opened for the rate limit buckets and the duplicate probes. Answers follow
+the JSON-RPC contract of the regular routes.
+
+Enable it in the Odoo configuration file:
+
+    [options]
+    signup_fast_validation = True
+
+Requests the fast path cannot answer alone go through the regular routes:
+databases that cannot be told from the host without a session, registries
+not loaded yet by this worker, and frontend languages the module has
+translations for. Settings changes reach the fast path within
+SNAPSHOT_TTL seconds; controller overrides of the validators in other
+modules are not applied on the fast path.
+"""
+
+import io
+import json
+import logging
+import threading
+import time
+
+from werkzeug.middleware.proxy_fix import ProxyFix
+from werkzeug.wrappers import Request, Response
+
+from odoo import SUPERUSER_ID, api, http
+from odoo.modules.registry import Registry
+from odoo.tools import config, str2bool
+from odoo.tools.translate import code_translations
+
+from ..models.res_config_settings import password_strength
+from ..models.signup_rate_limit import consume_tokens, rate_limit_buckets
+from ..tools import breached_passwords, signup_validators, validation_tokens
+from .auth_signup import CustomAuthSignup, throttled_payload
+
+_logger = logging.getLogger(__name__)
+
+MODULE = 'j_signup_validation'
+
+FAST_ROUTES = {
+    f'/{MODULE}/validate_email': 'email',
+    f'/{MODULE}/validate_phone': 'phone',
+    f'/{MODULE}/validate_password': 'password',
+}
+
+# Seconds a settings snapshot is reused before being read again
+SNAPSHOT_TTL = 30
+# Seconds the database of a host is reused before being resolved again
+DATABASE_TTL = 60
+# Larger bodies are left to the regular routes
+MAX_BODY_SIZE = 16 * 1024
+
+UNAVAILABLE_MESSAGES = {
+    'email': 'Email validation service temporarily unavailable',
+    'phone': 'Phone validation service temporarily unavailable',
+    'password': 'Password validation service temporarily unavailable',
+}
+
+class ValidationSnapshot:
+    """
+    Settings of one database needed by the validators, read in a single
+    transaction.
+    """
+
+    def __init__(self, env, registry):
+        self.registry = registry
+        settings = env['res.config.settings']
+        self.email_rules = settings.get_email_validation_rules()
+        self.phone_rules = settings.get_phone_validation_rules()
+        self.password_rules = settings.get_password_validation_rules()
+        self.rate_limit_rules = settings.get_rate_limit_rules()
+        self.breach_filter_path = settings.get_breached_password_filter_path()
+        self.disposable_settings = CustomAuthSignup()._get_disposable_email_settings(env)
+        self.email_settings = signup_validators.EmailSettings.from_rules(
+            self.email_rules, self.disposable_settings, env['signup.trusted.domain'].get_trusted_domains())
+        self.phone_settings = signup_validators.PhoneSettings.from_rules(self.phone_rules)
+        self.secret = env['ir.config_parameter'].sudo().get_param('database.secret')
+        self.versions = {
+            'email': validation_tokens.settings_version('email', self.email_rules, self.disposable_settings['method']),
+            'phone': validation_tokens.settings_version('phone', self.phone_rules),
+        }
+
+        rows = env['res.country']._get_signup_country_data()['rows']
+        self.countries = {row[0]: signup_validators.PhoneCountry(*row) for row in rows}
+        default_country = env.ref('base.sa', raise_if_not_found=False)
+        self.default_country_id = default_country.id if default_country else None
+
+        website = env['website'].sudo().search([], limit=1)
+        self.default_lang = website.default_lang_id.code or 'en_US'
+        self.loaded_at = time.monotonic()
+
+
+class FastValidation:
+    """
+    WSGI handler of the validation routes. Called with every request before
+    Odoo's dispatcher; returns None for the requests it leaves to Odoo.
+    """
+
+    def __init__(self):
+        self._validators = CustomAuthSignup()
+        self._databases = {}
+        self._snapshots = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        kind = FAST_ROUTES.get(environ.get('PATH_INFO'))
+        if not kind or environ.get('REQUEST_METHOD') != 'POST':
+            return None
+
+        try:
+            httprequest = Request(environ)
+            if (httprequest.content_length or 0) > MAX_BODY_SIZE:
+                return None
+            db = self._database(environ.get('HTTP_HOST', ''))
+            registry = self._registry(db) if db else None
+            if registry is None:
+                return None
+            snapshot = self._snapshot(db, registry)
+            lang = httprequest.cookies.get('frontend_lang') or snapshot.default_lang
+            if lang != 'en_US' and code_translations.get_python_translations(MODULE, lang):
+                return None
+        except Exception as e:
+            _logger.warning(f"Signup validation fast path unavailable, using the regular route: {str(e)}")
+            return None
+
+        body = httprequest.get_data()
+        try:
+            call = json.loads(body)
+            arguments = self._arguments(kind, snapshot, call['params'])
+        except Exception:
+            arguments = None
+        if arguments is None:
+            # Malformed call or unknown country: let the regular route answer
+            environ['wsgi.input'] = io.BytesIO(body)
+            environ['CONTENT_LENGTH'] = str(len(body))
+            return None
+
+        try:
+            handler = getattr(self, f'_validate_{kind}')
+            result = handler(registry, snapshot, self._remote_client(environ, httprequest), *arguments)
+        except Exception as e:
+            _logger.error(f"Error in fast {kind} validation: {str(e)}")
+            result = {'valid': False, 'messages': [UNAVAILABLE_MESSAGES[kind]]}
+            if kind == 'password':
+                result['score'] = 0
+
+        response = Response(
+            json.dumps({'jsonrpc': '2.0', 'id': call.get('id'), 'result': result}),
+            content_type='application/json',
+        )
+        return response(environ, start_response)
+
+    def _database(self, host):
+        """
+        Database served for a host, when it is the only one the database
+        filter allows; the regular dispatcher handles the other cases.
+        """
+        now = time.monotonic()
+        entry = self._databases.get(host)
+        if entry and entry[1] > now:
+            return entry[0]
+        dbs = http.db_list(force=True, host=host)
+        db = dbs[0] if len(dbs) == 1 else None
+        self._databases[host] = (db, now + DATABASE_TTL)
+        return db
+
+    def _registry(self, db):
+        """
+        Registry of a database if this worker already loaded it with the
+        module installed.
+        """
+        try:
+            registry = Registry.registries[db]
+        except KeyError:
+            return None
+        if not registry.ready or 'signup.rate.limit' not in registry:
+            return None
+        return registry
+
+    def _snapshot(self, db, registry):
+        snapshot = self._snapshots.get(db)
+        if self._snapshot_valid(snapshot, registry):
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshots.get(db)
+            if not self._snapshot_valid(snapshot, registry):
+                with registry.cursor() as cr:
+                    snapshot = ValidationSnapshot(api.Environment(cr, SUPERUSER_ID, {}), registry)
+                self._snapshots[db] = snapshot
+        return snapshot
+
+    def _snapshot_valid(self, snapshot, registry):
+        return snapshot is not None and snapshot.registry is registry \
+            and time.monotonic() - snapshot.loaded_at < SNAPSHOT_TTL
+
+    def _arguments(self, kind, snapshot, params):
+        """
+        Validator arguments of a call.
+        
+        Returns:
+            tuple: The arguments, or None to leave the call to the regular route
+        """
+        value = params.get(kind)
+        if not isinstance(value, str):
+            return None
+        if kind != 'phone':
+            return (value,)
+        country_id = params.get('country_id') or snapshot.default_country_id
+        try:
+            return value, country_id, snapshot.countries[int(country_id)]
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def _remote_client(self, environ, httprequest):
+        """
+        Client address and session id as the rate limiter of the regular
+        routes sees them, with proxy headers applied the way Odoo does.
+        """
+        remote_addr = environ.get('REMOTE_ADDR')
+        if config['proxy_mode'] and environ.get('HTTP_X_FORWARDED_HOST'):
+            fixed = dict(environ)
+            ProxyFix(lambda environ, start_response: [])(fixed, lambda status, headers: None)
+            remote_addr = fixed.get('REMOTE_ADDR')
+        return remote_addr, httprequest.cookies.get('session_id')
+
+    def _consume_rate_limit(self, cr, snapshot, client):
+        """
+        Returns:
+            int: 0 if the request may proceed, else seconds to retry after
+        """
+        rules = snapshot.rate_limit_rules
+        buckets = rate_limit_buckets(rules, *client) if rules.get('enabled', True) else []
+        if not buckets:
+            return 0
+        try:
+            with cr.savepoint(flush=False):
+                return consume_tokens(cr, buckets)
+        except Exception as e:
+            # Never block signups because the limiter itself failed
+            _logger.warning(f"Rate limiter unavailable, allowing request: {str(e)}")
+            return 0
+
+    def _probe(self, cr, query, params):
+        cr.execute(query, params)
+        return bool(cr.fetchone())
+
+    def _validate_email(self, registry, snapshot, client, email):
+        settings = snapshot.email_settings
+        with registry.cursor() as cr:
+            retry_after = self._consume_rate_limit(cr, snapshot, client)
+            registered = not retry_after and signup_validators.email_syntax_valid(email, settings) and self._probe(
+                cr, "SELECT 1 FROM saas_user WHERE su_email = %s LIMIT 1", [email])
+        if retry_after:
+            return throttled_payload(retry_after)
+
+        if signup_validators.email_syntax_valid(email, settings) and (settings.mx_verification or settings.disposable_check):
+            self._validators._email_allowlisted(email, settings, registry)
+        validation_result = signup_validators.validate_email(
+            email, settings, email_registered=lambda _email: registered).as_dict()
+        return self._validators._email_ajax_result(
+            email, validation_result,
+            lambda value: validation_tokens.sign_token(snapshot.secret, 'email', value, snapshot.versions['email']))
+
+    def _validate_phone(self, registry, snapshot, client, phone, country_id, country):
+        settings = snapshot.phone_settings
+        with registry.cursor() as cr:
+            retry_after = self._consume_rate_limit(cr, snapshot, client)
+            if retry_after:
+                return throttled_payload(retry_after)
+
+            validation_result = signup_validators.validate_phone(phone, settings, country).as_dict()
+            e164 = validation_result.get('e164') if validation_result['valid'] else None
+            registered = bool(e164 and settings.unique and self._probe(
+                cr, "SELECT 1 FROM saas_user WHERE su_phone_e164 = %s LIMIT 1", [e164]))
+
+        if validation_result['valid']:
+            duplicate_messages = signup_validators.check_phone_duplicate(e164, settings, lambda _e164: registered)
+            if duplicate_messages:
+                validation_result.update(valid=False, messages=list(duplicate_messages))
+        return self._validators._phone_ajax_result(
+            phone, country_id, validation_result,
+            lambda value, extra: validation_tokens.sign_token(
+                snapshot.secret, 'phone', value, snapshot.versions['phone'], extra))
+
+    def _validate_password(self, registry, snapshot, client, password):
+        with registry.cursor() as cr:
+            retry_after = self._consume_rate_limit(cr, snapshot, client)
+        if retry_after:
+            throttled = throttled_payload(retry_after)
+            throttled['score'] = 0
+            return throttled
+
+        rules = snapshot.password_rules
+        breach_filter = breached_passwords.get_filter(snapshot.breach_filter_path) if rules.get('breach_check') else None
+        validation_result = password_strength(password, rules, breach_filter)
+        return {
+            'valid': validation_result['valid'],
+            'score': validation_result['score'],
+            'messages': validation_result['messages']
+        }
+
+
+_installed = False
+
+
+def install():
+    """
+    Put the fast path in front of Odoo's WSGI dispatcher, once per process,
+    when ``signup_fast_validation`` is enabled in the server configuration.
+    """
+    global _installed
+    if _installed or not str2bool(config.get('signup_fast_validation') or 'False', False):
+        return
+    _installed = True
+
+    fast_validation = FastValidation()
+    dispatch = http.Application.__call__
+
+    def __call__(self, environ, start_response):
+        response = fast_validation(environ, start_response)
+        if response is None:
+            response = dispatch(self, environ, start_response)
+        return response
+
+    http.Application.__call__ = __call__
+    _logger.info("Signup validation fast path enabled")
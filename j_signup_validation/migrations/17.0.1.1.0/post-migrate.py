@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""
+Reload the email verification template: its record is noupdate, and the
+shipped body now renders the verification link through QWeb.
+"""
+
+import logging
+
+from odoo import SUPERUSER_ID, api
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    template = env.ref('j_signup_validation.mail_template_saas_user_email_verification', raise_if_not_found=False)
+    if template:
+        template.reset_template()
+        _logger.info("Reloaded the SaaS user email verification template")
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+"""
+Date the last validation check of existing registrations at their signup,
+instead of the upgrade time the new column was filled with, so the
+revalidation job starts with the oldest ones.
+"""
+
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    cr.execute("""
+        UPDATE saas_user
+           SET su_validation_checked_date = COALESCE(su_registration_date, create_date)
+    """)
+    _logger.info(f"Dated the validation check of {cr.rowcount} SaaS user registrations at signup")
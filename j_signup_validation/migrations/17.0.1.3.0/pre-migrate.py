@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""
+Create and fill the stored email domain of registrations in SQL, so the
+upgrade does not compute it record by record.
+"""
+
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    cr.execute("ALTER TABLE saas_user ADD COLUMN IF NOT EXISTS su_email_domain varchar")
+    cr.execute("""
+        UPDATE saas_user
+           SET su_email_domain = NULLIF(lower(substring(su_email FROM '@([^@]*)$')), '')
+         WHERE su_email_domain IS NULL
+    """)
+    _logger.info(f"Filled the email domain of {cr.rowcount} SaaS user registrations")
@@ -4,7 +4,15 @@ Models initialization for J Signup Validation module.
 """
 
 from . import saas_user
+from . import saas_user_archive
+from . import saas_user_stats
 from . import res_config_settings
+from . import res_country
 from . import res_users
 from . import signup_configuration
-from . import signup_field
\ No newline at end of file
+from . import signup_field
+from . import signup_rate_limit
+from . import signup_velocity
+from . import signup_idempotency
+from . import signup_trusted_domain
+from . import signup_upload
@@ -5,10 +5,98 @@ Extends res.config.settings to add custom validation configuration options.
 """
 
 import logging
+import os
+from werkzeug import urls
 from odoo import models, fields, api, _
+from odoo.tools import config as odoo_config
+
+from ..tools import breached_passwords
+from ..tools.signup_validators import TEMP_MAIL_API_URL
 
 _logger = logging.getLogger(__name__)
 
+# File types accepted by the signup form's file fields unless configured
+DEFAULT_UPLOAD_MIMETYPES = 'image/png,image/jpeg,image/gif,image/webp,application/pdf'
+
+
+def password_strength(password, rules, breach_filter=None):
+    """
+    Score a password against password validation rules, without database
+    access.
+    
+    Args:
+        password (str): Password to validate
+        rules (dict): Rules as returned by get_password_validation_rules()
+        breach_filter (BreachedPasswordFilter): Filter for the breach check
+        
+    Returns:
+        dict: Validation result with score and messages
+    """
+    if not rules.get('enabled', True):
+        return {'valid': True, 'score': 100, 'messages': []}
+
+    messages = []
+    score = 0
+
+    # Check minimum length
+    if len(password) >= rules.get('min_length', 8):
+        score += 25
+    else:
+        messages.append(f"Password must be at least {rules.get('min_length', 8)} characters long")
+
+    # Check for numbers
+    if rules.get('require_number', True):
+        if any(char.isdigit() for char in password):
+            score += 25
+        else:
+            messages.append("Password must contain at least one number")
+    else:
+        score += 25
+
+    # Check for uppercase
+    if rules.get('require_uppercase', False):
+        if any(char.isupper() for char in password):
+            score += 25
+        else:
+            messages.append("Password must contain at least one uppercase letter")
+    else:
+        score += 25
+
+    # Check for lowercase
+    if rules.get('require_lowercase', False):
+        if any(char.islower() for char in password):
+            score += 25
+        else:
+            messages.append("Password must contain at least one lowercase letter")
+    else:
+        score += 25
+
+    # Check for special characters
+    if rules.get('require_special', False):
+        special_chars = "!@#$%^&*()_+-=[]{}|;:,.<>?"
+        if any(char in special_chars for char in password):
+            score += 0  # Already accounted for in previous checks
+        else:
+            messages.append("Password must contain at least one special character")
+            score -= 25
+
+    # Check against known breached passwords, a local lookup of a few bits
+    if rules.get('breach_check') and password:
+        if breach_filter is None:
+            _logger.warning("Breached password check is enabled but no filter file is available")
+        elif password in breach_filter:
+            messages.append("This password has appeared in a data breach. Please choose a different password")
+            score = min(score, 20)
+
+    # Ensure score is within bounds
+    score = max(0, min(100, score))
+
+    return {
+        'valid': len(messages) == 0,
+        'score': score,
+        'messages': messages
+    }
+
 
 class ResConfigSettings(models.TransientModel):
     """
@@ -59,6 +147,20 @@ class ResConfigSettings(models.TransientModel):
         help='Password must contain at least one special character'
     )
     
+    password_breach_check = fields.Boolean(
+        'Reject Breached Passwords',
+        default=False,
+        config_parameter='j_signup_validation.password_breach_check',
+        help='Reject passwords found in the offline breached password filter'
+    )
+    
+    password_breach_filter_path = fields.Char(
+        'Breached Password Filter',
+        config_parameter='j_signup_validation.password_breach_filter_path',
+        help='Filter file built with tools/breached_passwords.py; defaults to '
+             'j_signup_validation/breached_passwords.bloom in the data directory'
+    )
+    
     # Email Validation Settings
     email_syntax_check = fields.Boolean(
         'Email Syntax Check',
@@ -112,6 +214,13 @@ class ResConfigSettings(models.TransientModel):
         help='Only allow mobile phone numbers for registration'
     )
     
+    phone_unique = fields.Boolean(
+        'One Account per Phone Number',
+        default=False,
+        config_parameter='j_signup_validation.phone_unique',
+        help='Reject registrations whose phone number, in any format, is already registered'
+    )
+    
     # Registration Settings
     registration_require_email_verification = fields.Boolean(
         'Require Email Verification',
@@ -126,6 +235,219 @@ class ResConfigSettings(models.TransientModel):
         config_parameter='j_signup_validation.registration_auto_login',
         help='Automatically log in user after successful registration'
     )
+    
+    registration_verification_ttl_hours = fields.Integer(
+        'Verification Link Validity (Hours)',
+        default=24,
+        config_parameter='j_signup_validation.registration_verification_ttl_hours',
+        help='Number of hours the email verification link stays valid'
+    )
+    
+    validation_report_all_errors = fields.Boolean(
+        'Report All Validation Errors',
+        default=False,
+        config_parameter='j_signup_validation.validation_report_all_errors',
+        help='Run every validation check on submission and report all errors, '
+             'instead of skipping costly checks once the form is already rejected'
+    )
+
+    # Rate Limiting Settings
+    rate_limit_enabled = fields.Boolean(
+        'Rate Limit Validation Requests',
+        default=True,
+        config_parameter='j_signup_validation.rate_limit_enabled',
+        help='Throttle the public email, phone and password validation endpoints per IP address and session'
+    )
+    
+    rate_limit_ip_per_minute = fields.Integer(
+        'Requests per Minute per IP',
+        default=60,
+        config_parameter='j_signup_validation.rate_limit_ip_per_minute',
+        help='Sustained number of validation requests allowed per minute from one IP address'
+    )
+    
+    rate_limit_ip_burst = fields.Integer(
+        'Burst per IP',
+        default=30,
+        config_parameter='j_signup_validation.rate_limit_ip_burst',
+        help='Number of validation requests one IP address may send in a quick burst'
+    )
+    
+    rate_limit_session_per_minute = fields.Integer(
+        'Requests per Minute per Session',
+        default=30,
+        config_parameter='j_signup_validation.rate_limit_session_per_minute',
+        help='Sustained number of validation requests allowed per minute from one browser session'
+    )
+    
+    rate_limit_session_burst = fields.Integer(
+        'Burst per Session',
+        default=15,
+        config_parameter='j_signup_validation.rate_limit_session_burst',
+        help='Number of validation requests one browser session may send in a quick burst'
+    )
+
+    # Registration Velocity Settings
+    velocity_enabled = fields.Boolean(
+        'Registration Velocity Checks',
+        default=True,
+        config_parameter='j_signup_validation.velocity_enabled',
+        help='Count signup submissions per IP address, network and email domain to stop registration waves'
+    )
+    
+    velocity_window_minutes = fields.Integer(
+        'Velocity Window (Minutes)',
+        default=10,
+        config_parameter='j_signup_validation.velocity_window_minutes',
+        help='Length of the sliding window the signup submissions are counted over'
+    )
+    
+    velocity_ip_limit = fields.Integer(
+        'Signups per IP',
+        default=10,
+        config_parameter='j_signup_validation.velocity_ip_limit',
+        help='Signup submissions allowed per window from one IP address; 0 disables this counter'
+    )
+    
+    velocity_network_limit = fields.Integer(
+        'Signups per Network',
+        default=30,
+        config_parameter='j_signup_validation.velocity_network_limit',
+        help='Signup submissions allowed per window from one /24 IPv4 or /64 IPv6 network; 0 disables this counter'
+    )
+    
+    velocity_domain_limit = fields.Integer(
+        'Signups per Email Domain',
+        default=0,
+        config_parameter='j_signup_validation.velocity_domain_limit',
+        help='Signups with a deliverable address allowed per window for one email domain, '
+             'trusted domains excepted; 0 disables this counter'
+    )
+    
+    velocity_action = fields.Selection([
+        ('block', 'Block the Signup'),
+        ('verify', 'Require Email Verification'),
+    ], string='When Exceeded',
+        default='block',
+        config_parameter='j_signup_validation.velocity_action',
+        help='Reject signups over the IP or network limit, or accept them only after email verification'
+    )
+    
+    velocity_domain_action = fields.Selection([
+        ('block', 'Block the Signup'),
+        ('verify', 'Require Email Verification'),
+    ], string='When Domain Limit Exceeded',
+        default='verify',
+        config_parameter='j_signup_validation.velocity_domain_action',
+        help='Reject signups over the email domain limit, or accept them only after email verification'
+    )
+
+    # Mailbox Verification Settings
+    mailbox_verification_enabled = fields.Boolean(
+        'Background Mailbox Verification',
+        default=False,
+        config_parameter='j_signup_validation.mailbox_verification_enabled',
+        help='Probe the mailbox of new registrations over SMTP in a scheduled job'
+    )
+    
+    mailbox_probe_per_host_limit = fields.Integer(
+        'Concurrent Sessions per Mail Server',
+        default=2,
+        config_parameter='j_signup_validation.mailbox_probe_per_host_limit',
+        help='Maximum number of simultaneous SMTP sessions opened to one mail server'
+    )
+
+    # Trusted Email Domains Settings
+    email_trusted_domains_enabled = fields.Boolean(
+        'Trusted Email Domains',
+        default=True,
+        config_parameter='j_signup_validation.email_trusted_domains_enabled',
+        help='Skip the MX and disposable email checks for high-volume providers learned from validated registrations'
+    )
+    
+    email_trusted_domains_min_registrations = fields.Integer(
+        'Learn After (Registrations)',
+        default=50,
+        config_parameter='j_signup_validation.email_trusted_domains_min_registrations',
+        help='Validated registrations a domain needs before it is trusted'
+    )
+    
+    email_trusted_domains_hit_rate = fields.Float(
+        'Allowlist Hit Rate (7 Days)',
+        compute='_compute_email_trusted_domains_hit_rate',
+        help='Share of signup email validations that skipped the network checks over the last 7 days'
+    )
+
+    # Upload Settings
+    upload_max_size_mb = fields.Integer(
+        'Maximum Upload Size (MB)',
+        default=5,
+        config_parameter='j_signup_validation.upload_max_size_mb',
+        help='Largest file accepted by the file fields of the signup form'
+    )
+    
+    upload_allowed_mimetypes = fields.Char(
+        'Accepted File Types',
+        default=DEFAULT_UPLOAD_MIMETYPES,
+        config_parameter='j_signup_validation.upload_allowed_mimetypes',
+        help='Comma-separated MIME types accepted by the file fields of the signup form'
+    )
+
+    # Revalidation Settings
+    revalidation_enabled = fields.Boolean(
+        'Periodic Revalidation',
+        default=False,
+        config_parameter='j_signup_validation.revalidation_enabled',
+        help='Check the email domain and phone number of stored registrations again in a scheduled job'
+    )
+    
+    revalidation_interval_days = fields.Integer(
+        'Revalidate Every (Days)',
+        default=30,
+        config_parameter='j_signup_validation.revalidation_interval_days',
+        help='Registrations are checked again once their last check is older than this'
+    )
+    
+    revalidation_batch_size = fields.Integer(
+        'Registrations per Batch',
+        default=500,
+        config_parameter='j_signup_validation.revalidation_batch_size',
+        help='Registrations checked and committed together; each email domain of a batch is resolved once'
+    )
+    
+    revalidation_concurrency = fields.Integer(
+        'Concurrent Domain Lookups',
+        default=8,
+        config_parameter='j_signup_validation.revalidation_concurrency',
+        help='Maximum number of email domains resolved at the same time'
+    )
+
+    # Archival Settings
+    archive_enabled = fields.Boolean(
+        'Archive Old Registrations',
+        default=False,
+        config_parameter='j_signup_validation.archive_enabled',
+        help='Move old or inactive registrations to the archive in a scheduled job'
+    )
+    
+    archive_after_days = fields.Integer(
+        'Archive After (Days)',
+        default=365,
+        config_parameter='j_signup_validation.archive_after_days',
+        help='Registrations older than this are archived; 0 disables the age criterion'
+    )
+    
+    archive_inactive = fields.Boolean(
+        'Archive Inactive Registrations',
+        default=True,
+        config_parameter='j_signup_validation.archive_inactive',
+        help='Also archive inactive registrations regardless of their age'
+    )
+
+    def _compute_email_trusted_domains_hit_rate(self):
+        hit_rate = self.env['signup.trusted.domain'].sudo().get_hit_rate()['rate']
+        for settings in self:
+            settings.email_trusted_domains_hit_rate = hit_rate
 
     @api.model
     def get_password_validation_rules(self):
@@ -145,6 +467,7 @@ class ResConfigSettings(models.TransientModel):
                 'require_uppercase': config.get_param('j_signup_validation.password_require_uppercase', 'False') == 'True',
                 'require_lowercase': config.get_param('j_signup_validation.password_require_lowercase', 'False') == 'True',
                 'require_special': config.get_param('j_signup_validation.password_require_special', 'False') == 'True',
+                'breach_check': config.get_param('j_signup_validation.password_breach_check', 'False') == 'True',
             }
             
             _logger.info(f"Retrieved password validation rules: {rules}")
@@ -160,8 +483,31 @@ class ResConfigSettings(models.TransientModel):
                 'require_uppercase': False,
                 'require_lowercase': False,
                 'require_special': False,
+                'breach_check': False,
             }
 
+    @api.model
+    def get_breached_password_filter(self):
+        """
+        Get the breached password filter of this database, memory-mapped once
+        per process and shared by all workers through the page cache.
+        
+        Returns:
+            BreachedPasswordFilter: The filter, or None if it is not built
+        """
+        return breached_passwords.get_filter(self.get_breached_password_filter_path())
+
+    @api.model
+    def get_breached_password_filter_path(self):
+        """
+        Returns:
+            str: Path of the breached password filter file of this database
+        """
+        path = self.env['ir.config_parameter'].sudo().get_param('j_signup_validation.password_breach_filter_path')
+        if not path:
+            path = os.path.join(odoo_config['data_dir'], 'j_signup_validation', 'breached_passwords.bloom')
+        return path
+
     @api.model
     def get_email_validation_rules(self):
         """
@@ -205,6 +551,7 @@ class ResConfigSettings(models.TransientModel):
             rules = {
                 'validation_enabled': config.get_param('j_signup_validation.phone_validation_enabled', 'True') == 'True',
                 'require_mobile': config.get_param('j_signup_validation.phone_require_mobile', 'False') == 'True',
+                'unique': config.get_param('j_signup_validation.phone_unique', 'False') == 'True',
             }
             
             _logger.info(f"Retrieved phone validation rules: {rules}")
@@ -216,76 +563,214 @@ class ResConfigSettings(models.TransientModel):
             return {
                 'validation_enabled': True,
                 'require_mobile': False,
+                'unique': False,
             }
 
-    def validate_password_strength(self, password):
+    @api.model
+    def get_rate_limit_rules(self):
         """
-        Validate password strength based on current configuration.
+        Get current rate limiting rules for the validation endpoints.
         
-        Args:
-            password (str): Password to validate
-            
         Returns:
-            dict: Validation result with score and messages
+            dict: Current rate limiting configuration
         """
-        rules = self.get_password_validation_rules()
-        
-        if not rules.get('enabled', True):
-            return {'valid': True, 'score': 100, 'messages': []}
-        
-        messages = []
-        score = 0
+        try:
+            config = self.env['ir.config_parameter'].sudo()
+            
+            return {
+                'enabled': config.get_param('j_signup_validation.rate_limit_enabled', 'True') == 'True',
+                'ip_per_minute': int(config.get_param('j_signup_validation.rate_limit_ip_per_minute', '60')),
+                'ip_burst': int(config.get_param('j_signup_validation.rate_limit_ip_burst', '30')),
+                'session_per_minute': int(config.get_param('j_signup_validation.rate_limit_session_per_minute', '30')),
+                'session_burst': int(config.get_param('j_signup_validation.rate_limit_session_burst', '15')),
+            }
+            
+        except Exception as e:
+            _logger.error(f"Error retrieving rate limit rules: {str(e)}")
+            # Return default rules on error
+            return {
+                'enabled': True,
+                'ip_per_minute': 60,
+                'ip_burst': 30,
+                'session_per_minute': 30,
+                'session_burst': 15,
+            }
+
+    @api.model
+    def get_velocity_rules(self):
+        """
+        Get current registration velocity rules for the signup submission.
         
-        # Check minimum length
-        if len(password) >= rules.get('min_length', 8):
-            score += 25
-        else:
-            messages.append(f"Password must be at least {rules.get('min_length', 8)} characters long")
+        Returns:
+            dict: Current velocity configuration, with one limit per counter
+        """
+        try:
+            config = self.env['ir.config_parameter'].sudo()
+            
+            return {
+                'enabled': config.get_param('j_signup_validation.velocity_enabled', 'True') == 'True',
+                'window_minutes': max(1, int(config.get_param('j_signup_validation.velocity_window_minutes', '10'))),
+                'limits': {
+                    'ip': int(config.get_param('j_signup_validation.velocity_ip_limit', '10')),
+                    'network': int(config.get_param('j_signup_validation.velocity_network_limit', '30')),
+                    'domain': int(config.get_param('j_signup_validation.velocity_domain_limit', '0')),
+                },
+                'action': config.get_param('j_signup_validation.velocity_action', 'block'),
+                'domain_action': config.get_param('j_signup_validation.velocity_domain_action', 'verify'),
+            }
+            
+        except Exception as e:
+            _logger.error(f"Error retrieving velocity rules: {str(e)}")
+            # Return default rules on error
+            return {
+                'enabled': True,
+                'window_minutes': 10,
+                'limits': {'ip': 10, 'network': 30, 'domain': 0},
+                'action': 'block',
+                'domain_action': 'verify',
+            }
+
+    @api.model
+    def get_disposable_email_settings(self):
+        """
+        Get current disposable email detection settings.
         
-        # Check for numbers
-        if rules.get('require_number', True):
-            if any(char.isdigit() for char in password):
-                score += 25
-            else:
-                messages.append("Password must contain at least one number")
-        else:
-            score += 25
+        Returns:
+            dict: Detection method, API key and API URL
+        """
+        config = self.env['ir.config_parameter'].sudo()
+        return {
+            'method': config.get_param('j_signup_validation.temp_mail_detection_method', 'library'),
+            'api_key': config.get_param('j_signup_validation.temp_mail_api_key', ''),
+            'api_url': config.get_param('j_signup_validation.temp_mail_api_url', TEMP_MAIL_API_URL),
+        }
+
+    @api.model
+    def get_trusted_domain_settings(self):
+        """
+        Get current trusted email domain settings.
         
-        # Check for uppercase
-        if rules.get('require_uppercase', False):
-            if any(char.isupper() for char in password):
-                score += 25
-            else:
-                messages.append("Password must contain at least one uppercase letter")
-        else:
-            score += 25
+        Returns:
+            dict: Current allowlist configuration
+        """
+        try:
+            config = self.env['ir.config_parameter'].sudo()
+            
+            return {
+                'enabled': config.get_param('j_signup_validation.email_trusted_domains_enabled', 'True') == 'True',
+                'min_registrations': max(1, int(config.get_param('j_signup_validation.email_trusted_domains_min_registrations', '50'))),
+                'max_domains': int(config.get_param('j_signup_validation.email_trusted_domains_max', '500')),
+            }
+            
+        except Exception as e:
+            _logger.error(f"Error retrieving trusted domain settings: {str(e)}")
+            return {
+                'enabled': True,
+                'min_registrations': 50,
+                'max_domains': 500,
+            }
+
+    @api.model
+    def get_revalidation_settings(self):
+        """
+        Get current periodic revalidation settings.
         
-        # Check for lowercase
-        if rules.get('require_lowercase', False):
-            if any(char.islower() for char in password):
-                score += 25
-            else:
-                messages.append("Password must contain at least one lowercase letter")
-        else:
-            score += 25
+        Returns:
+            dict: Current revalidation configuration
+        """
+        try:
+            config = self.env['ir.config_parameter'].sudo()
+            
+            return {
+                'enabled': config.get_param('j_signup_validation.revalidation_enabled', 'False') == 'True',
+                'interval_days': max(1, int(config.get_param('j_signup_validation.revalidation_interval_days', '30'))),
+                'batch_size': max(1, int(config.get_param('j_signup_validation.revalidation_batch_size', '500'))),
+                'concurrency': max(1, int(config.get_param('j_signup_validation.revalidation_concurrency', '8'))),
+            }
+            
+        except Exception as e:
+            _logger.error(f"Error retrieving revalidation settings: {str(e)}")
+            return {
+                'enabled': False,
+                'interval_days': 30,
+                'batch_size': 500,
+                'concurrency': 8,
+            }
+
+    @api.model
+    def get_upload_settings(self):
+        """
+        Get current limits of the signup form's file uploads.
         
-        # Check for special characters
-        if rules.get('require_special', False):
-            special_chars = "!@#$%^&*()_+-=[]{}|;:,.<>?"
-            if any(char in special_chars for char in password):
-                score += 0  # Already accounted for in previous checks
-            else:
-                messages.append("Password must contain at least one special character")
-                score -= 25
+        Returns:
+            dict: Maximum size in bytes and accepted MIME types
+        """
+        try:
+            config = self.env['ir.config_parameter'].sudo()
+            mimetypes = config.get_param('j_signup_validation.upload_allowed_mimetypes', DEFAULT_UPLOAD_MIMETYPES)
+            
+            return {
+                'max_size': max(1, int(config.get_param('j_signup_validation.upload_max_size_mb', '5'))) * 1024 * 1024,
+                'mimetypes': [mimetype.strip() for mimetype in mimetypes.split(',') if mimetype.strip()],
+            }
+            
+        except Exception as e:
+            _logger.error(f"Error retrieving upload settings: {str(e)}")
+            return {
+                'max_size': 5 * 1024 * 1024,
+                'mimetypes': DEFAULT_UPLOAD_MIMETYPES.split(','),
+            }
+
+    @api.model
+    def get_mailbox_probe_settings(self):
+        """
+        Get current mailbox verification settings.
+        The probe port, sender, timeout and MX override are only available as
+        system parameters (the override routes every probe to one host, e.g.
+        a local SMTP stand-in).
         
-        # Ensure score is within bounds
-        score = max(0, min(100, score))
+        Returns:
+            dict: Current mailbox verification configuration
+        """
+        config = self.env['ir.config_parameter'].sudo()
+        base_host = urls.url_parse(config.get_param('web.base.url', 'http://localhost')).host or 'localhost'
+        try:
+            return {
+                'enabled': config.get_param('j_signup_validation.mailbox_verification_enabled', 'False') == 'True',
+                'per_host_limit': int(config.get_param('j_signup_validation.mailbox_probe_per_host_limit', '2')),
+                'port': int(config.get_param('j_signup_validation.mailbox_probe_port', '25')),
+                'timeout': float(config.get_param('j_signup_validation.mailbox_probe_timeout', '10')),
+                'mx_override': config.get_param('j_signup_validation.mailbox_probe_mx_override', '') or None,
+                'helo_host': base_host,
+                'from_address': config.get_param('j_signup_validation.mailbox_probe_from', f'postmaster@{base_host}'),
+            }
+            
+        except Exception as e:
+            _logger.error(f"Error retrieving mailbox probe settings: {str(e)}")
+            return {
+                'enabled': False,
+                'per_host_limit': 2,
+                'port': 25,
+                'timeout': 10.0,
+                'mx_override': None,
+                'helo_host': base_host,
+                'from_address': f'postmaster@{base_host}',
+            }
+
+    @api.model
+    def validate_password_strength(self, password):
+        """
+        Validate password strength based on current configuration.
         
-        return {
-            'valid': len(messages) == 0,
-            'score': score,
-            'messages': messages
-        }
+        Args:
+            password (str): Password to validate
+            
+        Returns:
+            dict: Validation result with score and messages
+        """
+        rules = self.get_password_validation_rules()
+        breach_filter = self.get_breached_password_filter() if rules.get('breach_check') else None
+        return password_strength(password, rules, breach_filter)
 
     def set_values(self):
         """
@@ -303,19 +788,39 @@ class ResConfigSettings(models.TransientModel):
         config.set_param('j_signup_validation.password_require_uppercase', str(self.password_require_uppercase))
         config.set_param('j_signup_validation.password_require_lowercase', str(self.password_require_lowercase))
         config.set_param('j_signup_validation.password_require_special', str(self.password_require_special))
+        config.set_param('j_signup_validation.password_breach_check', str(self.password_breach_check))
         
         # Email settings
         config.set_param('j_signup_validation.email_syntax_check', str(self.email_syntax_check))
         config.set_param('j_signup_validation.email_mx_verification', str(self.email_mx_verification))
         config.set_param('j_signup_validation.email_disposable_check', str(self.email_disposable_check))
+        config.set_param('j_signup_validation.email_trusted_domains_enabled', str(self.email_trusted_domains_enabled))
         
         # Phone settings
         config.set_param('j_signup_validation.phone_validation_enabled', str(self.phone_validation_enabled))
         config.set_param('j_signup_validation.phone_require_mobile', str(self.phone_require_mobile))
+        config.set_param('j_signup_validation.phone_unique', str(self.phone_unique))
         
         # Registration settings
         config.set_param('j_signup_validation.registration_require_email_verification', str(self.registration_require_email_verification))
         config.set_param('j_signup_validation.registration_auto_login', str(self.registration_auto_login))
+        config.set_param('j_signup_validation.validation_report_all_errors', str(self.validation_report_all_errors))
+        
+        # Rate limiting settings
+        config.set_param('j_signup_validation.rate_limit_enabled', str(self.rate_limit_enabled))
+        
+        # Registration velocity settings
+        config.set_param('j_signup_validation.velocity_enabled', str(self.velocity_enabled))
+        
+        # Mailbox verification settings
+        config.set_param('j_signup_validation.mailbox_verification_enabled', str(self.mailbox_verification_enabled))
+        
+        # Revalidation settings
+        config.set_param('j_signup_validation.revalidation_enabled', str(self.revalidation_enabled))
+        
+        # Archival settings
+        config.set_param('j_signup_validation.archive_enabled', str(self.archive_enabled))
+        config.set_param('j_signup_validation.archive_inactive', str(self.archive_inactive))
 
     @api.model
     def get_values(self):
@@ -333,19 +838,39 @@ class ResConfigSettings(models.TransientModel):
             'password_require_uppercase': config.get_param('j_signup_validation.password_require_uppercase', 'False') == 'True',
             'password_require_lowercase': config.get_param('j_signup_validation.password_require_lowercase', 'False') == 'True',
             'password_require_special': config.get_param('j_signup_validation.password_require_special', 'False') == 'True',
+            'password_breach_check': config.get_param('j_signup_validation.password_breach_check', 'False') == 'True',
             
             # Email settings
             'email_syntax_check': config.get_param('j_signup_validation.email_syntax_check', 'True') == 'True',
             'email_mx_verification': config.get_param('j_signup_validation.email_mx_verification', 'True') == 'True',
             'email_disposable_check': config.get_param('j_signup_validation.email_disposable_check', 'True') == 'True',
+            'email_trusted_domains_enabled': config.get_param('j_signup_validation.email_trusted_domains_enabled', 'True') == 'True',
             
             # Phone settings
             'phone_validation_enabled': config.get_param('j_signup_validation.phone_validation_enabled', 'True') == 'True',
             'phone_require_mobile': config.get_param('j_signup_validation.phone_require_mobile', 'False') == 'True',
+            'phone_unique': config.get_param('j_signup_validation.phone_unique', 'False') == 'True',
             
             # Registration settings
             'registration_require_email_verification': config.get_param('j_signup_validation.registration_require_email_verification', 'False') == 'True',
             'registration_auto_login': config.get_param('j_signup_validation.registration_auto_login', 'True') == 'True',
+            'validation_report_all_errors': config.get_param('j_signup_validation.validation_report_all_errors', 'False') == 'True',
+            
+            # Rate limiting settings
+            'rate_limit_enabled': config.get_param('j_signup_validation.rate_limit_enabled', 'True') == 'True',
+            
+            # Registration velocity settings
+            'velocity_enabled': config.get_param('j_signup_validation.velocity_enabled', 'True') == 'True',
+            
+            # Mailbox verification settings
+            'mailbox_verification_enabled': config.get_param('j_signup_validation.mailbox_verification_enabled', 'False') == 'True',
+            
+            # Revalidation settings
+            'revalidation_enabled': config.get_param('j_signup_validation.revalidation_enabled', 'False') == 'True',
+            
+            # Archival settings
+            'archive_enabled': config.get_param('j_signup_validation.archive_enabled', 'False') == 'True',
+            'archive_inactive': config.get_param('j_signup_validation.archive_inactive', 'True') == 'True',
         })
         
         return res
\ No newline at end of file
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+res.country Model Extension
+Compact, cached country and phone code metadata for the signup form's
+country picker.
+"""
+
+import bisect
+import hashlib
+import json
+import logging
+import unicodedata
+
+from odoo import models, api, tools
+
+_logger = logging.getLogger(__name__)
+
+# Upper bound on prefix matches collected before ranking a search
+SEARCH_MATCH_LIMIT = 200
+
+
+def normalize_search_term(value):
+    """Lowercase, accent-free form of a search term or indexed token."""
+    value = unicodedata.normalize('NFKD', value or '')
+    return ''.join(char for char in value if not unicodedata.combining(char)).lower().strip().lstrip('+')
+
+
+class ResCountry(models.Model):
+    """
+    Extend res.country with the signup country metadata.
+    """
+    _inherit = 'res.country'
+
+    @api.model
+    @tools.ormcache('self.env.lang or "en_US"')
+    def _get_signup_country_data(self):
+        """
+        Countries with a phone code, as served to the signup form.
+        Cached per language until a country changes.
+
+        Returns:
+            dict: 'rows' (tuple of (id, ISO code, phone code, localized name)
+                  sorted by name), 'payload' (JSON bytes), 'etag' (content
+                  hash) and 'index' (sorted (token, row position) pairs)
+        """
+        countries = self.sudo().search([('phone_code', '!=', False)], order='name')
+        rows = tuple((country.id, country.code, str(country.phone_code), country.name) for country in countries)
+
+        payload = json.dumps({'countries': rows}, separators=(',', ':'), ensure_ascii=False).encode()
+        etag = hashlib.sha256(payload).hexdigest()[:32]
+
+        # Every word of the name, the full name, the ISO code and the phone
+        # code is a searchable prefix
+        index = set()
+        for position, (_country_id, code, phone_code, name) in enumerate(rows):
+            normalized_name = normalize_search_term(name)
+            tokens = set(normalized_name.replace('-', ' ').replace('(', ' ').split())
+            tokens.update({normalized_name, normalize_search_term(code), phone_code})
+            index.update((token, position) for token in tokens if token)
+
+        return {
+            'rows': rows,
+            'payload': payload,
+            'etag': etag,
+            'index': tuple(sorted(index)),
+        }
+
+    @api.model
+    def search_signup_countries(self, query, limit=20):
+        """
+        Prefix search over the country names, ISO codes and phone codes.
+
+        Args:
+            query (str): Typed prefix
+            limit (int): Maximum number of results
+
+        Returns:
+            list: (id, ISO code, phone code, localized name) tuples in name order
+        """
+        data = self._get_signup_country_data()
+        term = normalize_search_term(query)
+        if not term:
+            return list(data['rows'][:limit])
+
+        index = data['index']
+        positions = set()
+        start = bisect.bisect_left(index, (term,))
+        for token, position in index[start:start + SEARCH_MATCH_LIMIT]:
+            if not token.startswith(term):
+                break
+            positions.add(position)
+        return [data['rows'][position] for position in sorted(positions)[:limit]]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        countries = super(ResCountry, self).create(vals_list)
+        self.env.registry.clear_cache()
+        return countries
+
+    def write(self, vals):
+        result = super(ResCountry, self).write(vals)
+        self.env.registry.clear_cache()
+        return result
+
+    def unlink(self):
+        result = super(ResCountry, self).unlink()
+        self.env.registry.clear_cache()
+        return result
@@ -5,9 +5,27 @@ Custom model to store user registration information for future reference.
 """
 
 import logging
+import secrets
+import time
+from collections import Counter
+from datetime import timedelta
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError, UserError
 
+from ..tools import signup_validators
+from ..tools.mailbox_probe import MailboxProber, STATUS_UNKNOWN
+from ..tools.phone_numbers import normalize_e164
+from .saas_user_stats import strength_bucket
+
+# Fields making up the key of the saas.user.stats aggregates
+STATS_FIELDS = {
+    'su_registration_date', 'su_phone_country_id', 'su_account_type',
+    'su_email_validated', 'su_phone_validated', 'su_password_strength',
+}
+
+# Time budget of one revalidation run; remaining batches are rescheduled
+REVALIDATION_CRON_TIME_LIMIT = 240
+
 _logger = logging.getLogger(__name__)
 
 
@@ -56,6 +74,14 @@ class SaasUser(models.Model):
         help='User\'s email address used for registration and login'
     )
     
+    su_email_domain = fields.Char(
+        'Email Domain',
+        compute='_compute_email_domain',
+        store=True,
+        index=True,
+        help='Lowercase domain of the email address, used to learn the trusted email domains'
+    )
+    
     su_phone_country_id = fields.Many2one(
         'res.country',
         'Phone Country',
@@ -71,6 +97,14 @@ class SaasUser(models.Model):
         tracking=True,
         help='User\'s phone number with international format validation'
     )
+    
+    su_phone_e164 = fields.Char(
+        'Normalized Phone',
+        compute='_compute_phone_e164',
+        store=True,
+        index=True,
+        help='Phone number in E.164 format, used to find registrations sharing a number'
+    )
 
     su_account_type = fields.Selection([
         ('individual', 'Individual'),
@@ -99,7 +133,8 @@ class SaasUser(models.Model):
         'Email Validated',
         default=False,
         tracking=True,
-        help='Indicates if email passed all validation checks'
+        help='Indicates if email passed all validation checks, or was confirmed through '
+             'the verification link when email verification is required'
     )
     
     su_phone_validated = fields.Boolean(
@@ -150,11 +185,97 @@ class SaasUser(models.Model):
         help='Indicates if the SaaS user record is active'
     )
     
+    # Email Verification
+    company_id = fields.Many2one(
+        'res.company',
+        'Company',
+        default=lambda self: self.env.company,
+        help='Company the user registered with, used in notification emails'
+    )
+    
+    su_verification_state = fields.Selection([
+        ('not_required', 'Not Required'),
+        ('pending', 'Pending Email'),
+        ('sent', 'Email Sent'),
+        ('verified', 'Verified'),
+        ('expired', 'Expired'),
+    ], 'Verification Status',
+        default='not_required',
+        index=True,
+        copy=False,
+        tracking=True,
+        help='Progress of the email verification link sent after registration'
+    )
+    
+    su_verification_token = fields.Char(
+        'Verification Token',
+        index=True,
+        copy=False,
+        groups='base.group_system',
+        help='Secret token of the email verification link'
+    )
+    
+    su_verification_expiry = fields.Datetime(
+        'Verification Link Expiry',
+        copy=False,
+        help='Date and time after which the verification link is no longer accepted'
+    )
+    
+    su_verification_url = fields.Char(
+        'Verification Link',
+        compute='_compute_verification_url',
+        groups='base.group_system',
+        help='Link activating the account, sent to the registered email address'
+    )
+    
+    # Mailbox Deliverability (filled by the background verification job)
+    su_mailbox_status = fields.Selection([
+        ('pending', 'Pending'),
+        ('deliverable', 'Deliverable'),
+        ('undeliverable', 'Undeliverable'),
+        ('catch_all', 'Catch-All Domain'),
+        ('unknown', 'Unknown'),
+    ], 'Mailbox Status',
+        default='pending',
+        index=True,
+        copy=False,
+        help='Result of the SMTP mailbox probe run in the background after registration'
+    )
+    
+    su_mailbox_checked_date = fields.Datetime(
+        'Mailbox Checked On',
+        copy=False,
+        help='Date and time of the last SMTP mailbox probe'
+    )
+    
+    su_validation_checked_date = fields.Datetime(
+        'Validation Checked On',
+        default=fields.Datetime.now,
+        index=True,
+        copy=False,
+        help='Date and time the email and phone validation flags were last computed, '
+             'at signup or by the periodic revalidation'
+    )
+    
     # SQL constraints for database-level duplicate prevention
     _sql_constraints = [
         ('unique_email', 'UNIQUE(su_email)', 'An account with this email address already exists.'),
     ]
 
+    @api.depends('su_phone', 'su_phone_country_id')
+    def _compute_phone_e164(self):
+        """
+        Normalize the phone number to E.164 for the same-number lookups.
+        """
+        for record in self:
+            country = record.su_phone_country_id
+            record.su_phone_e164 = normalize_e164(record.su_phone, country.code, country.phone_code)
+
+    @api.depends('su_email')
+    def _compute_email_domain(self):
+        for record in self:
+            record.su_email_domain = signup_validators.email_domain(record.su_email or '') or False
+
     @api.depends('su_first_name', 'su_last_name', 'su_company_name', 'su_account_type')
     def _compute_complete_name(self):
         """
@@ -183,6 +304,17 @@ class SaasUser(models.Model):
         
         _logger.info(f"Computed complete names for {len(self)} SaaS user records")
 
+    def _compute_verification_url(self):
+        """
+        Compute the verification link from the base URL and the token.
+        """
+        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url', '')
+        for record in self:
+            if record.su_verification_token:
+                record.su_verification_url = f"{base_url}/j_signup_validation/verify?token={record.su_verification_token}"
+            else:
+                record.su_verification_url = False
+
     @api.constrains('su_email')
     def _check_email_unique(self):
         """
@@ -201,6 +333,24 @@ class SaasUser(models.Model):
                           "Please use a different email or try to login.")
                     )
 
+    @api.constrains('su_phone_e164')
+    def _check_phone_unique(self):
+        """
+        Ensure phone uniqueness across SaaS users when the policy is enabled.
+        """
+        if not self.env['res.config.settings'].get_phone_validation_rules().get('unique'):
+            return
+        for record in self:
+            if record.su_phone_e164 and self.search_count([
+                ('su_phone_e164', '=', record.su_phone_e164),
+                ('id', '!=', record.id),
+            ], limit=1):
+                _logger.warning(f"Duplicate phone registration attempt: {record.su_phone_e164}")
+                raise ValidationError(
+                    _("An account with this phone number already exists. "
+                      "Please use a different phone number or try to login.")
+                )
+
     @api.constrains('su_account_type', 'su_first_name', 'su_last_name', 'su_company_name')
     def _check_account_type_fields(self):
         """
@@ -227,6 +377,8 @@ class SaasUser(models.Model):
         """
         # Create the SaaS user record first
         saas_user = super(SaasUser, self).create(vals)
+        if not self.env.context.get('saas_user_archiving'):
+            self.env['saas.user.stats']._apply_deltas(Counter([saas_user._registration_stats_key()]))
         
         try:
             # Check if portal user should be created (skip if already linked)
@@ -294,13 +446,15 @@ class SaasUser(models.Model):
                 # Create portal user using normal create method
                 portal_group = self.env.ref('base.group_portal')
                 portal_user_vals['groups_id'] = [(6, 0, [portal_group.id])]
-                portal_user_vals['active'] = True
+                # Accounts awaiting email verification are activated by the verification link
+                portal_user_vals['active'] = saas_user.su_verification_state not in ('pending', 'sent')
                 # Set bidirectional relation - portal user points to SaaS user
                 portal_user_vals['saas_user_id'] = saas_user.id
                 
                 # Use savepoint to ensure atomicity
                 with self.env.cr.savepoint():
                     portal_user = self.env['res.users'].sudo().create(portal_user_vals)
+                    self.env['signup.upload'].attach_uploads(portal_user, self.env.context.get('dynamic_attachments', {}))
                     
                     # Link the portal user to SaaS user (completing bidirectional relation)
                     saas_user.write({'su_portal_user_id': portal_user.id})
@@ -421,8 +575,17 @@ class SaasUser(models.Model):
         """
         Override write method to sync changes to linked portal user.
         """
+        track_stats = STATS_FIELDS.intersection(vals) and not self.env.context.get('saas_user_archiving')
+        if track_stats:
+            previous_keys = Counter(record._registration_stats_key() for record in self)
+        
         result = super(SaasUser, self).write(vals)
         
+        if track_stats:
+            deltas = Counter(record._registration_stats_key() for record in self)
+            deltas.subtract(previous_keys)
+            self.env['saas.user.stats']._apply_deltas(deltas)
+        
         # Sync data to portal user if any relevant fields changed
         sync_fields = ['su_first_name', 'su_last_name', 'su_company_name', 'su_email', 'su_phone', 'su_phone_country_id', 'su_account_type', 'su_vat_cr_number']
         
@@ -433,6 +596,34 @@ class SaasUser(models.Model):
         
         return result
 
+    def unlink(self):
+        """
+        Override unlink to remove the records from the registration statistics.
+        Archived registrations keep counting.
+        """
+        if not self.env.context.get('saas_user_archiving'):
+            deltas = Counter()
+            for record in self:
+                deltas[record._registration_stats_key()] -= 1
+            self.env['saas.user.stats']._apply_deltas(deltas)
+        return super(SaasUser, self).unlink()
+
+    def _registration_stats_key(self):
+        """
+        Returns:
+            tuple: Key of the saas.user.stats row the record counts in
+        """
+        self.ensure_one()
+        registration_date = self.su_registration_date or self.create_date
+        return (
+            registration_date.date(),
+            self.su_phone_country_id.id or None,
+            self.su_account_type or 'individual',
+            bool(self.su_email_validated),
+            bool(self.su_phone_validated),
+            strength_bucket(self.su_password_strength),
+        )
+
     def _sync_to_portal_user(self):
         """
         Sync SaaS User data to linked Portal User.
@@ -522,6 +713,305 @@ class SaasUser(models.Model):
             'portal_user_active': self.su_portal_user_id.active if self.su_portal_user_id else False,
         }
 
+    @api.model
+    def _get_verification_ttl_hours(self):
+        """
+        Returns:
+            int: Validity of verification links, in hours
+        """
+        config = self.env['ir.config_parameter'].sudo()
+        return int(config.get_param('j_signup_validation.registration_verification_ttl_hours', '24'))
+
+    @api.model
+    def _prepare_email_verification_vals(self):
+        """
+        Values starting email verification for a new or existing registration.
+        
+        Returns:
+            dict: Verification state, a fresh token and its expiry
+        """
+        return {
+            'su_verification_state': 'pending',
+            'su_verification_token': secrets.token_urlsafe(32),
+            'su_verification_expiry': fields.Datetime.now() + timedelta(hours=self._get_verification_ttl_hours()),
+            'su_email_validated': False,
+        }
+
+    @api.model
+    def _trigger_verification_emails(self):
+        """
+        Ask the cron to render and queue pending verification emails soon,
+        outside of the current request.
+        """
+        cron = self.env.ref('j_signup_validation.ir_cron_saas_user_send_verification', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
+
+    @api.model
+    def verify_email_token(self, token):
+        """
+        Activate the registration owning a verification token.
+        
+        Args:
+            token (str): Token from the verification link
+            
+        Returns:
+            tuple: (status, record) with status 'verified', 'already_verified',
+                   'expired' or 'invalid'
+        """
+        if not token:
+            return 'invalid', self.browse()
+        
+        # Single lookup on the indexed token column
+        record = self.sudo().search([('su_verification_token', '=', token)], limit=1)
+        if not record:
+            return 'invalid', record
+        if record.su_verification_state == 'verified':
+            return 'already_verified', record
+        if not record.su_verification_expiry or record.su_verification_expiry < fields.Datetime.now():
+            record.write({'su_verification_state': 'expired'})
+            return 'expired', record
+        
+        record.write({
+            'su_verification_state': 'verified',
+            'su_verification_token': False,
+            'su_email_validated': True,
+        })
+        if record.su_portal_user_id and not record.su_portal_user_id.active:
+            record.su_portal_user_id.sudo().write({'active': True})
+        
+        _logger.info(f"Email verified for SaaS user {record.id} ({record.su_email})")
+        return 'verified', record
+
+    def action_resend_verification(self):
+        """
+        Issue a new verification link and queue the verification email.
+        """
+        to_resend = self.filtered(lambda r: r.su_verification_state != 'verified')
+        if not to_resend:
+            raise UserError(_('The selected registrations are already verified.'))
+        
+        to_resend.sudo().write(self._prepare_email_verification_vals())
+        self._trigger_verification_emails()
+        
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Verification Email'),
+                'message': _('The verification email will be sent shortly.'),
+                'type': 'success',
+            },
+        }
+
+    @api.model
+    def _cron_send_verification_emails(self, batch_size=100):
+        """
+        Render pending verification emails in batches and queue them as
+        mail.mail records, sent afterwards by the mail queue. Expired links
+        are flagged in the same run.
+        """
+        now = fields.Datetime.now()
+        self.search([
+            ('su_verification_state', 'in', ('pending', 'sent')),
+            ('su_verification_expiry', '<', now),
+        ]).write({'su_verification_state': 'expired'})
+        
+        records = self.search([('su_verification_state', '=', 'pending')], order='id', limit=batch_size)
+        if not records:
+            return
+        
+        template = self.env.ref('j_signup_validation.mail_template_saas_user_email_verification', raise_if_not_found=False)
+        if not template:
+            _logger.error("Email verification template is missing, cannot send verification emails")
+            return
+        
+        # Render once per language for the whole batch
+        mail_values = []
+        for lang_template, res_ids in template._classify_per_lang(records.ids).values():
+            rendered = {
+                field: lang_template._render_field(field, res_ids)
+                for field in ('subject', 'body_html', 'email_from', 'email_to')
+            }
+            for res_id in res_ids:
+                mail_values.append({
+                    'subject': rendered['subject'][res_id],
+                    'body_html': rendered['body_html'][res_id],
+                    'email_from': rendered['email_from'][res_id],
+                    'email_to': rendered['email_to'][res_id],
+                    'model': self._name,
+                    'res_id': res_id,
+                    'auto_delete': template.auto_delete,
+                })
+        
+        self.env['mail.mail'].sudo().create(mail_values)
+        records.write({'su_verification_state': 'sent'})
+        _logger.info(f"Queued {len(mail_values)} email verification messages")
+        
+        # Let the mail queue pick them up now rather than at its next interval
+        mail_cron = self.env.ref('mail.ir_cron_mail_scheduler_action', raise_if_not_found=False)
+        if mail_cron:
+            mail_cron._trigger()
+        if len(records) == batch_size:
+            self._trigger_verification_emails()
+
+    @api.model
+    def _cron_verify_mailboxes(self, batch_size=200):
+        """
+        Probe mailbox deliverability of new registrations over SMTP, in batches.
+        Pending records are checked first, then inconclusive results older
+        than a day. Runs outside the signup request, so signup latency is
+        not affected; the cron re-triggers itself while work remains.
+        """
+        settings = self.env['res.config.settings'].get_mailbox_probe_settings()
+        if not settings['enabled']:
+            return
+        
+        records = self.search([('su_mailbox_status', '=', 'pending')], order='id', limit=batch_size)
+        if len(records) < batch_size:
+            retry_before = fields.Datetime.now() - timedelta(days=1)
+            records |= self.search([
+                ('su_mailbox_status', '=', 'unknown'),
+                ('su_mailbox_checked_date', '<', retry_before),
+            ], order='su_mailbox_checked_date', limit=batch_size - len(records))
+        if not records:
+            return
+        
+        prober = MailboxProber(
+            helo_host=settings['helo_host'],
+            from_address=settings['from_address'],
+            port=settings['port'],
+            timeout=settings['timeout'],
+            per_host_limit=settings['per_host_limit'],
+            mx_override=settings['mx_override'],
+        )
+        results = prober.probe(records.mapped('su_email'))
+        
+        # One write per outcome instead of one per record
+        now = fields.Datetime.now()
+        by_status = {}
+        for record in records:
+            status, detail = results.get(record.su_email, (STATUS_UNKNOWN, 'not probed'))
+            _logger.debug(f"Mailbox probe for {record.su_email}: {status} ({detail})")
+            by_status.setdefault(status, self.browse())
+            by_status[status] |= record
+        for status, status_records in by_status.items():
+            status_records.write({'su_mailbox_status': status, 'su_mailbox_checked_date': now})
+        
+        _logger.info(f"Probed {len(records)} mailboxes over {prober.connections} SMTP sessions: "
+                     f"{ {status: len(recs) for status, recs in by_status.items()} }")
+        
+        if len(records) == batch_size:
+            self.env.ref('j_signup_validation.ir_cron_saas_user_verify_mailboxes')._trigger()
+
+    @api.model
+    def _cron_revalidate_registrations(self):
+        """
+        Check the email domain and phone number of registrations again,
+        oldest check first, one committed transaction per batch. The check
+        dates are the watermark: an interrupted run resumes with the first
+        batch it did not commit.
+        """
+        settings = self.env['res.config.settings'].get_revalidation_settings()
+        if not settings['enabled']:
+            return
+        
+        config_settings = self.env['res.config.settings']
+        email_settings = signup_validators.EmailSettings.from_rules(
+            config_settings.get_email_validation_rules(), config_settings.get_disposable_email_settings())
+        phone_settings = signup_validators.PhoneSettings.from_rules(config_settings.get_phone_validation_rules())
+        
+        cutoff = fields.Datetime.now() - timedelta(days=settings['interval_days'])
+        started = time.monotonic()
+        run_stats = Counter()
+        while True:
+            records = self.search([('su_validation_checked_date', '<', cutoff)],
+                                  order='su_validation_checked_date, id', limit=settings['batch_size'])
+            if not records:
+                break
+            run_stats.update(records._revalidate(email_settings, phone_settings, settings['concurrency']))
+            self.env.cr.commit()
+            
+            if time.monotonic() - started > REVALIDATION_CRON_TIME_LIMIT:
+                self.env.ref('j_signup_validation.ir_cron_saas_user_revalidate')._trigger()
+                break
+        
+        if run_stats['records']:
+            elapsed = time.monotonic() - started
+            _logger.info(f"Revalidated {run_stats['records']} registrations ({run_stats['domains']} email domains) "
+                         f"in {elapsed:.1f}s, {run_stats['records'] / elapsed:.1f}/s: "
+                         f"emails {run_stats['email_invalidated']} invalidated, {run_stats['email_validated']} validated; "
+                         f"phones {run_stats['phone_invalidated']} invalidated, {run_stats['phone_validated']} validated")
+
+    def _revalidate(self, email_settings, phone_settings, concurrency):
+        """
+        Recompute the validation flags of a batch of registrations: each
+        email domain is resolved once, on at most ``concurrency`` threads,
+        and the results are written with one write per distinct change.
+        Emails waiting for their verification link are never flagged valid.
+        
+        Returns:
+            Counter: Records, email domains and flag changes of the batch
+        """
+        emails = [record.su_email or '' for record in self]
+        check_email = email_settings.syntax_check or email_settings.mx_verification or email_settings.disposable_check
+        email_results = signup_validators.validate_emails(
+            emails, email_settings, max_workers=concurrency) if check_email else [None] * len(self)
+        phone_results = signup_validators.validate_phones(
+            [(record.su_phone or '', record.su_phone_country_id) for record in self],
+            phone_settings) if phone_settings.validation_enabled else [None] * len(self)
+        
+        batch_stats = Counter(records=len(self), domains=len({signup_validators.email_domain(email) for email in emails}))
+        changes = {}
+        for record, email_result, phone_result in zip(self, email_results, phone_results):
+            vals = {}
+            if email_result is not None:
+                email_validated = email_result.valid and record.su_verification_state in ('not_required', 'verified')
+                if email_validated != record.su_email_validated:
+                    vals['su_email_validated'] = email_validated
+                    batch_stats['email_validated' if email_validated else 'email_invalidated'] += 1
+            if phone_result is not None and phone_result.valid != record.su_phone_validated:
+                vals['su_phone_validated'] = phone_result.valid
+                batch_stats['phone_validated' if phone_result.valid else 'phone_invalidated'] += 1
+            changes.setdefault(tuple(sorted(vals.items())), []).append(record.id)
+        
+        now = fields.Datetime.now()
+        for key, record_ids in changes.items():
+            self.browse(record_ids).write(dict(key, su_validation_checked_date=now))
+        return batch_stats
+
+    def action_view_same_phone(self):
+        """
+        Open all registrations sharing this record's normalized phone number.
+        """
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Registrations with %s') % (self.su_phone_e164 or self.su_phone),
+            'res_model': 'saas.user',
+            'view_mode': 'tree,form',
+            'domain': [('su_phone_e164', '=', self.su_phone_e164)] if self.su_phone_e164 else [('id', '=', self.id)],
+            'context': {'active_test': False},
+            'target': 'current',
+        }
+
+    def action_archive_registrations(self):
+        """
+        Move the selected registrations to the archive.
+        """
+        count = len(self)
+        self.env['saas.user.archive'].archive_records(self, 'manual')
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Archived'),
+                'message': _('%s registrations were moved to the archive.') % count,
+                'type': 'success',
+                'next': {'type': 'ir.actions.client', 'tag': 'reload'},
+            },
+        }
+
     def action_view_portal_user(self):
         """
         Open the related portal user record.
@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+"""
+SaaS User Archive Model
+Compact storage for old or inactive registrations moved out of saas.user,
+keeping the hot table and its indexes small while staying searchable and
+restorable.
+"""
+
+import base64
+import json
+import logging
+import time
+import zlib
+from datetime import timedelta
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+# saas.user fields not worth archiving: recomputed or owned by other tables
+_SKIPPED_FIELDS = {
+    'id', 'display_name', 'su_complete_name', 'su_email_domain', 'su_verification_url',
+    'create_uid', 'write_uid', 'write_date', '__last_update',
+}
+
+# Raw value columns of mail.tracking.value kept with the archived chatter
+_TRACKING_VALUE_FIELDS = (
+    'old_value_integer', 'new_value_integer',
+    'old_value_float', 'new_value_float',
+    'old_value_char', 'new_value_char',
+    'old_value_text', 'new_value_text',
+    'old_value_datetime', 'new_value_datetime',
+)
+
+# Time budget of one cron run; remaining chunks are rescheduled
+ARCHIVE_CRON_TIME_LIMIT = 240
+
+
+def _pack(payload):
+    """Compress a JSON-serializable payload for a binary column."""
+    data = json.dumps(payload, default=str, separators=(',', ':')).encode()
+    return base64.b64encode(zlib.compress(data, 9))
+
+
+def _unpack(value):
+    """Inverse of ``_pack``."""
+    if not value:
+        return None
+    return json.loads(zlib.decompress(base64.b64decode(value)))
+
+
+class SaasUserArchive(models.Model):
+    """
+    Archived SaaS user registration.
+    The searchable columns are kept as plain fields; the full record and its
+    chatter (messages with tracking values) are stored zlib-compressed.
+    """
+    _name = 'saas.user.archive'
+    _description = 'Archived SaaS User Registration'
+    _order = 'sua_archived_date desc, id desc'
+    _rec_name = 'sua_complete_name'
+
+    sua_original_id = fields.Integer(
+        'Original Record ID',
+        index=True,
+        readonly=True,
+        help='Database ID the registration had in the SaaS users table'
+    )
+
+    sua_complete_name = fields.Char('Complete Name', readonly=True)
+
+    sua_email = fields.Char('Email Address', index=True, readonly=True)
+
+    sua_phone = fields.Char('Phone Number', readonly=True)
+
+    sua_account_type = fields.Selection([
+        ('individual', 'Individual'),
+        ('company', 'Company')
+    ], 'Account Type', readonly=True)
+
+    sua_company_name = fields.Char('Company Name', readonly=True)
+
+    sua_registration_date = fields.Datetime('Registration Date', index=True, readonly=True)
+
+    sua_was_active = fields.Boolean('Was Active', readonly=True)
+
+    # Keep the registration statistics rebuildable after archival
+    sua_country_id = fields.Many2one('res.country', 'Phone Country', readonly=True)
+
+    sua_email_validated = fields.Boolean('Email Validated', readonly=True)
+
+    sua_phone_validated = fields.Boolean('Phone Validated', readonly=True)
+
+    sua_password_strength = fields.Integer('Password Strength Score', readonly=True)
+
+    sua_portal_user_id = fields.Many2one(
+        'res.users',
+        'Portal User',
+        ondelete='set null',
+        readonly=True,
+        context={'active_test': False},
+        help='Portal user the registration was linked to; relinked on restore'
+    )
+
+    sua_archived_date = fields.Datetime(
+        'Archived On',
+        default=fields.Datetime.now,
+        index=True,
+        readonly=True
+    )
+
+    sua_reason = fields.Selection([
+        ('age', 'Older Than Threshold'),
+        ('inactive', 'Inactive'),
+        ('manual', 'Manual'),
+    ], 'Archive Reason', readonly=True)
+
+    sua_message_count = fields.Integer('Archived Messages', readonly=True)
+
+    sua_data = fields.Binary(
+        'Compressed Record',
+        attachment=False,
+        readonly=True,
+        help='zlib-compressed JSON of the archived registration values'
+    )
+
+    sua_chatter = fields.Binary(
+        'Compressed Chatter',
+        attachment=False,
+        readonly=True,
+        help='zlib-compressed JSON of the archived messages and tracking values'
+    )
+
+    @api.model
+    def _get_archive_settings(self):
+        """
+        Returns:
+            dict: Archival configuration
+        """
+        config = self.env['ir.config_parameter'].sudo()
+        return {
+            'enabled': config.get_param('j_signup_validation.archive_enabled', 'False') == 'True',
+            'after_days': int(config.get_param('j_signup_validation.archive_after_days', '365')),
+            'inactive': config.get_param('j_signup_validation.archive_inactive', 'True') == 'True',
+            'chunk_size': int(config.get_param('j_signup_validation.archive_chunk_size', '200')),
+        }
+
+    @api.model
+    def _archivable_domain(self, settings):
+        """
+        Domain of the saas.user records eligible for archival.
+        """
+        domains = []
+        if settings['inactive']:
+            domains.append([('su_active', '=', False)])
+        if settings['after_days'] > 0:
+            cutoff = fields.Datetime.now() - timedelta(days=settings['after_days'])
+            domains.append([('su_registration_date', '<', cutoff)])
+        if not domains:
+            return None
+        if len(domains) == 1:
+            return domains[0]
+        return ['|'] + domains[0] + domains[1]
+
+    @api.model
+    def _cron_archive_registrations(self):
+        """
+        Move eligible registrations to the archive, one committed transaction
+        per chunk, so locks stay short and an interruption loses at most one
+        chunk of work.
+        """
+        settings = self._get_archive_settings()
+        if not settings['enabled']:
+            return
+        domain = self._archivable_domain(settings)
+        if domain is None:
+            return
+
+        saas_users = self.env['saas.user'].with_context(active_test=False)
+        started = time.monotonic()
+        archived = 0
+        while True:
+            chunk = saas_users.search(domain, order='id', limit=settings['chunk_size'])
+            if not chunk:
+                break
+            inactive = chunk.filtered(lambda r: not r.su_active)
+            self.archive_records(inactive, 'inactive')
+            self.archive_records(chunk - inactive, 'age')
+            self.env.cr.commit()
+            archived += len(chunk)
+
+            if time.monotonic() - started > ARCHIVE_CRON_TIME_LIMIT:
+                _logger.info(f"Archived {archived} registrations, rescheduling for the remaining ones")
+                self.env.ref('j_signup_validation.ir_cron_saas_user_archive')._trigger()
+                return
+
+        if archived:
+            _logger.info(f"Archived {archived} SaaS user registrations")
+
+    @api.model
+    def archive_records(self, saas_users, reason):
+        """
+        Move SaaS user records and their chatter to the archive.
+        Portal users are detached first so the cascade on res.users.saas_user_id
+        never deletes them.
+
+        Args:
+            saas_users (recordset): saas.user records to archive
+            reason (str): Archive reason
+
+        Returns:
+            recordset: Created archive records
+        """
+        if not saas_users:
+            return self.browse()
+        saas_users = saas_users.sudo().with_context(active_test=False)
+
+        field_names = [
+            name for name, field in saas_users._fields.items()
+            if field.store and name not in _SKIPPED_FIELDS
+            and field.type not in ('one2many', 'many2many')
+            and not name.startswith(('message_', 'activity_'))
+        ]
+        values = {row['id']: row for row in saas_users.read(field_names, load=None)}
+        chatter = self._read_chatter(saas_users)
+
+        vals_list = []
+        for record in saas_users:
+            record_values = values[record.id]
+            record_values.pop('id', None)
+            messages = chatter.get(record.id, [])
+            vals_list.append({
+                'sua_original_id': record.id,
+                'sua_complete_name': record.su_complete_name,
+                'sua_email': record.su_email,
+                'sua_phone': record.su_phone,
+                'sua_account_type': record.su_account_type,
+                'sua_company_name': record.su_company_name,
+                'sua_registration_date': record.su_registration_date,
+                'sua_was_active': record.su_active,
+                'sua_country_id': record.su_phone_country_id.id,
+                'sua_email_validated': record.su_email_validated,
+                'sua_phone_validated': record.su_phone_validated,
+                'sua_password_strength': record.su_password_strength,
+                'sua_portal_user_id': record.su_portal_user_id.id,
+                'sua_reason': reason,
+                'sua_message_count': len(messages),
+                'sua_data': _pack(record_values),
+                'sua_chatter': _pack(messages) if messages else False,
+            })
+        archives = self.sudo().create(vals_list)
+
+        portal_users = self.env['res.users'].sudo().with_context(active_test=False).search([
+            ('saas_user_id', 'in', saas_users.ids),
+        ])
+        portal_users.write({'saas_user_id': False})
+        # mail.thread removes messages, tracking values and followers with the records
+        saas_users.with_context(saas_user_archiving=True).unlink()
+
+        _logger.info(f"Archived {len(archives)} SaaS user registrations ({reason})")
+        return archives
+
+    @api.model
+    def _read_chatter(self, saas_users):
+        """
+        Returns:
+            dict: saas.user id -> list of message dicts with tracking values
+        """
+        messages = self.env['mail.message'].sudo().search([
+            ('model', '=', 'saas.user'),
+            ('res_id', 'in', saas_users.ids),
+        ], order='id')
+        if not messages:
+            return {}
+
+        tracking_model = self.env['mail.tracking.value'].sudo()
+        tracking_fields = [name for name in _TRACKING_VALUE_FIELDS if name in tracking_model._fields]
+        tracking_by_message = {}
+        for tracking in tracking_model.search([('mail_message_id', 'in', messages.ids)]):
+            row = {name: tracking[name] for name in tracking_fields}
+            row['field'] = tracking.field_id.name
+            tracking_by_message.setdefault(tracking.mail_message_id.id, []).append(row)
+
+        chatter = {}
+        for message in messages:
+            chatter.setdefault(message.res_id, []).append({
+                'date': message.date,
+                'body': message.body,
+                'subject': message.subject,
+                'message_type': message.message_type,
+                'subtype': message.subtype_id.get_external_id().get(message.subtype_id.id) if message.subtype_id else False,
+                'author_id': message.author_id.id,
+                'email_from': message.email_from,
+                'tracking': tracking_by_message.get(message.id, []),
+            })
+        return chatter
+
+    def action_restore(self):
+        """
+        Recreate the archived registrations in the SaaS users table with their
+        chatter, relink their portal users and drop the archive records.
+        """
+        saas_user_model = self.env['saas.user'].sudo().with_context(
+            tracking_disable=True, mail_create_nolog=True, mail_notrack=True, saas_user_archiving=True)
+        restored = self.env['saas.user']
+        for archive in self.sudo():
+            values = _unpack(archive.sua_data) or {}
+            values = {name: value for name, value in values.items() if name in saas_user_model._fields}
+            portal_user = archive.sua_portal_user_id
+            values['su_portal_user_id'] = portal_user.id if portal_user.exists() else False
+
+            try:
+                with self.env.cr.savepoint():
+                    saas_user = saas_user_model.create(values)
+            except Exception as e:
+                _logger.error(f"Error restoring archived SaaS user {archive.sua_original_id}: {str(e)}")
+                raise UserError(_('Could not restore %s: %s') % (archive.sua_email, str(e)))
+
+            if portal_user.exists():
+                portal_user.write({'saas_user_id': saas_user.id})
+            self._restore_chatter(saas_user, _unpack(archive.sua_chatter) or [])
+            restored |= saas_user
+
+        self.sudo().unlink()
+        _logger.info(f"Restored {len(restored)} archived SaaS user registrations")
+
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Restored SaaS Users'),
+            'res_model': 'saas.user',
+            'view_mode': 'tree,form',
+            'domain': [('id', 'in', restored.ids)],
+            'target': 'current',
+        }
+
+    @api.model
+    def _restore_chatter(self, saas_user, messages):
+        """
+        Recreate archived messages and tracking values on a restored record.
+        """
+        if not messages:
+            return
+        model_fields = self.env['ir.model.fields'].sudo().search([('model', '=', 'saas.user')])
+        field_ids = {field.name: field.id for field in model_fields}
+        tracking_fields = self.env['mail.tracking.value']._fields
+        # Authors may have been deleted since the archival
+        author_ids = set(self.env['res.partner'].sudo().with_context(active_test=False).browse(
+            {message['author_id'] for message in messages if message.get('author_id')}).exists().ids)
+
+        vals_list = []
+        for message in messages:
+            subtype = self.env.ref(message['subtype'], raise_if_not_found=False) if message.get('subtype') else None
+            tracking_commands = []
+            for tracking in message.get('tracking', []):
+                field_id = field_ids.get(tracking.pop('field', None))
+                if not field_id:
+                    continue
+                tracking_vals = {name: value for name, value in tracking.items() if name in tracking_fields}
+                tracking_vals['field_id'] = field_id
+                tracking_commands.append((0, 0, tracking_vals))
+            vals_list.append({
+                'model': 'saas.user',
+                'res_id': saas_user.id,
+                'date': message['date'],
+                'body': message['body'],
+                'subject': message['subject'],
+                'message_type': message['message_type'],
+                'subtype_id': subtype.id if subtype else False,
+                'author_id': message['author_id'] if message.get('author_id') in author_ids else False,
+                'email_from': message['email_from'],
+                'tracking_value_ids': tracking_commands,
+            })
+        self.env['mail.message'].sudo().create(vals_list)
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+SaaS User Registration Statistics
+Pre-aggregated registration counts maintained incrementally from saas.user,
+so dashboards group a few rows per day instead of scanning every registration.
+Registrations append their count deltas to a log table with plain inserts;
+only the scheduled jobs fold the log into the shared aggregate rows, so
+concurrent signups never wait on, or fail to serialize against, each other.
+"""
+
+import logging
+from datetime import timedelta
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+# Upper bounds (exclusive) of the password strength buckets, as shown by the
+# signup form's strength meter; scores of 80 and above are 'strong'
+STRENGTH_BUCKETS = [
+    (20, 'very_weak'),
+    (40, 'weak'),
+    (60, 'fair'),
+    (80, 'good'),
+]
+
+# Overlap with the previous cron run, covering transactions that were still
+# open when the watermark was taken
+WATERMARK_OVERLAP = timedelta(minutes=10)
+
+DELTA_TABLE = 'saas_user_stats_delta'
+
+_LOG_QUERY = f"""
+    INSERT INTO {DELTA_TABLE} (
+        sus_date, sus_country_id, sus_account_type,
+        sus_email_validated, sus_phone_validated, sus_strength_bucket, sus_delta
+    )
+    SELECT * FROM unnest(%s::date[], %s::int[], %s::varchar[], %s::bool[], %s::bool[], %s::varchar[], %s::int[])
+"""
+
+# Moves the logged deltas visible to the transaction into the aggregates
+_FOLD_QUERY = f"""
+    WITH folded AS (
+        DELETE FROM {DELTA_TABLE}
+        RETURNING sus_date, sus_country_id, sus_account_type,
+                  sus_email_validated, sus_phone_validated, sus_strength_bucket, sus_delta
+    )
+    INSERT INTO saas_user_stats AS s (
+        sus_date, sus_country_id, sus_account_type,
+        sus_email_validated, sus_phone_validated, sus_strength_bucket, sus_count
+    )
+    SELECT sus_date, sus_country_id, sus_account_type,
+           sus_email_validated, sus_phone_validated, sus_strength_bucket, sum(sus_delta)
+      FROM folded
+     GROUP BY sus_date, sus_country_id, sus_account_type,
+              sus_email_validated, sus_phone_validated, sus_strength_bucket
+    HAVING sum(sus_delta) != 0
+    ON CONFLICT (sus_date, (COALESCE(sus_country_id, 0)), sus_account_type,
+                 sus_email_validated, sus_phone_validated, sus_strength_bucket)
+    DO UPDATE SET sus_count = s.sus_count + EXCLUDED.sus_count
+"""
+
+
+def strength_bucket(score):
+    """Password strength bucket of a 0-100 score."""
+    score = score or 0
+    for bound, bucket in STRENGTH_BUCKETS:
+        if score < bound:
+            return bucket
+    return 'strong'
+
+
+def _strength_bucket_sql(column):
+    """SQL expression computing ``strength_bucket`` of a score column."""
+    cases = ' '.join(f"WHEN COALESCE({column}, 0) < {bound} THEN '{bucket}'" for bound, bucket in STRENGTH_BUCKETS)
+    return f"CASE {cases} ELSE 'strong' END"
+
+
+class SaasUserStats(models.Model):
+    """
+    Daily registration counts per country, account type, validation outcome
+    and password strength bucket.
+    saas.user logs its records' contributions on create, write and unlink
+    in the delta table; a frequent cron job folds the log into these rows,
+    and an hourly one recomputes the days touched since its last run to
+    repair any drift. Archiving a registration keeps its contribution.
+    """
+    _name = 'saas.user.stats'
+    _description = 'SaaS User Registration Statistics'
+    _order = 'sus_date desc'
+    _rec_name = 'sus_date'
+
+    sus_date = fields.Date('Registration Day', required=True, readonly=True)
+
+    sus_country_id = fields.Many2one('res.country', 'Country', readonly=True)
+
+    sus_account_type = fields.Selection([
+        ('individual', 'Individual'),
+        ('company', 'Company')
+    ], 'Account Type', required=True, readonly=True)
+
+    sus_email_validated = fields.Boolean('Email Validated', readonly=True)
+
+    sus_phone_validated = fields.Boolean('Phone Validated', readonly=True)
+
+    sus_strength_bucket = fields.Selection([
+        ('very_weak', 'Very Weak'),
+        ('weak', 'Weak'),
+        ('fair', 'Fair'),
+        ('good', 'Good'),
+        ('strong', 'Strong'),
+    ], 'Password Strength', required=True, readonly=True)
+
+    sus_count = fields.Integer('Registrations', readonly=True)
+
+    def init(self):
+        # Country may be empty for old archived registrations: NULLs would
+        # never conflict in a plain unique constraint
+        self.env.cr.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS saas_user_stats_key_uniq
+            ON saas_user_stats (sus_date, (COALESCE(sus_country_id, 0)), sus_account_type,
+                                sus_email_validated, sus_phone_validated, sus_strength_bucket)
+        """)
+        self.env.cr.execute(f"""
+            CREATE TABLE IF NOT EXISTS {DELTA_TABLE} (
+                id bigserial PRIMARY KEY,
+                sus_date date NOT NULL,
+                sus_country_id integer,
+                sus_account_type varchar NOT NULL,
+                sus_email_validated boolean NOT NULL,
+                sus_phone_validated boolean NOT NULL,
+                sus_strength_bucket varchar NOT NULL,
+                sus_delta integer NOT NULL
+            )
+        """)
+
+    @api.model
+    def _apply_deltas(self, deltas):
+        """
+        Log registration count deltas, folded into the aggregate rows by
+        ``_fold_deltas``. Insert-only: never conflicts with a concurrent
+        registration, and rolls back with the transaction that logged it.
+
+        Args:
+            deltas (Counter): Key tuple (see ``saas.user._registration_stats_key``) -> count delta
+        """
+        rows = [key + (delta,) for key, delta in deltas.items() if delta]
+        if not rows:
+            return
+        self.env.cr.execute(_LOG_QUERY, [list(column) for column in zip(*rows)])
+
+    @api.model
+    def _fold_deltas(self):
+        """
+        Move the logged deltas into the aggregate rows.
+
+        Returns:
+            int: Aggregate rows inserted or updated
+        """
+        self.env.cr.execute(_FOLD_QUERY)
+        self.invalidate_model()
+        return self.env.cr.rowcount
+
+    @api.model
+    def _cron_fold_stats(self):
+        """
+        Bring the aggregates up to date with the registrations logged since
+        the last run.
+        """
+        rows = self._fold_deltas()
+        if rows:
+            _logger.info(f"Folded registration statistics deltas into {rows} rows")
+
+    @api.model
+    def _rebuild(self, days=None):
+        """
+        Recompute the aggregates of some days, or all of them, from the live
+        and archived registrations.
+
+        Args:
+            days (list): Dates to recompute; None recomputes everything
+        """
+        cr = self.env.cr
+        day_filter_live = day_filter_archive = ''
+        params = {}
+        if days is not None:
+            if not days:
+                return
+            params['days'] = tuple(days)
+            day_filter_live = "WHERE COALESCE(su_registration_date, create_date)::date IN %(days)s"
+            day_filter_archive = "WHERE sua_registration_date::date IN %(days)s"
+            cr.execute("DELETE FROM saas_user_stats WHERE sus_date IN %(days)s", params)
+        else:
+            cr.execute("DELETE FROM saas_user_stats")
+
+        cr.execute(f"""
+            INSERT INTO saas_user_stats (
+                sus_date, sus_country_id, sus_account_type,
+                sus_email_validated, sus_phone_validated, sus_strength_bucket, sus_count
+            )
+            SELECT day, country_id, account_type, email_validated, phone_validated, bucket, count(*)
+            FROM (
+                SELECT COALESCE(su_registration_date, create_date)::date AS day,
+                       su_phone_country_id AS country_id,
+                       su_account_type AS account_type,
+                       COALESCE(su_email_validated, FALSE) AS email_validated,
+                       COALESCE(su_phone_validated, FALSE) AS phone_validated,
+                       {_strength_bucket_sql('su_password_strength')} AS bucket
+                FROM saas_user
+                {day_filter_live}
+                UNION ALL
+                SELECT sua_registration_date::date,
+                       sua_country_id,
+                       COALESCE(sua_account_type, 'individual'),
+                       COALESCE(sua_email_validated, FALSE),
+                       COALESCE(sua_phone_validated, FALSE),
+                       {_strength_bucket_sql('sua_password_strength')}
+                FROM saas_user_archive
+                {day_filter_archive}
+            ) registrations
+            WHERE day IS NOT NULL
+            GROUP BY day, country_id, account_type, email_validated, phone_validated, bucket
+        """, params)
+        self.invalidate_model()
+
+    @api.model
+    def _cron_refresh_stats(self):
+        """
+        Recompute the days with registrations changed since the last run, or
+        everything on the first run.
+        """
+        config = self.env['ir.config_parameter'].sudo()
+        watermark = config.get_param('j_signup_validation.stats_watermark')
+        cr = self.env.cr
+        cr.execute("SELECT (now() AT TIME ZONE 'UTC')")
+        started = cr.fetchone()[0]
+        # Deltas visible here are also counted by a rebuild: folded first so
+        # the rebuild replaces them instead of them being added again later
+        self._fold_deltas()
+
+        if not watermark:
+            self._rebuild()
+            _logger.info("Rebuilt SaaS user registration statistics")
+        else:
+            since = fields.Datetime.to_datetime(watermark) - WATERMARK_OVERLAP
+            cr.execute("""
+                SELECT DISTINCT COALESCE(su_registration_date, create_date)::date
+                FROM saas_user
+                WHERE write_date > %s
+            """, [since])
+            days = [row[0] for row in cr.fetchall() if row[0]]
+            if days:
+                self._rebuild(days)
+                _logger.info(f"Refreshed SaaS user registration statistics for {len(days)} days")
+
+        config.set_param('j_signup_validation.stats_watermark', fields.Datetime.to_string(started))
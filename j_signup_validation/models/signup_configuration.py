@@ -3,7 +3,16 @@ Signup Configuration Model
 Allows dynamic configuration of additional signup fields
 """
 
-from odoo import fields, models
+from odoo import api, fields, models, tools, _
+from odoo.exceptions import ValidationError
+from odoo.osv import expression
+
+# Many2one fields with more records than this are served by the options
+# typeahead instead of being embedded in the signup page
+FIELD_OPTIONS_INLINE_LIMIT = 100
+
+# Largest page of the options typeahead
+FIELD_OPTIONS_PAGE_LIMIT = 50
 
 
 class SignupConfiguration(models.Model):
@@ -11,6 +20,8 @@ class SignupConfiguration(models.Model):
     Signup Configuration model for managing dynamic signup fields.
     This model allows administrators to configure additional fields
     that should appear in the custom signup form.
+    A configuration applies to one website, to the websites of one company,
+    or to all websites when neither is set; the most specific one wins.
     """
     _name = 'signup.configuration'
     _description = 'Signup Configuration'
@@ -29,6 +40,21 @@ class SignupConfiguration(models.Model):
         help='Whether this configuration is active'
     )
     
+    website_id = fields.Many2one(
+        'website',
+        'Website',
+        ondelete='cascade',
+        index=True,
+        help='Website using this configuration; leave empty to apply it to every website of the company'
+    )
+    
+    company_id = fields.Many2one(
+        'res.company',
+        'Company',
+        index=True,
+        help='Company whose websites use this configuration; leave empty to apply it to all companies'
+    )
+    
     signup_field_ids = fields.One2many(
         'signup.field',
         'configuration_id',
@@ -41,28 +67,65 @@ class SignupConfiguration(models.Model):
         help='Description of this signup configuration'
     )
 
-    def get_active_configuration(self):
+    @api.onchange('website_id')
+    def _onchange_website_id(self):
+        if self.website_id:
+            self.company_id = self.website_id.company_id
+
+    @api.constrains('active', 'website_id', 'company_id')
+    def _check_single_active_configuration(self):
         """
-        Get the active signup configuration.
+        Only one active configuration per website, company or globally.
+        """
+        for config in self.filtered('active'):
+            domain = [
+                ('id', '!=', config.id),
+                ('website_id', '=', config.website_id.id),
+            ]
+            if not config.website_id:
+                domain.append(('company_id', '=', config.company_id.id))
+            if self.search_count(domain):
+                if config.website_id:
+                    scope = config.website_id.name
+                elif config.company_id:
+                    scope = config.company_id.name
+                else:
+                    scope = _('all websites')
+                raise ValidationError(_('Another active signup configuration already applies to %s.') % scope)
+
+    @api.model
+    @tools.ormcache('self.env.lang or "en_US"')
+    def _get_configuration_map(self):
+        """
+        Precomputed scope -> configuration lookup, cached per language (the
+        default labels are the translated field descriptions) until a
+        configuration or one of its fields changes.
         
         Returns:
-            recordset: Active configuration record or empty recordset
+            dict: ('website', id), ('company', id) or ('global',) ->
+                  (configuration id, tuple of dynamic field dicts)
         """
-        return self.search([('active', '=', True)], limit=1)
+        config_map = {}
+        for config in self.sudo().search([('active', '=', True)], order='id'):
+            if config.website_id:
+                key = ('website', config.website_id.id)
+            elif config.company_id:
+                key = ('company', config.company_id.id)
+            else:
+                key = ('global',)
+            if key in config_map:
+                continue
+            config_map[key] = (config.id, tuple(config._prepare_dynamic_fields()))
+        return config_map
 
-    def get_dynamic_fields(self):
+    def _prepare_dynamic_fields(self):
         """
-        Get list of dynamic fields for the active configuration.
-        
         Returns:
-            list: List of field dictionaries with field information
+            list: Field dictionaries of the configuration's active fields
         """
-        active_config = self.get_active_configuration()
-        if not active_config:
-            return []
-        
+        self.ensure_one()
         fields_data = []
-        for field_config in active_config.signup_field_ids.filtered('active'):
+        for field_config in self.signup_field_ids.filtered('active'):
             fields_data.append({
                 'field_name': field_config.field_id.name,
                 'field_label': field_config.label or field_config.field_id.field_description,
@@ -72,5 +135,192 @@ class SignupConfiguration(models.Model):
                 'required': field_config.required,
                 'field_id': field_config.id,
             })
+        return fields_data
+
+    @api.model
+    def _resolve_configuration(self, website_id=None, company_id=None):
+        """
+        Returns:
+            tuple: (configuration id, dynamic field dicts) of the most specific
+                   active configuration, or (False, ()) if none applies
+        """
+        config_map = self._get_configuration_map()
+        for key in (('website', website_id), ('company', company_id), ('global',)):
+            if None in key:
+                continue
+            if key in config_map:
+                return config_map[key]
+        return False, ()
+
+    def get_active_configuration(self, website_id=None, company_id=None):
+        """
+        Get the active signup configuration.
         
-        return fields_data
\ No newline at end of file
+        Args:
+            website_id (int): Website of the signup form
+            company_id (int): Company of that website
+        
+        Returns:
+            recordset: Active configuration record or empty recordset
+        """
+        config_id, _fields_data = self._resolve_configuration(website_id, company_id)
+        return self.browse(config_id)
+
+    def get_dynamic_fields(self, website_id=None, company_id=None):
+        """
+        Get list of dynamic fields for the active configuration.
+        
+        Args:
+            website_id (int): Website of the signup form
+            company_id (int): Company of that website
+        
+        Returns:
+            list: List of field dictionaries with field information
+        """
+        _config_id, fields_data = self._resolve_configuration(website_id, company_id)
+        # Copies: the cached dictionaries are shared by all requests
+        fields_data = [dict(field_data) for field_data in fields_data]
+        if any(field_data['field_type'] in ('selection', 'many2one') for field_data in fields_data):
+            field_options = self._get_field_options(_config_id)
+            for field_data in fields_data:
+                if field_data['field_id'] in field_options:
+                    field_data.update(field_options[field_data['field_id']])
+        return fields_data
+
+    @api.model
+    @tools.ormcache('config_id', 'self.env.lang or "en_US"')
+    def _get_field_options(self, config_id):
+        """
+        Options of the selection and many2one fields of a configuration, in
+        the current language: one fields_get for all selection fields and one
+        read per many2one comodel. Cached until a configuration or one of its
+        fields changes; records added to a comodel meanwhile are accepted on
+        submission but only listed once the cache is cleared.
+        
+        Returns:
+            dict: signup.field id -> {'options': tuple of (value, label),
+                  'typeahead': True when the records are too many to embed}
+        """
+        signup_fields = self.sudo().browse(config_id).signup_field_ids.filtered(
+            lambda field_config: field_config.active and field_config.field_type in ('selection', 'many2one'))
+        users = self.env['res.users'].sudo()
+        field_options = {}
+
+        selection_fields = signup_fields.filtered(lambda field_config: field_config.field_type == 'selection')
+        if selection_fields:
+            descriptions = users.fields_get(selection_fields.mapped('field_name'), ['selection'])
+            for field_config in selection_fields:
+                selection = descriptions.get(field_config.field_name, {}).get('selection') or []
+                field_options[field_config.id] = {
+                    'options': tuple((str(value), label) for value, label in selection),
+                    'typeahead': False,
+                }
+
+        many2one_fields = signup_fields.filtered(
+            lambda field_config: field_config.field_type == 'many2one' and field_config.field_name in users._fields)
+        for comodel_name in set(many2one_fields.mapped('field_id.relation')):
+            comodel_fields = many2one_fields.filtered(lambda field_config: field_config.field_id.relation == comodel_name)
+            domains = {field_config.id: self._field_option_domain(field_config.field_name) for field_config in comodel_fields}
+            comodel = self.env[comodel_name].sudo()
+            # One read covers every field of the comodel, each field keeping
+            # the records of its own domain; past the limit they all use the
+            # typeahead
+            records = comodel.search_fetch(
+                expression.OR(list(domains.values())), ['display_name'], limit=FIELD_OPTIONS_INLINE_LIMIT + 1)
+            typeahead = len(records) > FIELD_OPTIONS_INLINE_LIMIT
+            for field_config in comodel_fields:
+                domain = domains[field_config.id]
+                matching = records.filtered_domain(domain) if domain else records
+                field_options[field_config.id] = {
+                    'options': () if typeahead else tuple((record.id, record.display_name) for record in matching),
+                    'typeahead': typeahead,
+                }
+        return field_options
+
+    @api.model
+    def _field_option_domain(self, field_name):
+        """
+        Returns:
+            list: Static domain of a res.users many2one field, empty when the
+                  field has none or depends on the record
+        """
+        try:
+            return self.env['res.users']._fields[field_name].get_domain_list(self.env['res.users'])
+        except Exception:
+            return []
+
+    @api.model
+    def search_field_options(self, signup_field_id, query='', offset=0, limit=20, website_id=None, company_id=None):
+        """
+        Page of the records of a many2one dynamic field matching a search,
+        for the fields of the active configuration only.
+        
+        Args:
+            signup_field_id (int): signup.field of the active configuration
+            query (str): Typed part of the record name
+            offset (int): Records to skip
+            limit (int): Page size, at most FIELD_OPTIONS_PAGE_LIMIT
+        
+        Returns:
+            dict: 'options' (list of [id, name]) and 'more' (bool), or None if
+                  the field is not a many2one field of the active configuration
+        """
+        field_config = self._get_option_field(signup_field_id, website_id, company_id)
+        if not field_config:
+            return None
+
+        domain = self._field_option_domain(field_config['field_name'])
+        if query:
+            domain = expression.AND([domain, [('display_name', 'ilike', query)]])
+        limit = max(1, min(int(limit or 20), FIELD_OPTIONS_PAGE_LIMIT))
+        comodel = self.env[field_config['relation']].sudo()
+        records = comodel.search_fetch(domain, ['display_name'], offset=max(0, int(offset or 0)), limit=limit + 1)
+        return {
+            'options': [[record.id, record.display_name] for record in records[:limit]],
+            'more': len(records) > limit,
+        }
+
+    @api.model
+    def field_option_exists(self, signup_field_id, record_id, website_id=None, company_id=None):
+        """
+        Whether a submitted record is a valid choice of a many2one dynamic
+        field served by the typeahead.
+        
+        Returns:
+            bool: True if the record matches the field's domain
+        """
+        field_config = self._get_option_field(signup_field_id, website_id, company_id)
+        if not field_config or not record_id:
+            return False
+        domain = expression.AND([self._field_option_domain(field_config['field_name']), [('id', '=', record_id)]])
+        return bool(self.env[field_config['relation']].sudo().search_count(domain, limit=1))
+
+    @api.model
+    def _get_option_field(self, signup_field_id, website_id=None, company_id=None):
+        """
+        Returns:
+            dict: Field dict, with the comodel as 'relation', of a many2one
+                  field of the active configuration, else None
+        """
+        _config_id, fields_data = self._resolve_configuration(website_id, company_id)
+        for field_data in fields_data:
+            if field_data['field_id'] == signup_field_id and field_data['field_type'] == 'many2one':
+                relation = self.env['res.users']._fields[field_data['field_name']].comodel_name
+                return dict(field_data, relation=relation)
+        return None
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        configurations = super(SignupConfiguration, self).create(vals_list)
+        self.env.registry.clear_cache()
+        return configurations
+
+    def write(self, vals):
+        result = super(SignupConfiguration, self).write(vals)
+        self.env.registry.clear_cache()
+        return result
+
+    def unlink(self):
+        result = super(SignupConfiguration, self).unlink()
+        self.env.registry.clear_cache()
+        return result
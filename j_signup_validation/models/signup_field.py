@@ -3,7 +3,12 @@ Signup Field Model
 Defines individual dynamic fields for the signup form
 """
 
-from odoo import api, fields, models
+from odoo import api, fields, models, _
+from odoo.exceptions import ValidationError
+from odoo.tools import html_escape
+
+# Comodels whose record names must not be listed on the public signup page
+PRIVATE_OPTION_MODELS = ['res.users', 'res.partner']
 
 
 class SignupField(models.Model):
@@ -29,7 +34,9 @@ class SignupField(models.Model):
         ondelete='cascade',
         domain=[
             ('model_id.model', '=', 'res.users'),
-            ('ttype', 'in', ['char', 'integer', 'float', 'text', 'date', 'datetime', 'binary', 'boolean',])
+            ('ttype', 'in', ['char', 'integer', 'float', 'text', 'date', 'datetime', 'binary', 'boolean',
+                             'selection', 'many2one']),
+            ('relation', 'not in', PRIVATE_OPTION_MODELS),
         ],
         help='The res.users field that this signup field represents'
     )
@@ -95,6 +102,30 @@ class SignupField(models.Model):
         if self.field_id and not self.label:
             self.label = self.field_id.field_description
 
+    @api.constrains('field_id')
+    def _check_field_relation(self):
+        for field_config in self:
+            if field_config.field_id.ttype == 'many2one' and field_config.field_id.relation in PRIVATE_OPTION_MODELS:
+                raise ValidationError(_('%s cannot be a signup field: its options would list private records.')
+                                      % field_config.field_id.field_description)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        signup_fields = super(SignupField, self).create(vals_list)
+        # Dynamic fields are cached with the configuration map
+        self.env.registry.clear_cache()
+        return signup_fields
+
+    def write(self, vals):
+        result = super(SignupField, self).write(vals)
+        self.env.registry.clear_cache()
+        return result
+
+    def unlink(self):
+        result = super(SignupField, self).unlink()
+        self.env.registry.clear_cache()
+        return result
+
     def get_field_html_attributes(self):
         """
         Get HTML attributes for the field based on its configuration.
@@ -130,6 +161,8 @@ class SignupField(models.Model):
             attrs['type'] = 'file'
         elif self.field_type == 'boolean':
             attrs['type'] = 'checkbox'
+        elif self.field_type in ('selection', 'many2one'):
+            attrs['type'] = 'select'
         
         return attrs
 
@@ -146,9 +179,13 @@ class SignupField(models.Model):
             return f'<textarea class="form-control" name="{attrs["name"]}" id="{attrs["id"]}" placeholder="{attrs["placeholder"]}" {"required" if self.required else ""}></textarea>'
         elif self.field_type == 'boolean':
             return f'<input type="checkbox" class="form-check-input" name="{attrs["name"]}" id="{attrs["id"]}" value="1" {"required" if self.required else ""}>'
-        elif self.field_type == 'selection':
-            # For selection fields, we need to get the selection options
-            return f'<select class="form-control" name="{attrs["name"]}" id="{attrs["id"]}" {"required" if self.required else ""}><option value="">Select...</option></select>'
+        elif self.field_type in ('selection', 'many2one'):
+            field_options = self.configuration_id._get_field_options(self.configuration_id.id).get(self.id, {})
+            options = ''.join(
+                f'<option value="{html_escape(value)}">{html_escape(label)}</option>'
+                for value, label in field_options.get('options', ())
+            )
+            return f'<select class="form-control" name="{attrs["name"]}" id="{attrs["id"]}" {"required" if self.required else ""}><option value="">Select...</option>{options}</select>'
         else:
             attr_str = ' '.join([f'{k}="{v}"' for k, v in attrs.items()])
             return f'<input class="form-control" {attr_str}>'
\ No newline at end of file
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Signup Idempotency Keys
+Client-generated keys of signup form submissions, stored with the response
+of the first successful submission so double submits and retries replay it
+instead of running the signup again.
+"""
+
+import hashlib
+import logging
+import re
+
+from odoo import api, models
+
+_logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_TABLE = 'j_signup_idempotency'
+
+# Hours a submission outcome is replayed for
+IDEMPOTENCY_TTL_HOURS = 24
+
+KEY_PATTERN = re.compile(r'^[A-Za-z0-9-]{16,64}$')
+
+# Takes the key, or an expired one. A concurrent submission with the same
+# key waits here on the primary key until the first one's transaction ends:
+# it then either takes over the key (rollback) or fails to serialize and is
+# retried by the HTTP layer with the stored outcome visible (commit).
+_CLAIM_QUERY = f"""
+    INSERT INTO {IDEMPOTENCY_TABLE} AS k (key_hash, outcome, created_at)
+    VALUES (%(key)s, NULL, now())
+    ON CONFLICT (key_hash) DO UPDATE SET outcome = NULL, created_at = EXCLUDED.created_at
+        WHERE k.created_at < now() - interval '{IDEMPOTENCY_TTL_HOURS} hours'
+    RETURNING key_hash
+"""
+
+
+def idempotency_key_hash(key, email):
+    """
+    Stored form of an idempotency key, scoped to the submitted email so an
+    edited form is processed as a new submission.
+
+    Returns:
+        str: The key hash, or None if the key is missing or malformed
+    """
+    if not key or not KEY_PATTERN.match(key):
+        return None
+    return hashlib.sha256(f'{key}:{email}'.encode()).hexdigest()
+
+
+class SignupIdempotency(models.AbstractModel):
+    """
+    Outcomes of signup submissions by idempotency key.
+    Keys are written in the submission's own transaction, so an outcome
+    becomes visible together with the accounts it created, and vanishes
+    with them on rollback.
+    """
+    _name = 'signup.idempotency'
+    _description = 'Signup Submission Idempotency Keys'
+
+    def init(self):
+        self.env.cr.execute(f"""
+            CREATE UNLOGGED TABLE IF NOT EXISTS {IDEMPOTENCY_TABLE} (
+                key_hash varchar(64) PRIMARY KEY,
+                outcome varchar,
+                created_at timestamp NOT NULL DEFAULT now()
+            )
+        """)
+
+    @api.model
+    def claim(self, key_hash):
+        """
+        Take an idempotency key for the current submission.
+
+        Returns:
+            tuple: (True, None) if the submission must be processed, else
+                   (False, stored outcome URL or None while unknown)
+        """
+        self.env.cr.execute(_CLAIM_QUERY, {'key': key_hash})
+        if self.env.cr.fetchone():
+            return True, None
+
+        self.env.cr.execute(f"SELECT outcome FROM {IDEMPOTENCY_TABLE} WHERE key_hash = %s", [key_hash])
+        row = self.env.cr.fetchone()
+        return False, row[0] if row else None
+
+    @api.model
+    def record_outcome(self, key_hash, outcome):
+        """
+        Store the redirect URL answered to the submission of a key.
+        """
+        self.env.cr.execute(f"UPDATE {IDEMPOTENCY_TABLE} SET outcome = %s WHERE key_hash = %s", [outcome, key_hash])
+
+    @api.model
+    def release(self, key_hash):
+        """
+        Forget a claimed key, so its next submission is processed again.
+        """
+        self.env.cr.execute(f"DELETE FROM {IDEMPOTENCY_TABLE} WHERE key_hash = %s", [key_hash])
+
+    @api.autovacuum
+    def _gc_idempotency_keys(self):
+        """
+        Drop keys past their replay period.
+        """
+        self.env.cr.execute(f"""
+            DELETE FROM {IDEMPOTENCY_TABLE}
+             WHERE created_at < now() - interval '{IDEMPOTENCY_TTL_HOURS} hours'
+        """)
+        _logger.info(f"Removed {self.env.cr.rowcount} expired signup idempotency keys")
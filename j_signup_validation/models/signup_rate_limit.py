@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Signup Rate Limiter
+Token buckets shared by all workers through an unlogged PostgreSQL table,
+used to throttle the public signup validation endpoints.
+"""
+
+import hashlib
+import logging
+import math
+
+from odoo import api, models
+
+_logger = logging.getLogger(__name__)
+
+BUCKET_TABLE = 'j_signup_rate_bucket'
+
+# Refill the bucket for the elapsed time, then take one token if available.
+# All expressions of the DO UPDATE branch read the row as it was before the
+# update, so the refill is computed consistently for both columns.
+_CONSUME_QUERY = """
+    INSERT INTO j_signup_rate_bucket AS b (bucket_key, tokens, allowed, updated_at)
+    VALUES (%(key)s, %(burst)s - 1, TRUE, clock_timestamp())
+    ON CONFLICT (bucket_key) DO UPDATE SET
+        allowed = LEAST(%(burst)s, b.tokens + EXTRACT(EPOCH FROM clock_timestamp() - b.updated_at) * %(rate)s) >= 1,
+        tokens = LEAST(%(burst)s, b.tokens + EXTRACT(EPOCH FROM clock_timestamp() - b.updated_at) * %(rate)s)
+                 - CASE WHEN LEAST(%(burst)s, b.tokens + EXTRACT(EPOCH FROM clock_timestamp() - b.updated_at) * %(rate)s) >= 1
+                        THEN 1 ELSE 0 END,
+        updated_at = clock_timestamp()
+    RETURNING allowed, tokens
+"""
+
+
+def consume_tokens(cr, buckets):
+    """
+    Take one token from each bucket.
+
+    Args:
+        cr: Database cursor, committed by the caller
+        buckets (list): Tuples of (key, tokens per second, burst size)
+
+    Returns:
+        int: 0 when every bucket had a token, otherwise the number of
+             seconds to wait before the most depleted bucket refills
+    """
+    retry_after = 0
+    for key, rate, burst in buckets:
+        cr.execute(_CONSUME_QUERY, {'key': key, 'rate': rate, 'burst': max(1, burst)})
+        allowed, tokens = cr.fetchone()
+        if not allowed:
+            wait = math.ceil((1 - tokens) / rate) if rate > 0 else 60
+            retry_after = max(retry_after, wait, 1)
+    return retry_after
+
+
+def rate_limit_buckets(rules, ip_address, session_id=None):
+    """
+    Buckets a validation request takes a token from.
+
+    Returns:
+        list: Tuples of (key, tokens per second, burst size)
+    """
+    buckets = []
+    if ip_address:
+        buckets.append(('ip:%s' % ip_address, rules['ip_per_minute'] / 60.0, rules['ip_burst']))
+    if session_id:
+        buckets.append((session_bucket_key(session_id), rules['session_per_minute'] / 60.0, rules['session_burst']))
+    return buckets
+
+
+def session_bucket_key(sid):
+    """Bucket key for a session, without storing the session id itself."""
+    return 'session:%s' % hashlib.sha256(sid.encode()).hexdigest()[:32]
+
+
+class SignupRateLimit(models.AbstractModel):
+    """
+    Per-IP and per-session token buckets for the public signup endpoints.
+    The bucket table is unlogged: it is cheap to write and its content
+    may be lost on a crash, which only resets the buckets.
+    """
+    _name = 'signup.rate.limit'
+    _description = 'Signup Validation Rate Limiter'
+
+    def init(self):
+        self.env.cr.execute(f"""
+            CREATE UNLOGGED TABLE IF NOT EXISTS {BUCKET_TABLE} (
+                bucket_key varchar PRIMARY KEY,
+                tokens double precision NOT NULL,
+                allowed boolean NOT NULL DEFAULT TRUE,
+                updated_at timestamptz NOT NULL DEFAULT clock_timestamp()
+            )
+        """)
+
+    @api.model
+    def check_rate_limit(self, ip_address, session_id=None):
+        """
+        Consume one token from the IP and session buckets.
+
+        Tokens are taken in a separate, immediately committed transaction so
+        concurrent requests from the same client never wait on each other's
+        request transaction.
+
+        Returns:
+            int: 0 if the request may proceed, else seconds to retry after
+        """
+        rules = self.env['res.config.settings'].get_rate_limit_rules()
+        if not rules.get('enabled', True):
+            return 0
+
+        buckets = rate_limit_buckets(rules, ip_address, session_id)
+        if not buckets:
+            return 0
+
+        try:
+            with self.env.registry.cursor() as cr:
+                retry_after = consume_tokens(cr, buckets)
+        except Exception as e:
+            # Never block signups because the limiter itself failed
+            _logger.warning(f"Rate limiter unavailable, allowing request: {str(e)}")
+            return 0
+
+        if retry_after:
+            _logger.warning(f"Rate limit exceeded for {ip_address}, retry after {retry_after}s")
+        return retry_after
+
+    @api.autovacuum
+    def _gc_rate_buckets(self):
+        """
+        Drop buckets idle for more than an hour; they would be full anyway.
+        """
+        self.env.cr.execute(f"""
+            DELETE FROM {BUCKET_TABLE}
+             WHERE updated_at < clock_timestamp() - interval '1 hour'
+        """)
+        _logger.info(f"Removed {self.env.cr.rowcount} idle signup rate limit buckets")
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+Signup Trusted Email Domains
+Allowlist of high-volume email providers whose addresses skip the MX and
+disposable email checks. Learned from the domains of validated
+registrations by a scheduled job, with administrator overrides, and held
+by every worker as a cached frozenset.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+
+from odoo import api, fields, models, tools, _
+from odoo.exceptions import ValidationError
+
+_logger = logging.getLogger(__name__)
+
+HITS_TABLE = 'j_signup_allowlist_hits'
+
+# Seconds the hit counters of a worker are kept in memory before being added
+# to the shared daily totals
+HITS_FLUSH_INTERVAL = 60
+
+# Days of daily hit totals kept
+HITS_RETENTION_DAYS = 90
+
+
+class AllowlistHits:
+    """
+    Per-worker allowlist lookup counters, added to the database by the
+    lookup following the flush interval, never more often.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._domains = Counter()
+        self._misses = 0
+        self._flushed_at = time.monotonic()
+
+    def record(self, registry, domain, hit):
+        with self._lock:
+            if hit:
+                self._domains[domain] += 1
+            else:
+                self._misses += 1
+            if time.monotonic() - self._flushed_at < HITS_FLUSH_INTERVAL:
+                return
+            domains, misses = self._domains, self._misses
+            self._domains, self._misses = Counter(), 0
+            self._flushed_at = time.monotonic()
+        self._flush(registry, domains, misses)
+
+    def _flush(self, registry, domains, misses):
+        try:
+            with registry.cursor() as cr:
+                cr.execute(f"""
+                    INSERT INTO {HITS_TABLE} AS h (day, hits, misses)
+                    VALUES (current_date, %s, %s)
+                    ON CONFLICT (day) DO UPDATE SET hits = h.hits + EXCLUDED.hits, misses = h.misses + EXCLUDED.misses
+                """, [sum(domains.values()), misses])
+                if domains:
+                    cr.execute("""
+                        UPDATE signup_trusted_domain d
+                           SET hit_count = d.hit_count + v.hits
+                          FROM unnest(%s::varchar[], %s::int[]) AS v(name, hits)
+                         WHERE d.name = v.name
+                    """, [list(domains), list(domains.values())])
+        except Exception as e:
+            # Counters are statistics only, never fail a signup on them
+            _logger.warning(f"Could not record email allowlist hits: {str(e)}")
+
+
+allowlist_hits = AllowlistHits()
+
+
+class SignupTrustedDomain(models.Model):
+    """
+    Email domains trusted without network checks.
+    Learned entries are created and removed by the refresh job from the
+    domain distribution of validated registrations; manual entries are
+    administrator overrides the job never touches, either trusting a domain
+    or keeping it from being learned.
+    """
+    _name = 'signup.trusted.domain'
+    _description = 'Signup Trusted Email Domain'
+    _order = 'registration_count desc, name'
+
+    name = fields.Char(
+        'Domain',
+        required=True,
+        help='Email domain, e.g. gmail.com'
+    )
+
+    active = fields.Boolean(
+        'Active',
+        default=True
+    )
+
+    trust = fields.Selection([
+        ('allow', 'Trusted'),
+        ('deny', 'Never Trusted'),
+    ], 'Trust',
+        required=True,
+        default='allow',
+        help='Never Trusted keeps a domain out of the allowlist whatever its volume'
+    )
+
+    source = fields.Selection([
+        ('learned', 'Learned'),
+        ('manual', 'Manual'),
+    ], 'Source',
+        required=True,
+        default='manual',
+        readonly=True,
+        help='Learned entries are maintained by the refresh job, manual ones by administrators'
+    )
+
+    registration_count = fields.Integer(
+        'Validated Registrations',
+        readonly=True,
+        help='Validated registrations with this domain at the last refresh'
+    )
+
+    hit_count = fields.Integer(
+        'Skipped Checks',
+        readonly=True,
+        help='Signup email validations that skipped the network checks thanks to this entry'
+    )
+
+    _sql_constraints = [
+        ('unique_name', 'UNIQUE(name)', 'This email domain is already listed.'),
+    ]
+
+    def init(self):
+        self.env.cr.execute(f"""
+            CREATE UNLOGGED TABLE IF NOT EXISTS {HITS_TABLE} (
+                day date PRIMARY KEY,
+                hits bigint NOT NULL DEFAULT 0,
+                misses bigint NOT NULL DEFAULT 0
+            )
+        """)
+
+    @api.constrains('name')
+    def _check_name(self):
+        for record in self:
+            if '@' in record.name or '.' not in record.name:
+                raise ValidationError(_('%s is not an email domain.') % record.name)
+
+    @api.model
+    def _normalize_vals(self, vals):
+        if vals.get('name'):
+            vals['name'] = vals['name'].strip().lower()
+        return vals
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        domains = super(SignupTrustedDomain, self).create([self._normalize_vals(vals) for vals in vals_list])
+        self.env.registry.clear_cache()
+        return domains
+
+    def write(self, vals):
+        if {'name', 'trust', 'active'}.intersection(vals) and not self.env.context.get('trusted_domain_refresh'):
+            # Edited by an administrator: the refresh job leaves it alone
+            vals = dict(vals, source='manual')
+        result = super(SignupTrustedDomain, self).write(self._normalize_vals(vals))
+        self.env.registry.clear_cache()
+        return result
+
+    def unlink(self):
+        result = super(SignupTrustedDomain, self).unlink()
+        self.env.registry.clear_cache()
+        return result
+
+    @api.model
+    @tools.ormcache()
+    def _get_trusted_domain_set(self):
+        """
+        Returns:
+            frozenset: Trusted domains, cached until an entry changes
+        """
+        self.env.cr.execute("SELECT name FROM signup_trusted_domain WHERE active AND trust = 'allow'")
+        return frozenset(row[0] for row in self.env.cr.fetchall())
+
+    @api.model
+    def get_trusted_domains(self):
+        """
+        Domains whose addresses skip the network email checks, empty when
+        the allowlist is disabled.
+
+        Returns:
+            frozenset: Lowercase domains
+        """
+        if not self.env['res.config.settings'].get_trusted_domain_settings()['enabled']:
+            return frozenset()
+        return self._get_trusted_domain_set()
+
+    @api.model
+    def get_hit_rate(self, days=7):
+        """
+        Share of signup email validations answered by the allowlist.
+
+        Returns:
+            dict: Hits, misses and hit rate (0-1) over the last days
+        """
+        self.env.cr.execute(f"""
+            SELECT COALESCE(sum(hits), 0), COALESCE(sum(misses), 0)
+              FROM {HITS_TABLE}
+             WHERE day > current_date - %s
+        """, [days])
+        hits, misses = self.env.cr.fetchone()
+        total = hits + misses
+        return {'hits': hits, 'misses': misses, 'rate': hits / total if total else 0.0}
+
+    @api.model
+    def _cron_refresh_trusted_domains(self):
+        """
+        Learn the allowlist from the domains of validated registrations: one
+        aggregate over the indexed email domain column, then one upsert of
+        the learned entries. Manual entries are kept as they are.
+        """
+        settings = self.env['res.config.settings'].get_trusted_domain_settings()
+        if not settings['enabled']:
+            return
+
+        cr = self.env.cr
+        cr.execute("""
+            SELECT su_email_domain, count(*)
+              FROM saas_user
+             WHERE su_email_domain IS NOT NULL AND su_email_validated
+             GROUP BY su_email_domain
+            HAVING count(*) >= %s
+             ORDER BY count(*) DESC, su_email_domain
+             LIMIT %s
+        """, [settings['min_registrations'], settings['max_domains']])
+        learned = dict(cr.fetchall())
+
+        entries = self.with_context(active_test=False, trusted_domain_refresh=True).search([])
+        manual = set(entries.filtered(lambda entry: entry.source == 'manual').mapped('name'))
+        stale = entries.filtered(lambda entry: entry.source == 'learned' and entry.name not in learned)
+        stale.unlink()
+
+        learned_names = [name for name in learned if name not in manual]
+        if learned_names:
+            cr.execute("""
+                INSERT INTO signup_trusted_domain (name, active, trust, source, registration_count, hit_count,
+                                                   create_uid, create_date, write_uid, write_date)
+                SELECT v.name, true, 'allow', 'learned', v.registration_count, 0,
+                       %(uid)s, now() AT TIME ZONE 'UTC', %(uid)s, now() AT TIME ZONE 'UTC'
+                  FROM unnest(%(names)s::varchar[], %(counts)s::int[]) AS v(name, registration_count)
+                ON CONFLICT (name) DO UPDATE SET registration_count = EXCLUDED.registration_count,
+                                                 write_uid = EXCLUDED.write_uid, write_date = EXCLUDED.write_date
+            """, {
+                'names': learned_names,
+                'counts': [learned[name] for name in learned_names],
+                'uid': self.env.uid,
+            })
+        self.invalidate_model()
+        self.env.registry.clear_cache()
+
+        cr.execute(f"DELETE FROM {HITS_TABLE} WHERE day < current_date - %s", [HITS_RETENTION_DAYS])
+        hit_rate = self.get_hit_rate()
+        _logger.info(f"Email allowlist refreshed: {len(learned)} learned domains, {len(stale)} dropped; "
+                     f"hit rate {hit_rate['rate']:.1%} over 7 days ({hit_rate['hits']} hits, {hit_rate['misses']} misses)")
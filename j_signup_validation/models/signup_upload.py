@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+Signup File Uploads
+Chunked uploads of the binary dynamic fields, streamed to a part file in
+the filestore and turned into an ir.attachment once complete. The signup
+submission only carries a signed reference to the attachment, which is
+moved to the new user's field when the account is created.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import secrets
+import time
+
+from odoo import api, fields, models, _
+from odoo.exceptions import ValidationError
+from odoo.tools import consteq
+from odoo.tools.mimetypes import guess_mimetype
+from odoo.tools.misc import hmac as hmac_tool
+
+_logger = logging.getLogger(__name__)
+
+# Directory of the filestore receiving the uploads in progress
+UPLOAD_DIR = 'j_signup_uploads'
+
+# Hours an upload may take, and an unclaimed upload is kept
+UPLOAD_TTL_HOURS = 24
+
+# Largest chunk accepted by one request
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Bytes read from the request stream at a time
+READ_BLOCK_SIZE = 64 * 1024
+
+UPLOAD_TOKEN_SCOPE = 'j_signup_validation.upload'
+
+
+class SignupUpload(models.AbstractModel):
+    """
+    Uploads of the signup form's binary fields.
+    An upload is identified by a signed token bound to the dynamic field,
+    the declared size and the declared type; finished uploads are pending
+    attachments (res_model signup.upload) until a signup claims them.
+    """
+    _name = 'signup.upload'
+    _description = 'Signup File Uploads'
+
+    def _sign(self, payload):
+        body = base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode()
+        return f"{body}.{hmac_tool(self.env(su=True), UPLOAD_TOKEN_SCOPE, body)}"
+
+    def _verify(self, token):
+        """
+        Returns:
+            dict: Payload of an authentic, unexpired token, else None
+        """
+        if not token or '.' not in token:
+            return None
+        body, signature = token.rsplit('.', 1)
+        if not consteq(signature, hmac_tool(self.env(su=True), UPLOAD_TOKEN_SCOPE, body)):
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(body.encode()))
+        except Exception:
+            return None
+        return payload if payload.get('exp', 0) >= time.time() else None
+
+    def _part_path(self, upload_id):
+        directory = os.path.join(self.env['ir.attachment']._filestore(), UPLOAD_DIR)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f'{upload_id}.part')
+
+    @api.model
+    def _get_binary_field(self, signup_field_id, website_id=None, company_id=None):
+        """
+        Returns:
+            dict: Field dict of a binary field of the active configuration,
+                  else None
+        """
+        _config_id, fields_data = self.env['signup.configuration'].sudo()._resolve_configuration(website_id, company_id)
+        for field_data in fields_data:
+            if field_data['field_id'] == signup_field_id and field_data['field_type'] == 'binary':
+                return field_data
+        return None
+
+    @api.model
+    def start(self, signup_field_id, filename, size, mimetype, website_id=None, company_id=None):
+        """
+        Open an upload for a binary field of the active configuration.
+
+        Args:
+            signup_field_id (int): signup.field the file is for
+            filename (str): Name of the file
+            size (int): Size of the file in bytes
+            mimetype (str): Type of the file as reported by the browser
+
+        Returns:
+            dict: 'token' identifying the upload and 'chunk_size'
+        """
+        field_data = self._get_binary_field(signup_field_id, website_id, company_id)
+        if not field_data:
+            raise ValidationError(_('This field does not accept uploads.'))
+
+        rules = self.env['res.config.settings'].get_upload_settings()
+        if size <= 0:
+            raise ValidationError(_('The file is empty.'))
+        if size > rules['max_size']:
+            raise ValidationError(_('%(name)s is larger than %(size)s MB.', name=field_data['field_label'],
+                                    size=rules['max_size'] // (1024 * 1024)))
+        if mimetype not in rules['mimetypes']:
+            raise ValidationError(_('This type of file is not accepted for %s.', field_data['field_label']))
+
+        return {
+            'token': self._sign({
+                'u': secrets.token_hex(16),
+                'f': signup_field_id,
+                'n': (filename or field_data['field_name'])[:255],
+                's': size,
+                'm': mimetype,
+                'exp': int(time.time()) + UPLOAD_TTL_HOURS * 3600,
+            }),
+            'chunk_size': UPLOAD_CHUNK_SIZE,
+        }
+
+    @api.model
+    def write_chunk(self, token, offset, stream, length):
+        """
+        Append a chunk read from a request stream to an upload, checking the
+        size while reading and the file type on the first block. A chunk
+        sent again after a failure replaces the data from its offset.
+
+        Returns:
+            dict: 'received' bytes, with the attachment 'reference' once the
+                  upload is complete
+        """
+        upload = self._verify(token)
+        if not upload:
+            raise ValidationError(_('This upload has expired. Please choose the file again.'))
+        if length > UPLOAD_CHUNK_SIZE or offset + length > upload['s']:
+            raise ValidationError(_('The file is larger than announced.'))
+
+        path = self._part_path(upload['u'])
+        received = os.path.getsize(path) if os.path.exists(path) else 0
+        if offset < 0 or offset > received:
+            raise ValidationError(_('Upload chunks were received out of order.'))
+
+        rules = self.env['res.config.settings'].get_upload_settings()
+        try:
+            with open(path, 'r+b' if received else 'wb') as part:
+                part.truncate(offset)
+                part.seek(offset)
+                remaining = length
+                while remaining:
+                    block = stream.read(min(READ_BLOCK_SIZE, remaining))
+                    if not block:
+                        break
+                    if part.tell() == 0 and guess_mimetype(block) not in rules['mimetypes']:
+                        raise ValidationError(_('This type of file is not accepted.'))
+                    part.write(block)
+                    remaining -= len(block)
+                received = part.tell()
+        except ValidationError:
+            # A rejected chunk discards the upload; after other failures the
+            # chunk is sent again and replaces what was written
+            if os.path.exists(path):
+                os.unlink(path)
+            raise
+
+        result = {'received': received}
+        if received == upload['s']:
+            result['reference'] = self._finish(upload, path)
+        return result
+
+    def _finish(self, upload, path):
+        """
+        Turn a complete part file into a pending attachment, moved into the
+        filestore without being loaded in memory when attachments are stored
+        as files. The attachment gets the type sniffed from the content, not
+        the one declared by the browser.
+
+        Returns:
+            str: Signed reference of the attachment for the signup submission
+        """
+        sha1 = hashlib.sha1()
+        mimetype = None
+        with open(path, 'rb') as part:
+            for block in iter(lambda: part.read(READ_BLOCK_SIZE), b''):
+                if mimetype is None:
+                    mimetype = guess_mimetype(block)
+                sha1.update(block)
+        checksum = sha1.hexdigest()
+
+        if mimetype not in self.env['res.config.settings'].get_upload_settings()['mimetypes']:
+            os.unlink(path)
+            raise ValidationError(_('This type of file is not accepted.'))
+
+        attachments = self.env['ir.attachment'].sudo()
+        vals = {
+            'name': upload['n'],
+            'type': 'binary',
+            'mimetype': mimetype,
+            'res_model': self._name,
+            'res_id': 0,
+        }
+        if attachments._storage() == 'file':
+            store_fname = f'{checksum[:2]}/{checksum}'
+            full_path = attachments._full_path(store_fname)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            if os.path.exists(full_path):
+                os.unlink(path)
+            else:
+                os.replace(path, full_path)
+                # Like _file_write: the file is removed again by the filestore
+                # garbage collection if this transaction is rolled back
+                attachments._mark_for_gc(store_fname)
+            vals.update(store_fname=store_fname, checksum=checksum, file_size=upload['s'])
+        else:
+            with open(path, 'rb') as part:
+                vals['raw'] = part.read()
+            os.unlink(path)
+
+        attachment = attachments.create(vals)
+        _logger.info(f"Stored signup upload {attachment.id} ({upload['s']} bytes, {mimetype})")
+        return self._sign({'a': attachment.id, 'f': upload['f'], 'exp': int(time.time()) + UPLOAD_TTL_HOURS * 3600})
+
+    @api.model
+    def resolve_reference(self, reference, signup_field_id):
+        """
+        Attachment of a finished upload referenced by a signup submission.
+
+        Returns:
+            int: Pending attachment id, or False if the reference is invalid,
+                 for another field or already claimed
+        """
+        payload = self._verify(reference)
+        if not payload or payload.get('f') != signup_field_id:
+            return False
+        attachment = self.env['ir.attachment'].sudo().browse(payload['a']).exists()
+        if not attachment or attachment.res_model != self._name or attachment.res_id:
+            return False
+        return attachment.id
+
+    @api.model
+    def attach_uploads(self, user, attachment_ids):
+        """
+        Move pending attachments to the binary fields of a new user. Fields
+        stored as attachments take the file over as it is; the others, like
+        resized images, are written from its content.
+
+        Args:
+            user (recordset): res.users record
+            attachment_ids (dict): Field name -> pending attachment id
+        """
+        for field_name, attachment_id in attachment_ids.items():
+            attachment = self.env['ir.attachment'].sudo().browse(attachment_id).exists()
+            field = user._fields.get(field_name)
+            if not attachment or not field:
+                continue
+            if field.type == 'binary' and field.attachment and field.store and not field.related:
+                attachment.write({
+                    'name': field_name,
+                    'res_model': user._name,
+                    'res_id': user.id,
+                    'res_field': field_name,
+                })
+            else:
+                user.sudo().write({field_name: attachment.datas})
+                attachment.unlink()
+
+    @api.autovacuum
+    def _gc_signup_uploads(self):
+        """
+        Drop uploads never claimed by a signup and abandoned part files.
+        """
+        limit = fields.Datetime.subtract(fields.Datetime.now(), hours=UPLOAD_TTL_HOURS)
+        pending = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_id', '=', 0),
+            ('create_date', '<', limit),
+        ])
+        pending.unlink()
+
+        directory = os.path.join(self.env['ir.attachment']._filestore(), UPLOAD_DIR)
+        removed = 0
+        if os.path.isdir(directory):
+            expired = time.time() - UPLOAD_TTL_HOURS * 3600
+            for entry in os.scandir(directory):
+                if entry.is_file() and entry.stat().st_mtime < expired:
+                    os.unlink(entry.path)
+                    removed += 1
+        _logger.info(f"Removed {len(pending)} unclaimed signup uploads and {removed} abandoned part files")
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Signup Velocity Counters
+Sliding-window registration counters per IP address, network and email
+domain, kept in an unlogged PostgreSQL table shared by all workers, used to
+stop signup waves before any expensive validation runs.
+"""
+
+import ipaddress
+import logging
+import time
+
+from odoo import api, models
+
+_logger = logging.getLogger(__name__)
+
+VELOCITY_TABLE = 'j_signup_velocity'
+
+# Sliding window counter: the count of the current fixed window plus the
+# previous window's count weighted by how much of it still overlaps the
+# sliding window. The previous count carries over only from the window
+# immediately before, so an idle key starts again from zero.
+_INCREMENT_QUERY = """
+    INSERT INTO j_signup_velocity AS v (counter_key, window_start, current_count, previous_count)
+    VALUES (%(key)s, %(window_start)s, 1, 0)
+    ON CONFLICT (counter_key) DO UPDATE SET
+        previous_count = CASE
+            WHEN v.window_start = EXCLUDED.window_start THEN v.previous_count
+            WHEN v.window_start = EXCLUDED.window_start - %(window)s THEN v.current_count
+            ELSE 0 END,
+        current_count = CASE
+            WHEN v.window_start = EXCLUDED.window_start THEN v.current_count + 1
+            ELSE 1 END,
+        window_start = EXCLUDED.window_start
+    RETURNING current_count, previous_count
+"""
+
+
+def velocity_keys(ip_address, email, trusted_domains=frozenset()):
+    """
+    Counter keys of a signup attempt, with the name of their limit.
+    Allowlisted email domains are never counted per domain.
+
+    Returns:
+        list: (limit name, counter key) tuples
+    """
+    keys = []
+    if ip_address:
+        try:
+            address = ipaddress.ip_address(ip_address)
+        except ValueError:
+            address = None
+        if address is not None:
+            keys.append(('ip', f'ip:{address}'))
+            prefix = 24 if address.version == 4 else 64
+            network = ipaddress.ip_network(f'{address}/{prefix}', strict=False)
+            keys.append(('network', f'net:{network}'))
+    if email and '@' in email:
+        domain = email.rsplit('@', 1)[1].lower()
+        if domain not in trusted_domains:
+            keys.append(('domain', f'domain:{domain}'))
+    return keys
+
+
+class SignupVelocity(models.AbstractModel):
+    """
+    Registration velocity checks for the signup submit endpoint.
+    Like the rate limit buckets, the counters live in an unlogged table:
+    one upsert per counter, shared by every worker and cheap to write.
+    """
+    _name = 'signup.velocity'
+    _description = 'Signup Registration Velocity Counters'
+
+    def init(self):
+        self.env.cr.execute(f"""
+            CREATE UNLOGGED TABLE IF NOT EXISTS {VELOCITY_TABLE} (
+                counter_key varchar PRIMARY KEY,
+                window_start bigint NOT NULL,
+                current_count integer NOT NULL DEFAULT 0,
+                previous_count integer NOT NULL DEFAULT 0
+            )
+        """)
+
+    @api.model
+    def record_attempt(self, ip_address=None, email=None):
+        """
+        Count a signup attempt and compare the sliding-window rates with the
+        configured thresholds. The signup submission counts the IP address
+        before validating and the email domain once the address is known to
+        be deliverable, so made-up addresses never count against a domain.
+
+        The counters are updated in a separate, immediately committed
+        transaction, so attempts count even when the signup later fails.
+
+        Returns:
+            dict: 'action' (None, 'block' or 'verify'), 'limit' (name of the
+                  exceeded limit) and 'rate' (its estimated count)
+        """
+        rules = self.env['res.config.settings'].get_velocity_rules()
+        verdict = {'action': None, 'limit': None, 'rate': 0}
+        if not rules.get('enabled', True):
+            return verdict
+
+        trusted_domains = self.env['signup.trusted.domain'].get_trusted_domains() if email else frozenset()
+        keys = [(name, key) for name, key in velocity_keys(ip_address, email, trusted_domains)
+                if rules['limits'].get(name)]
+        if not keys:
+            return verdict
+
+        window = rules['window_minutes'] * 60
+        now = time.time()
+        window_start = int(now // window * window)
+        overlap = 1 - (now - window_start) / window
+
+        try:
+            with self.env.registry.cursor() as cr:
+                for name, key in keys:
+                    cr.execute(_INCREMENT_QUERY, {'key': key, 'window_start': window_start, 'window': window})
+                    current_count, previous_count = cr.fetchone()
+                    rate = current_count + previous_count * overlap
+                    if rate > rules['limits'][name] and rate > verdict['rate']:
+                        action = rules['domain_action'] if name == 'domain' else rules['action']
+                        verdict.update(action=action, limit=name, rate=rate)
+        except Exception as e:
+            # Never block signups because the counters themselves failed
+            _logger.warning(f"Signup velocity counters unavailable, allowing signup: {str(e)}")
+            return {'action': None, 'limit': None, 'rate': 0}
+
+        if verdict['action']:
+            _logger.warning(f"Signup velocity limit '{verdict['limit']}' exceeded for {ip_address} / {email}: "
+                            f"{verdict['rate']:.1f} in {rules['window_minutes']} min, action {verdict['action']}")
+        return verdict
+
+    @api.autovacuum
+    def _gc_velocity_counters(self):
+        """
+        Drop counters whose windows both ended a day ago or more.
+        """
+        self.env.cr.execute(f"""
+            DELETE FROM {VELOCITY_TABLE}
+             WHERE window_start < EXTRACT(EPOCH FROM clock_timestamp())::bigint - 86400
+        """)
+        _logger.info(f"Removed {self.env.cr.rowcount} idle signup velocity counters")
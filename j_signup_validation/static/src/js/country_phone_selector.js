@@ -1,6 +1,7 @@
 /**
  * Country Phone Selector Module
- * Handles country selection and phone number formatting
+ * Handles country selection and phone number formatting.
+ * The country list is loaded lazily from a cached JSON endpoint.
  */
 
 (function() {
@@ -12,6 +13,12 @@
             this.phoneInput = document.getElementById('phone');
             this.phonePreview = document.getElementById('phone-preview-text');
             
+            // Loaded country rows: [id, ISO code, phone code, name], in name order
+            this.countries = null;
+            this.countriesPromise = null;
+            // Sorted [token, row position] pairs for prefix search
+            this.searchIndex = [];
+            
             // Phone number examples by country code
             this.phoneExamples = {
                 '966': '51 234 5678',  // Saudi Arabia
@@ -108,6 +115,17 @@
             this.countrySelect.addEventListener('change', this.handleCountryChange.bind(this));
             this.phoneInput.addEventListener('input', this.handlePhoneInput.bind(this));
             
+            // Load the full country list on first interaction, or when idle
+            const loadCountries = () => this.ensureCountries();
+            ['focus', 'mousedown', 'touchstart'].forEach(eventName => {
+                this.countrySelect.addEventListener(eventName, loadCountries, { once: true, passive: true });
+            });
+            if (window.requestIdleCallback) {
+                window.requestIdleCallback(loadCountries, { timeout: 3000 });
+            } else {
+                setTimeout(loadCountries, 1500);
+            }
+            
             // Make country selector searchable
             this.makeSelectSearchable();
             
@@ -188,7 +206,7 @@
             clearTimeout(this.phoneValidationTimeout);
             this.phoneValidationTimeout = setTimeout(() => {
                 this.validatePhoneNumber();
-            }, 500);
+            }, window.signupRpc.debounceDelay());
         }
 
         updatePhonePreview() {
@@ -235,7 +253,7 @@
                 const response = await this.makeAjaxRequest('/j_signup_validation/validate_phone', {
                     phone: phoneNumber,
                     country_id: countryId
-                });
+                }, 'selector:phone');
 
                 if (response.valid) {
                     this.setPhoneValidationStatus('valid', 'Phone is valid');
@@ -243,6 +261,10 @@
                     this.setPhoneValidationStatus('invalid', response.messages.join(', '));
                 }
             } catch (error) {
+                if (window.SignupRpc.isAbort(error)) {
+                    // Superseded by a newer input, its verdict will follow
+                    return;
+                }
                 console.error('Phone validation error:', error);
                 this.setPhoneValidationStatus('error', 'Validation failed');
             }
@@ -279,26 +301,166 @@
             }
         }
 
+        /**
+         * Fetch the country list once and fill the select with it.
+         * The URL is versioned, so the browser serves it from its cache
+         * after the first visit.
+         */
+        ensureCountries() {
+            if (!this.countriesPromise) {
+                const url = this.countrySelect.dataset.countriesUrl;
+                if (!url) {
+                    this.countriesPromise = Promise.resolve(null);
+                    return this.countriesPromise;
+                }
+                this.countriesPromise = fetch(url, { credentials: 'same-origin' })
+                    .then(response => {
+                        if (!response.ok) {
+                            throw new Error(`HTTP error! status: ${response.status}`);
+                        }
+                        return response.json();
+                    })
+                    .then(data => {
+                        this.setCountries(data.countries || []);
+                        return this.countries;
+                    })
+                    .catch(error => {
+                        console.error('Country list loading error:', error);
+                        // Allow a retry on the next interaction
+                        this.countriesPromise = null;
+                        return null;
+                    });
+            }
+            return this.countriesPromise;
+        }
+
+        setCountries(rows) {
+            this.countries = rows;
+            this.searchIndex = this.buildSearchIndex(rows);
+
+            const selectedId = this.countrySelect.value;
+            const fragment = document.createDocumentFragment();
+            rows.forEach(([id, code, phoneCode, name]) => {
+                const option = document.createElement('option');
+                option.value = String(id);
+                option.setAttribute('data-code', phoneCode);
+                option.textContent = `${name} +${phoneCode}`;
+                if (String(id) === selectedId) {
+                    option.selected = true;
+                }
+                fragment.appendChild(option);
+            });
+            this.countrySelect.replaceChildren(fragment);
+            if (selectedId) {
+                this.countrySelect.value = selectedId;
+            }
+        }
+
+        normalizeTerm(value) {
+            return (value || '').normalize('NFKD').replace(/[\u0300-\u036f]/g, '')
+                .toLowerCase().trim().replace(/^\+/, '');
+        }
+
+        /**
+         * Same tokens as the server-side search: each name word, the full
+         * name, the ISO code and the phone code.
+         */
+        buildSearchIndex(rows) {
+            const index = [];
+            rows.forEach(([_id, code, phoneCode, name], position) => {
+                const normalizedName = this.normalizeTerm(name);
+                const tokens = new Set(normalizedName.replace(/[-(]/g, ' ').split(/\s+/));
+                tokens.add(normalizedName);
+                tokens.add(this.normalizeTerm(code));
+                tokens.add(String(phoneCode));
+                tokens.forEach(token => {
+                    if (token) {
+                        index.push([token, position]);
+                    }
+                });
+            });
+            index.sort((a, b) => (a[0] < b[0] ? -1 : a[0] > b[0] ? 1 : a[1] - b[1]));
+            return index;
+        }
+
+        /**
+         * Position of the first country in name order with a token starting
+         * with the term, or -1.
+         */
+        findCountryPosition(term) {
+            const index = this.searchIndex;
+            let low = 0;
+            let high = index.length;
+            while (low < high) {
+                const middle = (low + high) >> 1;
+                if (index[middle][0] < term) {
+                    low = middle + 1;
+                } else {
+                    high = middle;
+                }
+            }
+            let best = -1;
+            for (let i = low; i < index.length && index[i][0].startsWith(term); i++) {
+                if (best === -1 || index[i][1] < best) {
+                    best = index[i][1];
+                }
+            }
+            return best;
+        }
+
+        async searchCountry(query) {
+            const term = this.normalizeTerm(query);
+            if (!term) return null;
+
+            if (this.countries) {
+                const position = this.findCountryPosition(term);
+                return position === -1 ? null : this.countries[position];
+            }
+
+            // List not loaded yet: ask the server-side index
+            const response = await this.makeAjaxRequest('/j_signup_validation/countries/search', {
+                query: term,
+                limit: 1
+            }, 'selector:country-search');
+            return response && response.countries && response.countries.length ? response.countries[0] : null;
+        }
+
+        selectCountry(row) {
+            const [id, _code, phoneCode, name] = row;
+            let option = Array.prototype.find.call(this.countrySelect.options, opt => opt.value === String(id));
+            if (!option) {
+                option = document.createElement('option');
+                option.value = String(id);
+                option.setAttribute('data-code', phoneCode);
+                option.textContent = `${name} +${phoneCode}`;
+                this.countrySelect.appendChild(option);
+            }
+            option.selected = true;
+            this.updatePhonePreview();
+            this.updatePhonePlaceholder();
+        }
+
         makeSelectSearchable() {
-            // Simple search functionality for the select
+            // Type-to-search on the select, over the prefix index
             let searchTimeout;
             let searchQuery = '';
 
             this.countrySelect.addEventListener('keydown', (event) => {
                 if (event.key.length === 1) {
+                    event.preventDefault();
                     searchQuery += event.key.toLowerCase();
+                    const query = searchQuery;
                     
-                    // Find matching option
-                    const options = Array.from(this.countrySelect.options);
-                    const matchingOption = options.find(option => 
-                        option.textContent.toLowerCase().includes(searchQuery) ||
-                        option.getAttribute('data-code')?.includes(searchQuery)
-                    );
-                    
-                    if (matchingOption) {
-                        matchingOption.selected = true;
-                        this.updatePhonePreview();
-                    }
+                    this.searchCountry(query).then(row => {
+                        // Ignore answers for a query the user kept typing past
+                        if (row && query === searchQuery) {
+                            this.selectCountry(row);
+                        }
+                    }).catch(error => {
+                        if (!window.SignupRpc.isAbort(error)) {
+                            console.error('Country search error:', error);
+                        }
+                    });
                     
                     // Clear search query after delay
                     clearTimeout(searchTimeout);
@@ -309,26 +471,9 @@
             });
         }
 
-        async makeAjaxRequest(url, data) {
-            const response = await fetch(url, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({
-                    jsonrpc: '2.0',
-                    method: 'call',
-                    params: data,
-                    id: Date.now()
-                })
-            });
-
-            const result = await response.json();
-            if (result.error) {
-                throw new Error(result.error.message);
-            }
-            
-            return result.result;
+        makeAjaxRequest(url, data, channel) {
+            // Shared RPC layer: identical calls from the main validator are coalesced
+            return window.signupRpc.call(url, data, { channel: channel || url });
         }
     }
 
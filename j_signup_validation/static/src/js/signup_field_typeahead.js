@@ -0,0 +1,159 @@
+/**
+ * Signup Field Typeahead Module
+ * Searchable picker for many2one dynamic fields with too many records to be
+ * embedded in the page: pages of matching records are fetched on demand
+ * from the field options endpoint
+ */
+
+(function() {
+    'use strict';
+
+    const OPTIONS_URL = '/j_signup_validation/field_options';
+    const PAGE_SIZE = 20;
+
+    class FieldTypeahead {
+        constructor(container) {
+            this.container = container;
+            this.fieldId = parseInt(container.getAttribute('data-field-id'), 10);
+            this.input = container.querySelector('.j-field-typeahead-input');
+            this.valueInput = container.querySelector('input[type="hidden"]');
+            this.menu = container.querySelector('.j-field-typeahead-menu');
+            this.channel = `typeahead:${this.fieldId}`;
+
+            this.query = '';
+            this.offset = 0;
+            this.more = false;
+            this.loading = false;
+            this.searchTimeout = null;
+
+            if (this.input && this.valueInput && this.menu) {
+                this.init();
+            }
+        }
+
+        init() {
+            this.input.addEventListener('input', () => {
+                // Typing invalidates the previous choice
+                this.setValue('');
+                clearTimeout(this.searchTimeout);
+                this.searchTimeout = setTimeout(() => {
+                    this.search(this.input.value.trim());
+                }, window.signupRpc.debounceDelay());
+            });
+            this.input.addEventListener('focus', () => {
+                if (!this.valueInput.value) {
+                    this.search(this.input.value.trim());
+                }
+            });
+            this.input.addEventListener('blur', () => {
+                // Let a click on an option land before closing
+                setTimeout(() => {
+                    this.close();
+                    if (!this.valueInput.value) {
+                        this.input.value = '';
+                    }
+                }, 200);
+            });
+            this.menu.addEventListener('scroll', () => {
+                if (this.more && !this.loading
+                        && this.menu.scrollTop + this.menu.clientHeight >= this.menu.scrollHeight - 20) {
+                    this.loadPage(this.query, this.offset);
+                }
+            });
+        }
+
+        search(query) {
+            this.query = query;
+            this.offset = 0;
+            this.menu.innerHTML = '';
+            this.loadPage(query, 0);
+        }
+
+        loadPage(query, offset) {
+            this.loading = true;
+            window.signupRpc.call(OPTIONS_URL, {
+                field_id: this.fieldId,
+                query: query,
+                offset: offset,
+                limit: PAGE_SIZE
+            }, { channel: this.channel }).then(result => {
+                if (!result || result.throttled || query !== this.query) {
+                    return;
+                }
+                this.offset = offset + result.options.length;
+                this.more = Boolean(result.more);
+                this.render(result.options, offset === 0);
+            }).catch(error => {
+                if (!window.SignupRpc.isAbort(error)) {
+                    console.error('Field options search error:', error);
+                }
+            }).finally(() => {
+                this.loading = false;
+            });
+        }
+
+        render(options, reset) {
+            if (reset) {
+                this.menu.innerHTML = '';
+            }
+            options.forEach(([id, name]) => {
+                const item = document.createElement('button');
+                item.type = 'button';
+                item.className = 'dropdown-item';
+                item.setAttribute('role', 'option');
+                item.textContent = name;
+                item.addEventListener('mousedown', (event) => {
+                    event.preventDefault();
+                    this.setValue(String(id));
+                    this.input.value = name;
+                    this.close();
+                });
+                this.menu.appendChild(item);
+            });
+            if (reset && !options.length) {
+                const empty = document.createElement('span');
+                empty.className = 'dropdown-item-text text-muted';
+                empty.textContent = 'No results';
+                this.menu.appendChild(empty);
+            }
+            this.open();
+        }
+
+        setValue(value) {
+            if (this.valueInput.value === value) {
+                return;
+            }
+            this.valueInput.value = value;
+            // The form validator listens to input events of the dynamic fields
+            this.valueInput.dispatchEvent(new Event('input', { bubbles: true }));
+        }
+
+        open() {
+            this.menu.classList.add('show');
+            this.input.setAttribute('aria-expanded', 'true');
+        }
+
+        close() {
+            this.menu.classList.remove('show');
+            this.input.setAttribute('aria-expanded', 'false');
+        }
+    }
+
+    // Initialize when DOM is loaded
+    function initFieldTypeaheads() {
+        const start = () => {
+            document.querySelectorAll('.j-field-typeahead').forEach(container => {
+                new FieldTypeahead(container);
+            });
+        };
+        if (document.readyState === 'loading') {
+            document.addEventListener('DOMContentLoaded', start);
+        } else {
+            start();
+        }
+    }
+
+    // Auto-initialize
+    initFieldTypeaheads();
+
+})();
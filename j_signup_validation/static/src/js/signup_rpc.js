@@ -0,0 +1,193 @@
+/**
+ * Signup RPC Module
+ * Shared JSON-RPC client for the signup validation endpoints with
+ * cancellation of superseded calls, coalescing of identical in-flight
+ * calls, a small per-page result cache and latency-adaptive debouncing
+ */
+
+(function() {
+    'use strict';
+
+    class SignupRpc {
+        constructor(options = {}) {
+            this.cacheSize = options.cacheSize || 50;
+            this.minDebounce = options.minDebounce || 250;
+            this.maxDebounce = options.maxDebounce || 1200;
+            this.baseDebounce = options.baseDebounce || 500;
+
+            // key -> result, kept in insertion order for LRU eviction
+            this.cache = new Map();
+            // key -> {promise, controller, channels}
+            this.inFlight = new Map();
+            // channel -> key of the request the channel is waiting for
+            this.channels = new Map();
+            // channel -> sequence number of its latest call
+            this.channelSeq = new Map();
+            this.callSeq = 0;
+
+            this.latencyEwma = null;
+            this.backoffUntil = 0;
+            this.requestId = 0;
+        }
+
+        cacheKey(url, params) {
+            return `${url}|${JSON.stringify(params)}`;
+        }
+
+        /**
+         * Call a JSON-RPC endpoint.
+         * A newer call on the same channel aborts the older one unless another
+         * channel still waits for it; identical calls share one request.
+         * Superseded calls reject with an AbortError that callers should ignore.
+         */
+        call(url, params, options = {}) {
+            const channel = options.channel || url;
+            const key = this.cacheKey(url, params);
+            const seq = ++this.callSeq;
+            this.channelSeq.set(channel, seq);
+
+            this.releaseChannel(channel, key);
+
+            if (this.cache.has(key)) {
+                const cached = this.cache.get(key);
+                // Refresh LRU position
+                this.cache.delete(key);
+                this.cache.set(key, cached);
+                return Promise.resolve(cached);
+            }
+
+            let entry = this.inFlight.get(key);
+            if (!entry) {
+                const controller = new AbortController();
+                const promise = this.send(url, params, controller.signal)
+                    .then(result => {
+                        if (this.isCacheable(result)) {
+                            this.remember(key, result);
+                        }
+                        return result;
+                    })
+                    .finally(() => {
+                        if (this.inFlight.get(key) === entry) {
+                            this.inFlight.delete(key);
+                        }
+                        entry.channels.forEach(name => {
+                            if (this.channels.get(name) === key) {
+                                this.channels.delete(name);
+                            }
+                        });
+                    });
+                entry = { promise, controller, channels: new Set() };
+                this.inFlight.set(key, entry);
+            }
+
+            entry.channels.add(channel);
+            this.channels.set(channel, key);
+
+            // A shared request may outlive this channel's interest in it:
+            // never hand a superseded verdict back to the channel
+            return entry.promise.then(result => {
+                if (this.channelSeq.get(channel) !== seq) {
+                    throw SignupRpc.abortError();
+                }
+                return result;
+            });
+        }
+
+        releaseChannel(channel, nextKey) {
+            const previousKey = this.channels.get(channel);
+            if (!previousKey || previousKey === nextKey) {
+                return;
+            }
+            this.channels.delete(channel);
+
+            const entry = this.inFlight.get(previousKey);
+            if (!entry) {
+                return;
+            }
+            entry.channels.delete(channel);
+            if (entry.channels.size === 0) {
+                entry.controller.abort();
+                this.inFlight.delete(previousKey);
+            }
+        }
+
+        async send(url, params, signal) {
+            const started = performance.now();
+            const response = await fetch(url, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({
+                    jsonrpc: '2.0',
+                    method: 'call',
+                    params: params,
+                    id: ++this.requestId
+                }),
+                signal: signal
+            });
+
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+
+            const result = await response.json();
+
+            if (result.error) {
+                throw new Error(result.error.message || 'Server error');
+            }
+
+            this.recordLatency(performance.now() - started);
+            if (result.result && result.result.throttled) {
+                this.backoffUntil = Date.now() + (result.result.retry_after || 1) * 1000;
+            }
+            return result.result;
+        }
+
+        isCacheable(result) {
+            return Boolean(result) && !result.throttled;
+        }
+
+        remember(key, result) {
+            this.cache.set(key, result);
+            if (this.cache.size > this.cacheSize) {
+                this.cache.delete(this.cache.keys().next().value);
+            }
+        }
+
+        recordLatency(latency) {
+            this.latencyEwma = this.latencyEwma === null ? latency : 0.7 * this.latencyEwma + 0.3 * latency;
+        }
+
+        /**
+         * Debounce interval for typing-triggered validation.
+         * Fast servers get a short delay for responsiveness, slow servers a
+         * longer one so keystrokes do not pile up requests.
+         */
+        debounceDelay() {
+            const backoff = this.backoffUntil - Date.now();
+            if (backoff > 0) {
+                return Math.max(backoff, this.maxDebounce);
+            }
+            if (this.latencyEwma === null) {
+                return this.baseDebounce;
+            }
+            return Math.min(this.maxDebounce, Math.max(this.minDebounce, 200 + this.latencyEwma));
+        }
+
+        static abortError() {
+            const error = new Error('Superseded by a newer request');
+            error.name = 'AbortError';
+            return error;
+        }
+
+        static isAbort(error) {
+            return Boolean(error) && error.name === 'AbortError';
+        }
+    }
+
+    // Single instance shared by all signup components on the page
+    window.SignupRpc = SignupRpc;
+    window.signupRpc = window.signupRpc || new SignupRpc();
+
+})();
@@ -0,0 +1,190 @@
+/**
+ * Signup Upload Module
+ * Uploads the files of the signup form's file fields in chunks as soon as
+ * they are chosen, so the form submission only carries a reference to the
+ * stored file
+ */
+
+(function() {
+    'use strict';
+
+    const START_URL = '/j_signup_validation/upload/start';
+    const CHUNK_URL = '/j_signup_validation/upload/chunk';
+    const CHUNK_RETRIES = 3;
+
+    class SignupUpload {
+        constructor(container) {
+            this.container = container;
+            this.fieldId = parseInt(container.getAttribute('data-field-id'), 10);
+            this.maxSize = parseInt(container.getAttribute('data-max-size'), 10) || 0;
+            this.mimetypes = (container.getAttribute('data-mimetypes') || '').split(',').filter(Boolean);
+            this.fileInput = container.querySelector('.j-signup-upload-input');
+            this.valueInput = container.querySelector('input[type="hidden"]');
+            this.progress = container.querySelector('.progress');
+            this.progressBar = container.querySelector('.progress-bar');
+            this.status = container.querySelector('.j-signup-upload-status');
+            // Incremented by every new file so an older upload stops
+            this.generation = 0;
+
+            if (this.fileInput && this.valueInput) {
+                this.fileInput.addEventListener('change', () => this.handleFileChange());
+            }
+        }
+
+        handleFileChange() {
+            const generation = ++this.generation;
+            this.setValue('');
+            const file = this.fileInput.files && this.fileInput.files[0];
+            if (!file) {
+                this.showStatus('');
+                return;
+            }
+            if (this.maxSize && file.size > this.maxSize) {
+                this.fail(`The file is larger than ${Math.floor(this.maxSize / (1024 * 1024))} MB.`);
+                return;
+            }
+            if (file.type && this.mimetypes.length && !this.mimetypes.includes(file.type)) {
+                this.fail('This type of file is not accepted.');
+                return;
+            }
+            this.upload(file, generation).catch(error => {
+                if (generation === this.generation) {
+                    this.fail(error.message || 'Upload failed. Please try again.');
+                }
+            });
+        }
+
+        async upload(file, generation) {
+            this.showProgress(0);
+            this.showStatus('Uploading...');
+
+            const start = await this.rpc(START_URL, {
+                field_id: this.fieldId,
+                filename: file.name,
+                size: file.size,
+                mimetype: file.type || 'application/octet-stream'
+            });
+            if (!start.ok) {
+                throw new Error(start.message || (start.throttled ? 'Too many requests. Please try again shortly.' : ''));
+            }
+
+            let offset = 0;
+            let reference = null;
+            while (offset < file.size) {
+                if (generation !== this.generation) {
+                    return;
+                }
+                const result = await this.sendChunk(start.token, offset, file.slice(offset, offset + start.chunk_size));
+                offset = result.received;
+                reference = result.reference || null;
+                this.showProgress(offset / file.size);
+            }
+
+            if (generation !== this.generation) {
+                return;
+            }
+            if (!reference) {
+                throw new Error('Upload failed. Please try again.');
+            }
+            this.setValue(reference);
+            this.showStatus(`${file.name} uploaded`);
+            this.hideProgress();
+        }
+
+        async sendChunk(token, offset, chunk) {
+            const url = `${CHUNK_URL}?token=${encodeURIComponent(token)}&offset=${offset}`;
+            let lastError = null;
+            for (let attempt = 0; attempt < CHUNK_RETRIES; attempt++) {
+                let response;
+                try {
+                    response = await fetch(url, {
+                        method: 'POST',
+                        headers: { 'Content-Type': 'application/octet-stream' },
+                        body: chunk
+                    });
+                } catch (error) {
+                    // Network failure: the same chunk is sent again
+                    lastError = error;
+                    continue;
+                }
+                const result = await response.json();
+                if (!result.ok) {
+                    // Rejected by the server: the upload was discarded
+                    throw new Error(result.message || 'Upload failed. Please try again.');
+                }
+                return result;
+            }
+            throw lastError || new Error('Upload failed. Please try again.');
+        }
+
+        async rpc(url, params) {
+            // Not through the shared RPC client: every upload must get its own token
+            const response = await fetch(url, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ jsonrpc: '2.0', method: 'call', params: params, id: Date.now() })
+            });
+            const result = await response.json();
+            if (result.error) {
+                throw new Error(result.error.message || 'Server error');
+            }
+            return result.result || {};
+        }
+
+        setValue(value) {
+            if (this.valueInput.value === value) {
+                return;
+            }
+            this.valueInput.value = value;
+            // The form validator listens to input events of the dynamic fields
+            this.valueInput.dispatchEvent(new Event('input', { bubbles: true }));
+        }
+
+        fail(message) {
+            this.setValue('');
+            this.fileInput.value = '';
+            this.hideProgress();
+            this.showStatus(message, true);
+        }
+
+        showProgress(ratio) {
+            if (!this.progress) {
+                return;
+            }
+            this.progress.classList.remove('d-none');
+            this.progressBar.style.width = `${Math.round(ratio * 100)}%`;
+        }
+
+        hideProgress() {
+            if (this.progress) {
+                this.progress.classList.add('d-none');
+            }
+        }
+
+        showStatus(message, error = false) {
+            if (!this.status) {
+                return;
+            }
+            this.status.textContent = message;
+            this.status.classList.toggle('text-danger', error);
+        }
+    }
+
+    // Initialize when DOM is loaded
+    function initSignupUploads() {
+        const start = () => {
+            document.querySelectorAll('.j-signup-upload').forEach(container => {
+                new SignupUpload(container);
+            });
+        };
+        if (document.readyState === 'loading') {
+            document.addEventListener('DOMContentLoaded', start);
+        } else {
+            start();
+        }
+    }
+
+    // Auto-initialize
+    initSignupUploads();
+
+})();
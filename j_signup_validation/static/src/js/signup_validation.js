@@ -157,12 +157,30 @@
                 return;
             }
 
+            this.setIdempotencyKey();
             this.bindEvents();
             this.initValidation();
             this.initializeAccountTypeValidation();
             console.log('Signup validation initialized');
         }
 
+        setIdempotencyKey() {
+            // One key per rendered form: double clicks and retries of this
+            // submission are answered with the response of the first one.
+            // A key restored by the browser is kept: the server releases the
+            // key of a rejected submission, so the corrected form goes through
+            const keyInput = this.form.querySelector('input[name="idempotency_key"]');
+            if (!keyInput || keyInput.value) {
+                return;
+            }
+            if (window.crypto && typeof window.crypto.randomUUID === 'function') {
+                keyInput.value = window.crypto.randomUUID();
+            } else if (window.crypto && window.crypto.getRandomValues) {
+                const bytes = window.crypto.getRandomValues(new Uint8Array(16));
+                keyInput.value = Array.from(bytes, (byte) => byte.toString(16).padStart(2, '0')).join('');
+            }
+        }
+
         initializeAccountTypeValidation() {
             // Initialize validation states based on the default account type
             const accountType = document.querySelector('input[name="account_type"]:checked')?.value || 'individual';
@@ -253,6 +271,9 @@
                 clearTimeout(this.validationTimeouts.email);
             }
 
+            // A previous verdict no longer applies to the edited value
+            this.setValidationToken('email_validation_token', '');
+
             // Show loading state
             this.setEmailValidationStatus('checking', 'Checking email...');
             event.target.classList.add('loading');
@@ -260,7 +281,7 @@
             // Debounced validation
             this.validationTimeouts.email = setTimeout(() => {
                 this.validateEmail(email);
-            }, 500);
+            }, window.signupRpc.debounceDelay());
         }
 
         handleEmailBlur(event) {
@@ -289,20 +310,26 @@
                 }
 
                 // Server-side validation
-                const response = await this.makeAjaxRequest('/j_signup_validation/validate_email', { email });
+                const response = await this.makeAjaxRequest('/j_signup_validation/validate_email', { email }, 'validator:email');
 
                 this.emailInput.classList.remove('loading');
 
                 if (response.valid) {
                     this.setEmailValidationStatus('valid', 'Email is valid');
                     this.validationStates.email = true;
+                    this.setValidationToken('email_validation_token', response.token);
                 } else {
+                    this.setValidationToken('email_validation_token', '');
                     const message = response.messages.join(', ');
                     this.setEmailValidationStatus('invalid', message);
                     this.validationStates.email = false;
                 }
 
             } catch (error) {
+                if (window.SignupRpc.isAbort(error)) {
+                    // Superseded by a newer input, its verdict will follow
+                    return;
+                }
                 console.error('Email validation error:', error);
                 this.setEmailValidationStatus('invalid', 'Email validation failed');
                 this.validationStates.email = false;
@@ -338,6 +365,9 @@
                 clearTimeout(this.validationTimeouts.phone);
             }
 
+            // A previous verdict no longer applies to the edited value
+            this.setValidationToken('phone_validation_token', '');
+
             // Show loading state
             this.setPhoneValidationStatus('checking', 'Validating phone...');
             event.target.classList.add('loading');
@@ -345,7 +375,7 @@
             // Debounced validation
             this.validationTimeouts.phone = setTimeout(() => {
                 this.validatePhone(phone);
-            }, 500);
+            }, window.signupRpc.debounceDelay());
         }
 
         handlePhoneBlur(event) {
@@ -374,24 +404,30 @@
                 const response = await this.makeAjaxRequest('/j_signup_validation/validate_phone', { 
                     phone: phone,
                     country_id: countryId 
-                });
+                }, 'validator:phone');
 
                 this.phoneInput.classList.remove('loading');
 
                 if (response.valid) {
                     this.setPhoneValidationStatus('valid', 'Phone is valid');
                     this.validationStates.phone = true;
+                    this.setValidationToken('phone_validation_token', response.token);
                     // Update input with formatted number
                     if (response.formatted && response.formatted !== phone) {
                         this.phoneInput.value = response.formatted;
                     }
                 } else {
+                    this.setValidationToken('phone_validation_token', '');
                     const message = response.messages.join(', ');
                     this.setPhoneValidationStatus('invalid', message);
                     this.validationStates.phone = false;
                 }
 
             } catch (error) {
+                if (window.SignupRpc.isAbort(error)) {
+                    // Superseded by a newer input, its verdict will follow
+                    return;
+                }
                 console.error('Phone validation error:', error);
                 this.setPhoneValidationStatus('invalid', 'Phone validation failed');
                 this.validationStates.phone = false;
@@ -912,31 +948,17 @@
             console.log('Password toggle added for confirm password field only:', toggle);
         }
 
-        async makeAjaxRequest(url, data) {
-            const response = await fetch(url, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({
-                    jsonrpc: '2.0',
-                    method: 'call',
-                    params: data,
-                    id: Date.now()
-                })
-            });
-
-            if (!response.ok) {
-                throw new Error(`HTTP error! status: ${response.status}`);
-            }
-
-            const result = await response.json();
-
-            if (result.error) {
-                throw new Error(result.error.message || 'Server error');
+        setValidationToken(name, token) {
+            // Signed verdict sent with the form so submit can skip repeating the check
+            const input = this.form.querySelector(`input[name="${name}"]`);
+            if (input) {
+                input.value = token || '';
             }
+        }
 
-            return result.result;
+        makeAjaxRequest(url, data, channel) {
+            // Shared RPC layer: aborts superseded calls, coalesces and caches results
+            return window.signupRpc.call(url, data, { channel: channel || url });
         }
     }
 
@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""
+J Signup Validation Tools
+Framework-independent helpers used by the signup controllers and models.
+"""
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+Breached Password Bloom Filter
+Offline, memory-mapped Bloom filter of known-breached passwords.
+
+The filter file is opened read-only with mmap, so its pages live in the OS
+page cache once and are shared by every worker process; a lookup hashes the
+password once and reads ``k`` bits, with no network call.
+
+Members are SHA-1 digests of the passwords, which lets the filter be built
+both from plain-text password lists and from SHA-1 dumps such as the
+"Pwned Passwords" ``HASH:COUNT`` files. The file is self-contained and does
+not depend on Odoo.
+
+Build a filter (from the repository root):
+
+    python j_signup_validation/tools/breached_passwords.py build \\
+        --input pwned-passwords-sha1.txt --output breached_passwords.bloom \\
+        --fp-rate 0.001
+
+Check a password against it:
+
+    python j_signup_validation/tools/breached_passwords.py check \\
+        breached_passwords.bloom 'Password1'
+"""
+
+import argparse
+import hashlib
+import logging
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+
+_logger = logging.getLogger(__name__)
+
+MAGIC = b'JSVBLOOM'
+FORMAT_VERSION = 1
+# magic, version, hash count, bit count, item count, false-positive rate
+_HEADER = struct.Struct('<8sBxxxIQQd')
+HEADER_SIZE = 64
+
+# Seconds between checks for a rebuilt filter file
+RELOAD_CHECK_INTERVAL = 30
+
+
+def password_digest(password):
+    """SHA-1 digest of a password, the filter's member form."""
+    return hashlib.sha1(password.encode('utf-8')).digest()
+
+
+def optimal_parameters(capacity, fp_rate):
+    """
+    Bit and hash counts giving ``fp_rate`` for ``capacity`` members.
+
+    Returns:
+        tuple: (bit count, hash count)
+    """
+    capacity = max(1, capacity)
+    if not 0 < fp_rate < 1:
+        raise ValueError(f"False-positive rate must be between 0 and 1, got {fp_rate}")
+    bits = math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2))
+    bits = max(64, (bits + 7) // 8 * 8)
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+def _bit_positions(digest, bits, hashes):
+    """Double hashing over two 64-bit halves of the SHA-1 digest."""
+    h1, h2 = struct.unpack_from('<QQ', digest)
+    h2 |= 1
+    return [(h1 + i * h2) % bits for i in range(hashes)]
+
+
+class BreachedPasswordFilter:
+    """
+    Read-only, memory-mapped Bloom filter.
+
+    A match means the password is breached with probability
+    ``1 - fp_rate``; a miss means it is certainly not in the source list.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as filter_file:
+            stat = os.fstat(filter_file.fileno())
+            self._mmap = mmap.mmap(filter_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+        magic, version, self.hashes, self.bits, self.count, self.fp_rate = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a breached password filter (version {FORMAT_VERSION})")
+        if len(self._mmap) < HEADER_SIZE + self.bits // 8:
+            self._mmap.close()
+            raise ValueError(f"{path} is truncated")
+
+    def __contains__(self, password):
+        return self.contains_digest(password_digest(password))
+
+    def contains_digest(self, digest):
+        data = self._mmap
+        for position in _bit_positions(digest, self.bits, self.hashes):
+            if not data[HEADER_SIZE + (position >> 3)] & (1 << (position & 7)):
+                return False
+        return True
+
+    def close(self):
+        self._mmap.close()
+
+
+class BreachedPasswordFilterBuilder:
+    """
+    Writes a filter file through a writable mmap, so building does not need
+    the bit array in process memory. The file is written under a temporary
+    name and moved in place, so running workers never read a partial filter.
+    """
+
+    def __init__(self, path, capacity, fp_rate=0.001):
+        self.path = path
+        self.tmp_path = f'{path}.tmp{os.getpid()}'
+        self.bits, self.hashes = optimal_parameters(capacity, fp_rate)
+        self.fp_rate = fp_rate
+        self.count = 0
+
+        self._file = open(self.tmp_path, 'w+b')
+        self._file.truncate(HEADER_SIZE + self.bits // 8)
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_WRITE)
+
+    def add_digest(self, digest):
+        data = self._mmap
+        for position in _bit_positions(digest, self.bits, self.hashes):
+            data[HEADER_SIZE + (position >> 3)] |= 1 << (position & 7)
+        self.count += 1
+
+    def add(self, password):
+        self.add_digest(password_digest(password))
+
+    def commit(self):
+        _HEADER.pack_into(self._mmap, 0, MAGIC, FORMAT_VERSION, self.hashes, self.bits, self.count, self.fp_rate)
+        self._mmap.flush()
+        self._mmap.close()
+        self._file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        self._mmap.close()
+        self._file.close()
+        os.unlink(self.tmp_path)
+
+
+_filters = {}
+_filters_lock = threading.Lock()
+
+
+def get_filter(path):
+    """
+    Shared filter for a path, reopened when the file is rebuilt.
+
+    Returns:
+        BreachedPasswordFilter: The filter, or None if the file is missing
+                                or invalid
+    """
+    now = time.monotonic()
+    entry = _filters.get(path)
+    if entry and now - entry[1] < RELOAD_CHECK_INTERVAL:
+        return entry[0]
+
+    with _filters_lock:
+        entry = _filters.get(path)
+        if entry and now - entry[1] < RELOAD_CHECK_INTERVAL:
+            return entry[0]
+        current = entry[0] if entry else None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            _filters[path] = (None, now)
+            return None
+
+        if current is None or current.signature != (stat.st_ino, stat.st_mtime_ns, stat.st_size):
+            try:
+                current = BreachedPasswordFilter(path)
+                _logger.info(f"Loaded breached password filter {path}: {current.count} passwords, "
+                             f"{current.bits // 8 // 1024} KiB, false-positive rate {current.fp_rate}")
+            except (OSError, ValueError) as e:
+                _logger.error(f"Could not load breached password filter {path}: {str(e)}")
+                current = None
+        # A replaced filter is left to the garbage collector: lookups in other
+        # threads may still be reading it
+        _filters[path] = (current, now)
+        return current
+
+
+def _iter_digests(input_file, input_format):
+    """
+    Digests of the entries of a password list.
+
+    ``sha1`` lines are hexadecimal SHA-1 digests optionally followed by
+    ``:count``; ``plain`` lines are passwords; ``auto`` decides per line.
+    """
+    for raw_line in input_file:
+        line = raw_line.rstrip(b'\r\n')
+        if not line:
+            continue
+        if input_format != 'plain':
+            candidate = line.split(b':', 1)[0]
+            if len(candidate) == 40:
+                try:
+                    yield bytes.fromhex(candidate.decode('ascii'))
+                    continue
+                except ValueError:
+                    pass
+            if input_format == 'sha1':
+                continue
+        yield hashlib.sha1(line).digest()
+
+
+def build(input_path, output_path, fp_rate, capacity=None, input_format='auto'):
+    """
+    Build a filter file from a password list.
+
+    Returns:
+        BreachedPasswordFilterBuilder: The committed builder, for its statistics
+    """
+    if capacity is None:
+        with open(input_path, 'rb') as input_file:
+            capacity = sum(1 for line in input_file if line.strip())
+
+    builder = BreachedPasswordFilterBuilder(output_path, capacity, fp_rate)
+    try:
+        with open(input_path, 'rb') as input_file:
+            for digest in _iter_digests(input_file, input_format):
+                builder.add_digest(digest)
+    except BaseException:
+        builder.abort()
+        raise
+    builder.commit()
+    return builder
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='Build a filter from a password list')
+    build_parser.add_argument('--input', required=True, help='Password list: plain text or SHA-1[:count] lines')
+    build_parser.add_argument('--output', required=True, help='Filter file to write')
+    build_parser.add_argument('--fp-rate', type=float, default=0.001, help='Target false-positive rate')
+    build_parser.add_argument('--capacity', type=int, help='Expected entries; counted from the input if omitted')
+    build_parser.add_argument('--format', choices=['auto', 'plain', 'sha1'], default='auto', dest='input_format')
+
+    check_parser = subparsers.add_parser('check', help='Look up passwords in a filter')
+    check_parser.add_argument('filter', help='Filter file')
+    check_parser.add_argument('passwords', nargs='+')
+
+    args = parser.parse_args(argv)
+    if args.command == 'build':
+        started = time.perf_counter()
+        builder = build(args.input, args.output, args.fp_rate, args.capacity, args.input_format)
+        print(f"Wrote {args.output}: {builder.count} passwords, {builder.bits // 8} bytes, "
+              f"{builder.hashes} hashes, in {time.perf_counter() - started:.1f}s")
+        return 0
+
+    bloom = BreachedPasswordFilter(args.filter)
+    breached = False
+    for password in args.passwords:
+        found = password in bloom
+        breached |= found
+        print(f"{password}: {'breached' if found else 'not found'}")
+    return 1 if breached else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
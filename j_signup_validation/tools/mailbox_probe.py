@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+SMTP Mailbox Prober
+Checks mailbox deliverability for batches of addresses with RCPT TO probes,
+reusing one SMTP session per MX host for many addresses and bounding the
+number of concurrent sessions per host.
+"""
+
+import logging
+import smtplib
+import socket
+import threading
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import dns.resolver
+    DNS_AVAILABLE = True
+except ImportError:
+    DNS_AVAILABLE = False
+    dns = None
+
+try:
+    from verify_email import verify_email
+except ImportError:
+    verify_email = None
+
+_logger = logging.getLogger(__name__)
+
+STATUS_DELIVERABLE = 'deliverable'
+STATUS_UNDELIVERABLE = 'undeliverable'
+STATUS_CATCH_ALL = 'catch_all'
+STATUS_UNKNOWN = 'unknown'
+
+# RCPT replies meaning the mailbox does not exist; 4xx replies (greylisting,
+# throttling) are inconclusive and reported as unknown
+_REJECT_CODES = {550, 551, 553}
+
+
+class MailboxProber:
+    """
+    Batch mailbox verification over SMTP.
+
+    Addresses are grouped by the MX host of their domain. Each host gets at
+    most ``per_host_limit`` concurrent sessions, and each session checks up
+    to ``batch_per_connection`` addresses before quitting. A random address
+    is probed once per domain to detect catch-all servers, which accept
+    every recipient and so cannot confirm a mailbox.
+
+    Args:
+        helo_host (str): Host name announced in EHLO
+        from_address (str): Envelope sender used for MAIL FROM
+        port (int): SMTP port of the MX hosts
+        timeout (float): Socket timeout per SMTP command, in seconds
+        max_workers (int): Total concurrent SMTP sessions
+        per_host_limit (int): Concurrent SMTP sessions per MX host
+        batch_per_connection (int): Addresses checked per SMTP session
+        mx_override (str): ``host[:port]`` receiving every probe instead of
+            the real MX hosts (local stand-ins, relays)
+    """
+
+    def __init__(self, helo_host, from_address, port=25, timeout=10.0, max_workers=8,
+                 per_host_limit=2, batch_per_connection=20, mx_override=None):
+        self.helo_host = helo_host
+        self.from_address = from_address
+        self.port = port
+        self.timeout = timeout
+        self.max_workers = max(1, max_workers)
+        self.per_host_limit = max(1, per_host_limit)
+        self.batch_per_connection = max(1, batch_per_connection)
+        self.mx_override = self._parse_host(mx_override, port) if mx_override else None
+
+        self._host_semaphores = defaultdict(lambda: threading.Semaphore(self.per_host_limit))
+        self._semaphores_lock = threading.Lock()
+        self._catch_all = {}
+        self._catch_all_lock = threading.Lock()
+        self.connections = 0
+
+    @staticmethod
+    def _parse_host(value, default_port):
+        host, _sep, port = value.strip().partition(':')
+        return host, int(port) if port else default_port
+
+    def probe(self, emails):
+        """
+        Check a batch of addresses.
+
+        Args:
+            emails (list): Email addresses
+
+        Returns:
+            dict: email -> (status, detail) with status one of the
+                  ``STATUS_*`` constants and detail the SMTP reply or error
+        """
+        results = {}
+        by_domain = defaultdict(list)
+        for email in emails:
+            if '@' not in email:
+                results[email] = (STATUS_UNDELIVERABLE, 'invalid address')
+                continue
+            by_domain[email.rsplit('@', 1)[1].lower()].append(email)
+
+        if not DNS_AVAILABLE and not self.mx_override and verify_email:
+            # No resolver to group by MX host: one verify_email session per address
+            for addresses in by_domain.values():
+                for email in addresses:
+                    results[email] = self._probe_with_verify_email(email)
+            return results
+
+        # Group domains by MX host so a session serves every domain it hosts
+        by_host = defaultdict(lambda: defaultdict(list))
+        for domain, addresses in by_domain.items():
+            host, detail = self._resolve_mx(domain)
+            if host is None:
+                for email in addresses:
+                    results[email] = detail
+                continue
+            by_host[host][domain].extend(addresses)
+
+        tasks = []
+        for host, domains in by_host.items():
+            chunk = []
+            for domain, addresses in domains.items():
+                for email in addresses:
+                    chunk.append((domain, email))
+                    if len(chunk) >= self.batch_per_connection:
+                        tasks.append((host, chunk))
+                        chunk = []
+            if chunk:
+                tasks.append((host, chunk))
+
+        if tasks:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tasks)),
+                                    thread_name_prefix='mailbox_probe') as executor:
+                for chunk_results in executor.map(lambda task: self._probe_host(*task), tasks):
+                    results.update(chunk_results)
+        return results
+
+    def _resolve_mx(self, domain):
+        """
+        Returns:
+            tuple: ((host, port), None) or (None, (status, detail))
+        """
+        if self.mx_override:
+            return self.mx_override, None
+        if not DNS_AVAILABLE:
+            return None, (STATUS_UNKNOWN, 'dnspython not available')
+        try:
+            answers = sorted(dns.resolver.resolve(domain, 'MX'), key=lambda mx: mx.preference)
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+            return None, (STATUS_UNDELIVERABLE, 'no MX record')
+        except Exception as e:
+            return None, (STATUS_UNKNOWN, f'MX lookup failed: {str(e) or type(e).__name__}')
+        for mx in answers:
+            host = str(mx.exchange).rstrip('.')
+            if host and host not in ('localhost', '0.0.0.0'):
+                return (host, self.port), None
+        return None, (STATUS_UNDELIVERABLE, 'null MX')
+
+    def _host_semaphore(self, host):
+        with self._semaphores_lock:
+            return self._host_semaphores[host]
+
+    def _probe_host(self, host, chunk):
+        """
+        Check a chunk of (domain, email) pairs over one SMTP session.
+
+        Returns:
+            dict: email -> (status, detail)
+        """
+        results = {}
+        with self._host_semaphore(host):
+            try:
+                smtp = smtplib.SMTP(host[0], host[1], local_hostname=self.helo_host, timeout=self.timeout)
+            except (OSError, smtplib.SMTPException) as e:
+                detail = f'connection to {host[0]}:{host[1]} failed: {str(e) or type(e).__name__}'
+                return {email: (STATUS_UNKNOWN, detail) for _domain, email in chunk}
+
+            with self._semaphores_lock:
+                self.connections += 1
+            try:
+                smtp.ehlo_or_helo_if_needed()
+                current_domain = None
+                for domain, email in chunk:
+                    if domain != current_domain:
+                        if current_domain is not None:
+                            smtp.rset()
+                        current_domain = domain
+                        code, reply = smtp.mail(self.from_address)
+                        if code != 250:
+                            raise smtplib.SMTPSenderRefused(code, reply, self.from_address)
+                        catch_all = self._check_catch_all(smtp, domain)
+                    if catch_all:
+                        results[email] = (STATUS_CATCH_ALL, 'domain accepts any recipient')
+                        continue
+                    code, reply = smtp.rcpt(email)
+                    results[email] = (self._status_for(code), f'{code} {self._text(reply)}')
+                smtp.quit()
+            except (OSError, smtplib.SMTPException, socket.timeout) as e:
+                detail = f'SMTP session with {host[0]} failed: {str(e) or type(e).__name__}'
+                for _domain, email in chunk:
+                    results.setdefault(email, (STATUS_UNKNOWN, detail))
+                try:
+                    smtp.close()
+                except Exception:
+                    pass
+        return results
+
+    def _check_catch_all(self, smtp, domain):
+        """
+        Probe a random recipient once per domain; an accepting server is a
+        catch-all. Must be called inside an open mail transaction.
+        """
+        with self._catch_all_lock:
+            if domain in self._catch_all:
+                return self._catch_all[domain]
+        code, _reply = smtp.rcpt(f'probe-{uuid.uuid4().hex[:12]}@{domain}')
+        catch_all = code in (250, 251)
+        with self._catch_all_lock:
+            self._catch_all[domain] = catch_all
+        return catch_all
+
+    @staticmethod
+    def _status_for(code):
+        if code in (250, 251):
+            return STATUS_DELIVERABLE
+        if code in _REJECT_CODES:
+            return STATUS_UNDELIVERABLE
+        return STATUS_UNKNOWN
+
+    @staticmethod
+    def _text(reply):
+        return reply.decode(errors='replace') if isinstance(reply, bytes) else str(reply)
+
+    def _probe_with_verify_email(self, email):
+        try:
+            deliverable = verify_email(email)
+        except Exception as e:
+            return STATUS_UNKNOWN, f'verify_email failed: {str(e) or type(e).__name__}'
+        if deliverable:
+            return STATUS_DELIVERABLE, 'verify_email'
+        return (STATUS_UNKNOWN if deliverable is None else STATUS_UNDELIVERABLE), 'verify_email'
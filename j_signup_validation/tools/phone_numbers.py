@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+Phone Number Normalization
+E.164 form of registration phone numbers, used as the indexed key for
+duplicate detection whatever format the number was typed in.
+"""
+
+import re
+
+try:
+    import phonenumbers
+except ImportError:
+    phonenumbers = None
+
+
+def normalize_e164(phone, region=None, phone_code=None):
+    """
+    E.164 form of a phone number ("+966501234567").
+
+    Args:
+        phone (str): Number as typed, international or national format
+        region (str): ISO code of the country the number was entered for
+        phone_code (int): Calling code of that country, used without the
+            phonenumbers library to complete national numbers
+
+    Returns:
+        str: The E.164 number, or False if it cannot be normalized
+    """
+    if not phone or not phone.strip():
+        return False
+
+    if phonenumbers:
+        try:
+            parsed = phonenumbers.parse(phone, region or None)
+        except phonenumbers.NumberParseException:
+            return False
+        if not phonenumbers.is_possible_number(parsed):
+            return False
+        return phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
+
+    # Without the library: international prefix or calling code plus the
+    # national number stripped of its trunk prefix
+    compact = phone.strip()
+    digits = re.sub(r'\D', '', compact)
+    if compact.startswith('+'):
+        pass
+    elif compact.startswith('00'):
+        digits = digits[2:]
+    elif phone_code:
+        digits = f"{phone_code}{digits.lstrip('0')}"
+    else:
+        return False
+    return f'+{digits}' if 8 <= len(digits) <= 15 else False
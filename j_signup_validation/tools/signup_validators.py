@@ -0,0 +1,650 @@
+# -*- coding: utf-8 -*-
+"""
+Signup Validators
+Email, phone and dynamic field validation independent of the HTTP request:
+settings and database lookups are passed in explicitly and results are
+typed, picklable objects, so the same checks serve the signup controllers,
+scheduled actions, process pools and scripts.
+
+Messages are translated in the language of the calling request when there
+is one, and left in English otherwise.
+"""
+
+import json
+import logging
+import re
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from .phone_numbers import normalize_e164
+
+try:
+    from odoo.tools.translate import _, _lt
+except ImportError:
+    def _(source, *args):
+        return source % args if args else source
+    _lt = _
+
+# External validation libraries
+try:
+    from disposable_email_validator import is_disposable_email
+except ImportError:
+    is_disposable_email = None
+
+try:
+    import phonenumbers
+except ImportError:
+    phonenumbers = None
+
+try:
+    import dns.resolver
+    DNS_AVAILABLE = True
+except ImportError:
+    DNS_AVAILABLE = False
+    dns = None
+
+_logger = logging.getLogger(__name__)
+
+# Default TempMailDetector endpoint, overridable through the
+# j_signup_validation.temp_mail_api_url parameter (e.g. for local stand-ins)
+TEMP_MAIL_API_URL = "https://api.tempmaildetector.com/check"
+
+# Network-bound checks (DNS, TempMailDetector) run concurrently on a small
+# per-process pool; the overall wait for them is bounded
+VALIDATION_WORKERS = 8
+EMAIL_CHECK_TIMEOUT = 15
+
+EMAIL_REGEX = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+PARKED_DOMAINS = ('foo.com', 'bar.com', 'test.com', 'example.com', 'temp.com')
+INVALID_MX_HOSTS = ('0.0.0.0', 'localhost', '127.0.0.1', '')
+
+# Phone country as the validators read it; res.country records fit as well
+PhoneCountry = namedtuple('PhoneCountry', 'id code phone_code name')
+
+_validation_executor = None
+
+
+def submit_check(func, *args):
+    """
+    Run a database-free validation check on the shared executor.
+    The pool is created on first use so it never crosses a worker fork.
+    """
+    global _validation_executor
+    if _validation_executor is None:
+        _validation_executor = ThreadPoolExecutor(
+            max_workers=VALIDATION_WORKERS, thread_name_prefix='signup_validation')
+    return _validation_executor.submit(func, *args)
+
+
+@dataclass(frozen=True)
+class EmailSettings:
+    """
+    Email validation settings, from ``get_email_validation_rules()`` and the
+    disposable email detection parameters.
+    """
+    syntax_check: bool = True
+    mx_verification: bool = True
+    disposable_check: bool = True
+    detection_method: str = 'library'
+    api_key: str = ''
+    api_url: str = TEMP_MAIL_API_URL
+    # Lowercase domains whose addresses skip the network checks
+    trusted_domains: frozenset = frozenset()
+
+    @classmethod
+    def from_rules(cls, rules, disposable_settings=None, trusted_domains=None):
+        disposable_settings = disposable_settings or {}
+        return cls(
+            syntax_check=rules.get('syntax_check', True),
+            mx_verification=rules.get('mx_verification', True),
+            disposable_check=rules.get('disposable_check', True),
+            detection_method=disposable_settings.get('method') or 'library',
+            api_key=disposable_settings.get('api_key') or '',
+            api_url=disposable_settings.get('api_url') or TEMP_MAIL_API_URL,
+            trusted_domains=trusted_domains or frozenset(),
+        )
+
+
+@dataclass(frozen=True)
+class PhoneSettings:
+    """
+    Phone validation settings, from ``get_phone_validation_rules()``.
+    """
+    validation_enabled: bool = True
+    require_mobile: bool = False
+    unique: bool = False
+
+    @classmethod
+    def from_rules(cls, rules):
+        return cls(
+            validation_enabled=rules.get('validation_enabled', True),
+            require_mobile=rules.get('require_mobile', False),
+            unique=rules.get('unique', False),
+        )
+
+
+@dataclass(frozen=True)
+class CheckResult:
+    """
+    Outcome of a single network check. Messages may be lazy translations
+    until the check is collected.
+    """
+    valid: bool
+    messages: tuple = ()
+
+
+@dataclass(frozen=True)
+class EmailResult:
+    email: str
+    valid: bool
+    messages: tuple = ()
+
+    def as_dict(self):
+        return {'valid': self.valid, 'messages': list(self.messages)}
+
+
+@dataclass(frozen=True)
+class PhoneResult:
+    phone: str
+    valid: bool
+    messages: tuple = ()
+    formatted: str = None
+    phone_type: str = None
+    e164: str = False
+
+    def as_dict(self):
+        return {
+            'valid': self.valid,
+            'messages': list(self.messages),
+            'formatted': self.formatted,
+            'phone_type': self.phone_type,
+            'e164': self.e164,
+        }
+
+
+def email_domain(email):
+    return email.rsplit('@', 1)[1].lower() if '@' in email else ''
+
+
+def email_domain_trusted(email, settings):
+    """
+    Whether the domain of an email is allowlisted, skipping the MX and
+    disposable email checks.
+    """
+    return bool(settings.trusted_domains) and email_domain(email) in settings.trusted_domains
+
+
+def email_syntax_valid(email, settings):
+    """
+    Basic syntax check, when enabled in the settings.
+    """
+    if not settings.syntax_check:
+        return True
+    return bool(EMAIL_REGEX.match(email))
+
+
+def check_email_domain(domain):
+    """
+    MX record verification and domain existence check.
+    Pure network check, safe to run on any thread.
+
+    Returns:
+        CheckResult: Result with lazily translated messages
+    """
+    domain_valid = False
+
+    # First try DNS resolution
+    if DNS_AVAILABLE:
+        try:
+            # Try MX record first, pointing to valid mail servers
+            mx_records = dns.resolver.resolve(domain, 'MX')
+            valid_mx = False
+            for mx in mx_records:
+                mx_host = str(mx.exchange).rstrip('.')
+                # Reject invalid/parked domain indicators
+                if mx_host not in INVALID_MX_HOSTS and not mx_host.startswith('0.'):
+                    valid_mx = True
+                    break
+
+            if not valid_mx:
+                return CheckResult(False, (_lt('Email domain does not accept emails'),))
+            domain_valid = True
+
+        except dns.resolver.NXDOMAIN:
+            return CheckResult(False, (_lt('Email domain does not exist'),))
+        except dns.resolver.NoAnswer:
+            try:
+                # If MX fails, try A record: the domain exists but has no
+                # mail service, still rejected for email registration
+                dns.resolver.resolve(domain, 'A')
+                return CheckResult(False, (_lt('Email domain does not support email delivery'),))
+            except dns.resolver.NXDOMAIN:
+                return CheckResult(False, (_lt('Email domain does not exist'),))
+            except Exception:
+                pass
+        except Exception as e:
+            _logger.warning(f"DNS check failed for {domain}: {str(e)}")
+    else:
+        _logger.warning("dnspython not available for DNS verification")
+
+    if not domain_valid:
+        # Basic domain structure validation as fallback
+        domain_parts = domain.split('.')
+        if len(domain_parts) < 2 or len(domain_parts[-1]) < 2:
+            return CheckResult(False, (_lt('Email domain appears to be invalid'),))
+
+        # For common parked/invalid domains, reject them
+        if domain.lower() in PARKED_DOMAINS:
+            return CheckResult(False, (_lt('Email domain does not accept emails'),))
+
+    return CheckResult(True)
+
+
+def check_disposable_email(email, settings):
+    """
+    Check if an email is disposable with the configured method (library or
+    API). Both methods only look at the domain of the address.
+
+    Returns:
+        CheckResult: Result with lazily translated messages
+    """
+    try:
+        if settings.detection_method == 'api':
+            if not settings.api_key:
+                _logger.warning("TempMailDetector API key not configured, falling back to library method")
+                return check_disposable_email_library(email)
+            return check_disposable_email_api(email, settings.api_key, settings.api_url)
+        return check_disposable_email_library(email)
+
+    except Exception as e:
+        _logger.warning(f"Disposable email check failed for {email}: {str(e)}")
+        # If both methods fail, allow the email (don't block legitimate users)
+        return CheckResult(True)
+
+
+def check_disposable_email_library(email):
+    """
+    Check disposable email using disposable_email_validator library.
+    """
+    try:
+        if is_disposable_email(email):
+            return CheckResult(False, (_lt('Temporary or disposable email addresses are not allowed'),))
+    except Exception as e:
+        _logger.warning(f"Library disposable email check failed for {email}: {str(e)}")
+    return CheckResult(True)
+
+
+def check_disposable_email_api(email, api_key, api_url=TEMP_MAIL_API_URL):
+    """
+    Check disposable email using TempMailDetector API, falling back to the
+    library on any API failure.
+    """
+    import requests
+
+    domain = email_domain(email)
+    try:
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": api_key,
+        }
+        response = requests.post(api_url, data=json.dumps({"domain": domain}), headers=headers, timeout=10)
+
+        if response.status_code != 200:
+            _logger.warning(f"TempMailDetector API returned {response.status_code}: {response.text}")
+            return check_disposable_email_library(email)
+
+        response_data = response.json()
+        _logger.info(f'TempMailDetector response for {domain}: {response_data}')
+
+        # Block if domain is in block list or has high suspicion score
+        meta = response_data.get('meta', {})
+        score = response_data.get('score', 0)
+        if meta.get('block_list', False) or score >= 90:
+            return CheckResult(False, (_lt('Temporary or disposable email addresses are not allowed'),))
+
+    except requests.exceptions.Timeout:
+        _logger.warning(f"TempMailDetector API timeout for {domain}")
+        return check_disposable_email_library(email)
+    except Exception as e:
+        _logger.warning(f"TempMailDetector API check failed for {domain}: {str(e)}")
+        return check_disposable_email_library(email)
+
+    return CheckResult(True)
+
+
+def start_email_checks(email, settings, submit=submit_check):
+    """
+    Submit the network-bound checks of an email.
+
+    Args:
+        submit (callable): Runs a check asynchronously, returning a future;
+            defaults to the shared validation executor
+
+    Returns:
+        list: (check name, future) tuples in merge order
+    """
+    pending = []
+    if not email_syntax_valid(email, settings) or email_domain_trusted(email, settings):
+        # Nothing worth a network round-trip
+        return pending
+    domain = email_domain(email)
+
+    if settings.mx_verification and domain:
+        pending.append(('mx', submit(check_email_domain, domain)))
+    if settings.disposable_check:
+        pending.append(('disposable', submit(check_disposable_email, email, settings)))
+    return pending
+
+
+def collect_email_checks(email, pending, timeout=EMAIL_CHECK_TIMEOUT):
+    """
+    Wait for the checks started by ``start_email_checks`` and merge their
+    results in submission order, so messages are deterministic whatever the
+    completion order. A check that fails or times out lets the email
+    through. Messages are translated here, on the calling thread.
+
+    Returns:
+        CheckResult: Result with translated messages
+    """
+    deadline = time.monotonic() + timeout
+    failed = None
+    for name, future in pending:
+        try:
+            result = future.result(timeout=max(0, deadline - time.monotonic()))
+        except Exception as e:
+            _logger.warning(f"Email {name} check failed for {email}: {str(e) or type(e).__name__}")
+            continue
+        if not result.valid:
+            failed = result
+            break
+
+    if failed:
+        for _name, future in pending:
+            future.cancel()
+        return CheckResult(False, tuple(str(message) for message in failed.messages))
+    return CheckResult(True)
+
+
+def validate_email(email, settings, email_registered=None, pending=None, timeout=EMAIL_CHECK_TIMEOUT):
+    """
+    Validate an email address.
+
+    Args:
+        email (str): Normalized email address
+        settings (EmailSettings): Validation settings
+        email_registered (callable): Duplicate lookup taking the email;
+            no duplicate check without it
+        pending (list): Checks already started with ``start_email_checks``
+
+    Returns:
+        EmailResult: Validation result
+    """
+    if not email_syntax_valid(email, settings):
+        return EmailResult(email, False, (_('Invalid email address format'),))
+
+    # MX record verification and disposable email check, run concurrently
+    if pending is None:
+        pending = start_email_checks(email, settings)
+    network_result = collect_email_checks(email, pending, timeout)
+    if not network_result.valid:
+        return EmailResult(email, False, network_result.messages)
+
+    if email_registered is not None and email_registered(email):
+        return EmailResult(email, False, (_('An account with this email address already exists'),))
+    return EmailResult(email, True)
+
+
+def validate_emails(emails, settings, registered_emails=None, max_workers=VALIDATION_WORKERS,
+                    timeout=EMAIL_CHECK_TIMEOUT):
+    """
+    Validate a batch of email addresses.
+    The network checks run once per distinct domain on a pool of
+    ``max_workers`` threads, and duplicates are looked up in one call.
+
+    Args:
+        emails (iterable): Normalized email addresses
+        settings (EmailSettings): Validation settings
+        registered_emails (callable): Takes a list of emails and returns the
+            already registered ones; no duplicate check without it
+        timeout (int): Seconds each domain's checks are waited for
+
+    Returns:
+        list: EmailResult per email, in input order
+    """
+    emails = list(emails)
+    well_formed = [email for email in emails if email_syntax_valid(email, settings)]
+
+    # One representative address per untrusted domain for the network checks
+    representatives = {}
+    for email in well_formed:
+        if not email_domain_trusted(email, settings):
+            representatives.setdefault(email_domain(email), email)
+
+    domain_results = {}
+    if representatives and (settings.mx_verification or settings.disposable_check):
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='signup_validation_batch') as pool:
+            pending = {
+                domain: start_email_checks(email, settings, pool.submit)
+                for domain, email in representatives.items()
+            }
+            domain_results = {
+                domain: collect_email_checks(domain, checks, timeout)
+                for domain, checks in pending.items()
+            }
+
+    candidates = [email for email in well_formed
+                  if domain_results.get(email_domain(email), CheckResult(True)).valid]
+    registered = set(registered_emails(candidates)) if registered_emails and candidates else set()
+
+    invalid_format = (_('Invalid email address format'),)
+    already_exists = (_('An account with this email address already exists'),)
+    results = []
+    for email in emails:
+        if not email_syntax_valid(email, settings):
+            results.append(EmailResult(email, False, invalid_format))
+            continue
+        network_result = domain_results.get(email_domain(email), CheckResult(True))
+        if not network_result.valid:
+            results.append(EmailResult(email, False, network_result.messages))
+        elif email in registered:
+            results.append(EmailResult(email, False, already_exists))
+        else:
+            results.append(EmailResult(email, True))
+    return results
+
+
+def normalize_phone(phone, country=None):
+    """
+    E.164 form of a phone number for a country, as stored in
+    saas.user.su_phone_e164.
+    """
+    if not country:
+        return normalize_e164(phone)
+    return normalize_e164(phone, country.code or None, country.phone_code or None)
+
+
+def validate_phone(phone, settings, country=None):
+    """
+    Validate a phone number against the selected country.
+    Enforces strict country matching and determines the phone type for
+    proper field assignment.
+
+    Args:
+        phone (str): Number as typed
+        settings (PhoneSettings): Validation settings
+        country: PhoneCountry or res.country record of the selected country
+
+    Returns:
+        PhoneResult: Validation result
+    """
+    if not settings.validation_enabled:
+        return PhoneResult(phone, True, formatted=phone, phone_type='unknown', e164=normalize_phone(phone, country))
+
+    def invalid(message, phone_type=None):
+        return PhoneResult(phone, False, (message,), formatted=phone, phone_type=phone_type)
+
+    if not phone.strip():
+        return invalid(_('Phone number is required'))
+
+    if not phonenumbers:
+        # Basic validation if phonenumbers library is not available
+        if not re.match(r'^\+?[1-9]\d{1,14}$', phone.replace(' ', '').replace('-', '')):
+            return invalid(_('Invalid phone number format'))
+        # Can't determine type without phonenumbers library
+        return PhoneResult(phone, True, formatted=phone, phone_type='unknown', e164=normalize_phone(phone, country))
+
+    phone_type = None
+    try:
+        # Country is REQUIRED for strict validation
+        country_code = country.code if country else None
+        if not country_code:
+            _logger.error(f"Country selection required for phone validation - country: {country}")
+            return invalid(_('Please select a country for phone number validation'))
+
+        # STEP 1: Parse phone number with selected country region
+        try:
+            parsed = phonenumbers.parse(phone, country_code)
+        except phonenumbers.NumberParseException as e:
+            _logger.error(f"Failed to parse phone number '{phone}' with country '{country_code}': {str(e)}")
+            return invalid(_('Invalid phone number format for %s', country.name))
+
+        # STEP 2: Validate the parsed number
+        if not phonenumbers.is_valid_number(parsed):
+            _logger.error(f"Phone number '{phone}' is not valid")
+            return invalid(_('Invalid phone number'))
+
+        # STEP 3: CRITICAL - Enforce strict country matching
+        number_region = phonenumbers.region_code_for_number(parsed)
+        if number_region != country_code:
+            _logger.warning(f"COUNTRY MISMATCH: Phone number region '{number_region}' does not match selected country '{country_code}'")
+            return invalid(_('Phone number must belong to %s. The number you entered belongs to a different country.', country.name))
+
+        # STEP 4: Determine phone number type
+        num_type = phonenumbers.number_type(parsed)
+        if num_type == phonenumbers.PhoneNumberType.MOBILE:
+            phone_type = 'mobile'
+        elif num_type == phonenumbers.PhoneNumberType.FIXED_LINE:
+            phone_type = 'fixed_line'
+        elif num_type == phonenumbers.PhoneNumberType.FIXED_LINE_OR_MOBILE:
+            phone_type = 'fixed_line_or_mobile'
+        else:
+            _logger.warning(f"Phone number type not recognized: {num_type}")
+            return invalid(_('Phone number type not supported'))
+
+        # STEP 5: Check mobile requirement if configured
+        if settings.require_mobile and phone_type not in ('mobile', 'fixed_line_or_mobile'):
+            return invalid(_('Only mobile phone numbers are allowed'), phone_type)
+
+        # STEP 6: Format for storage (international format)
+        formatted_phone = phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.INTERNATIONAL)
+        e164 = phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
+        _logger.info(f"Phone validation SUCCESS: {formatted_phone} (Type: {phone_type}, Country: {country_code})")
+
+    except Exception as e:
+        _logger.error(f"Phone validation error: {str(e)}")
+        return invalid(_('Phone validation failed. Please enter a valid phone number.'), phone_type)
+
+    return PhoneResult(phone, True, formatted=formatted_phone, phone_type=phone_type, e164=e164)
+
+
+def check_phone_duplicate(e164, settings, phone_registered):
+    """
+    Reject an already registered phone number when the uniqueness policy is
+    enabled.
+
+    Args:
+        phone_registered (callable): Lookup taking the E.164 number
+
+    Returns:
+        tuple: Error messages
+    """
+    if not settings.unique or not e164:
+        return ()
+    if phone_registered(e164):
+        return (_('An account with this phone number already exists'),)
+    return ()
+
+
+def validate_phones(entries, settings, registered_phones=None):
+    """
+    Validate a batch of phone numbers. Phone checks are CPU-bound, so they
+    run on the calling thread; duplicates are looked up in one call.
+
+    Args:
+        entries (iterable): (phone, country) tuples
+        settings (PhoneSettings): Validation settings
+        registered_phones (callable): Takes a list of E.164 numbers and
+            returns the already registered ones; no duplicate check without it
+
+    Returns:
+        list: PhoneResult per entry, in input order
+    """
+    results = [validate_phone(phone, settings, country) for phone, country in entries]
+    if not (settings.unique and registered_phones):
+        return results
+
+    numbers = [result.e164 for result in results if result.valid and result.e164]
+    registered = set(registered_phones(numbers)) if numbers else set()
+    return [
+        PhoneResult(result.phone, False, check_phone_duplicate(result.e164, settings, registered.__contains__),
+                    result.formatted, result.phone_type, result.e164)
+        if result.valid and result.e164 in registered else result
+        for result in results
+    ]
+
+
+def validate_dynamic_fields(field_configs, values, raw_values=None, option_exists=None):
+    """
+    Validate required dynamic fields and the choices of selection and
+    many2one fields.
+
+    Args:
+        field_configs (list): Field dicts of ``signup.configuration.get_dynamic_fields()``
+        values (dict): Converted field values by field name
+        raw_values (dict): Submitted values by field name, telling a typed 0
+            from an empty numeric field
+        option_exists (callable): Whether a record id is a valid choice of a
+            many2one field dict, for records not among its embedded options
+
+    Returns:
+        list: Error messages
+    """
+    errors = []
+    raw_values = raw_values or {}
+    for field_config in field_configs:
+        field_name = field_config['field_name']
+        field_value = values.get(field_name)
+        if field_value and field_config['field_type'] in ('selection', 'many2one') \
+                and not _option_valid(field_config, field_value, option_exists):
+            errors.append(_('Please choose a valid option for %s', field_config['field_label']))
+            continue
+
+        if not field_config['required'] or field_config['field_type'] == 'boolean':
+            # Boolean fields are always valid (True or False)
+            continue
+
+        if field_config['field_type'] in ('integer', 'float') and field_value == 0:
+            # 0 is a value when it was typed, the empty default otherwise
+            missing = not str(raw_values.get(field_name) or '').strip()
+        elif field_config['field_type'] == 'binary':
+            missing = not field_value
+        else:
+            missing = not field_value or (isinstance(field_value, str) and not field_value.strip())
+        if missing:
+            errors.append(_('%s is required', field_config['field_label']))
+    return errors
+
+
+def _option_valid(field_config, value, option_exists=None):
+    """
+    Whether a submitted value is one of the options of a selection or
+    many2one field dict.
+    """
+    if field_config['field_type'] == 'selection':
+        return value in {str(option_value) for option_value, _label in field_config.get('options', ())}
+    if any(option_value == value for option_value, _label in field_config.get('options', ())):
+        return True
+    # Served by the typeahead, or added since the options were cached
+    return bool(option_exists and option_exists(field_config, value))
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Signup Validation Pipeline
+Runs registered validation steps cheapest first and stops paying for
+expensive checks once a submission is already rejected.
+"""
+
+import logging
+import time
+from concurrent.futures import Future
+
+_logger = logging.getLogger(__name__)
+
+# Cost classes, in execution order
+COST_FREE = 0       # Pure checks on the submitted values
+COST_DATABASE = 10  # Indexed database lookups
+COST_CPU = 20       # Parsing or heavier local computation
+COST_NETWORK = 30   # DNS queries, third-party APIs
+
+# Step outcomes
+PASSED = 'passed'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+
+class ValidationStep:
+    """
+    A single validation check.
+
+    The function receives the ``ValidationContext`` and returns a list of
+    error messages, empty when the check passes. A ``parallel`` step may
+    return a ``concurrent.futures.Future`` resolving to that list instead;
+    parallel steps are started before the other costly steps so their
+    waiting overlaps with them, and they must not use the ORM off the
+    request thread.
+    """
+
+    __slots__ = ('name', 'func', 'cost', 'depends', 'sequence', 'parallel')
+
+    def __init__(self, name, func, cost=COST_FREE, depends=(), sequence=100, parallel=False):
+        """
+        Args:
+            name (str): Unique step name, used by dependencies
+            func (callable): Check to run, ``func(context) -> list``
+            cost (int): Cost class, one of the ``COST_*`` constants
+            depends (tuple): Names of steps that must pass first
+            sequence (int): Position of the step's messages in the error list
+            parallel (bool): Whether ``func`` may return a future
+        """
+        self.name = name
+        self.func = func
+        self.cost = cost
+        self.depends = tuple(depends)
+        self.sequence = sequence
+        self.parallel = parallel
+
+    def __repr__(self):
+        return f"ValidationStep({self.name!r}, cost={self.cost})"
+
+
+class ValidationContext:
+    """
+    State shared by the steps of one pipeline run.
+    """
+
+    def __init__(self, form_data, **state):
+        self.form_data = form_data
+        self.state = state
+        self.outcomes = {}
+        self.messages = {}
+        self.timings = {}
+
+    @property
+    def rejected(self):
+        return FAILED in self.outcomes.values()
+
+    def passed(self, *names):
+        """
+        Returns:
+            bool: True if all the named steps ran and passed
+        """
+        return all(self.outcomes.get(name) == PASSED for name in names)
+
+    def errors(self, steps):
+        """
+        Error messages of all failed steps, in step sequence order.
+
+        Returns:
+            list: Messages rendered as strings
+        """
+        errors = []
+        for step in sorted(steps, key=lambda s: s.sequence):
+            errors.extend(str(message) for message in self.messages.get(step.name, []))
+        return errors
+
+
+class ValidationPipeline:
+    """
+    Orders steps by cost and dependencies and runs them with short-circuiting.
+    """
+
+    def __init__(self, steps):
+        self.steps = list(steps)
+        self.ordered = self._order(self.steps)
+
+    @staticmethod
+    def _order(steps):
+        """
+        Topological order of the steps, cheapest first among the runnable
+        ones, registration order breaking ties.
+        """
+        by_name = {}
+        for step in steps:
+            if step.name in by_name:
+                raise ValueError(f"Duplicate validation step {step.name!r}")
+            by_name[step.name] = step
+        for step in steps:
+            missing = [dep for dep in step.depends if dep not in by_name]
+            if missing:
+                raise ValueError(f"Validation step {step.name!r} depends on unknown steps {missing}")
+
+        ordered, done = [], set()
+        remaining = list(steps)
+        while remaining:
+            ready = [step for step in remaining if all(dep in done for dep in step.depends)]
+            if not ready:
+                raise ValueError(f"Circular dependencies between validation steps {remaining}")
+            step = min(ready, key=lambda s: max([s.cost] + [by_name[d].cost for d in s.depends]))
+            ordered.append(step)
+            done.add(step.name)
+            remaining.remove(step)
+        return ordered
+
+    def run(self, context, report_all=False, timeout=None):
+        """
+        Run the steps against a context.
+
+        Once a step fails, further steps above ``COST_FREE`` are skipped
+        unless ``report_all`` is set, so rejected submissions cost little.
+        Steps whose dependencies did not pass are always skipped; a step
+        depending on a parallel step waits for its outcome first.
+
+        Args:
+            context (ValidationContext): State of this run
+            report_all (bool): Run every runnable step to report all errors
+            timeout (float): Overall wait for parallel steps, in seconds
+
+        Returns:
+            ValidationContext: The context, with outcomes and messages
+        """
+        pending = []
+        deadline = []
+
+        def collect(items):
+            # The overall wait starts with the first wait for a parallel step
+            if timeout is not None and not deadline:
+                deadline.append(time.monotonic() + timeout)
+            self._collect(items, context, report_all, deadline[0] if deadline else None)
+
+        def await_dependencies(step):
+            # Outcomes of parallel steps are only known once collected
+            awaited = [item for item in pending if item[0].name in step.depends]
+            for item in awaited:
+                pending.remove(item)
+            if awaited:
+                collect(awaited)
+
+        parallel_started = False
+        for step in self.ordered:
+            if step.cost > COST_FREE and not parallel_started:
+                # Entering the costly steps: launch the parallel ones first
+                parallel_started = True
+                if report_all or not context.rejected:
+                    for parallel_step in self.ordered:
+                        if not parallel_step.parallel:
+                            continue
+                        await_dependencies(parallel_step)
+                        if self._runnable(parallel_step, context, report_all):
+                            result = self._call(parallel_step, context)
+                            if isinstance(result, Future):
+                                pending.append((parallel_step, result))
+                            else:
+                                self._record(parallel_step, context, result)
+
+            if step.name in context.outcomes or any(step is p for p, _f in pending):
+                continue
+            await_dependencies(step)
+            if not self._runnable(step, context, report_all):
+                context.outcomes[step.name] = SKIPPED
+                continue
+            result = self._call(step, context)
+            if isinstance(result, Future):
+                pending.append((step, result))
+            else:
+                self._record(step, context, result)
+
+        collect(pending)
+        return context
+
+    def _runnable(self, step, context, report_all):
+        if not context.passed(*step.depends):
+            return False
+        return report_all or step.cost == COST_FREE or not context.rejected
+
+    def _call(self, step, context):
+        started = time.perf_counter()
+        try:
+            return step.func(context)
+        finally:
+            context.timings[step.name] = time.perf_counter() - started
+
+    def _record(self, step, context, messages):
+        messages = list(messages or [])
+        context.messages[step.name] = messages
+        context.outcomes[step.name] = FAILED if messages else PASSED
+
+    def _collect(self, pending, context, report_all, deadline=None):
+        """
+        Wait for the parallel steps in cost order, until the monotonic
+        ``deadline`` if given. A step that raises or does not answer in
+        time is counted as passed, so an unavailable third-party service
+        never blocks a signup.
+        """
+        for step, future in sorted(pending, key=lambda item: item[0].cost):
+            if context.rejected and not report_all:
+                future.cancel()
+                context.outcomes[step.name] = SKIPPED
+                continue
+            try:
+                wait = max(0, deadline - time.monotonic()) if deadline is not None else None
+                self._record(step, context, future.result(timeout=wait))
+            except Exception as e:
+                _logger.warning(f"Validation step {step.name} did not complete: {str(e) or type(e).__name__}")
+                self._record(step, context, [])
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Signed Validation Verdicts
+Short-lived HMAC-signed tokens carrying the positive verdict of an AJAX
+validator to the signup submission, which can then skip repeating the
+check. Signing only needs the database secret, so tokens can be issued
+without an Odoo environment.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+# Lifetime of the signed verdicts returned by the AJAX validators
+VALIDATION_TOKEN_TTL = 15 * 60
+VALIDATION_TOKEN_SCOPE = 'j_signup_validation.validation_token'
+
+
+def token_signature(secret, body):
+    """
+    Signature of a token body, built like odoo.tools.misc.hmac with the
+    database secret and the token scope.
+    """
+    message = repr((VALIDATION_TOKEN_SCOPE, body))
+    return hmac.new(secret.encode(), message.encode(), hashlib.sha256).hexdigest()
+
+
+def settings_version(kind, rules, detection_method=None):
+    """
+    Fingerprint of the settings a verdict was computed with, so tokens
+    issued before a settings change are no longer accepted.
+
+    Args:
+        kind (str): 'email' or 'phone'
+        rules (dict): Validation rules of that kind
+        detection_method (str): Disposable email detection method (email only)
+    """
+    material = dict(rules, kind=kind)
+    if kind == 'email':
+        material['detection_method'] = detection_method or 'library'
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def sign_token(secret, kind, value, version, extra=None):
+    """
+    Create a token for a positive verdict.
+
+    Args:
+        secret (str): Database secret
+        kind (str): 'email' or 'phone'
+        value (str): Normalized value the verdict applies to
+        version (str): Settings version of the verdict
+        extra (dict): Additional verdict data to carry (e.g. phone format)
+
+    Returns:
+        str: Token to be sent back with the signup form
+    """
+    payload = {
+        'k': kind,
+        'v': hashlib.sha256(value.encode()).hexdigest(),
+        'sv': version,
+        'ok': True,
+        'exp': int(time.time()) + VALIDATION_TOKEN_TTL,
+    }
+    if extra:
+        payload['x'] = extra
+    body = base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode()
+    return f"{body}.{token_signature(secret, body)}"
+
+
+def verify_token(secret, token, kind, value, version):
+    """
+    Check a token against the submitted value.
+
+    Returns:
+        tuple: (payload, problem): the payload if the token is authentic,
+               unexpired, positive and bound to this value and settings
+               version, else None with 'signature' or 'malformed' when the
+               token itself is invalid
+    """
+    if not token or '.' not in token:
+        return None, None
+    try:
+        body, signature = token.rsplit('.', 1)
+        if not hmac.compare_digest(signature, token_signature(secret, body)):
+            return None, 'signature'
+        payload = json.loads(base64.urlsafe_b64decode(body.encode()))
+    except Exception:
+        return None, 'malformed'
+
+    if (payload.get('k') != kind
+            or not payload.get('ok')
+            or payload.get('exp', 0) < time.time()
+            or payload.get('v') != hashlib.sha256(value.encode()).hexdigest()
+            or payload.get('sv') != version):
+        return None, None
+    return payload, None
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Signup Asset Bundle Check
+Fails when the signup page's static files leak out of their dedicated
+bundle: into a global bundle of the manifest (web.assets_frontend,
+web.assets_backend, ...), or through direct <link>/<script> tags in a
+template. Also checks that the signup template loads the bundle.
+
+Usage (from the repository root):
+
+    python scripts/check_signup_assets.py [path/to/j_signup_validation]
+
+Exits with status 1 and lists the problems when the check fails.
+"""
+
+import ast
+import os
+import sys
+import xml.etree.ElementTree as ET
+
+MODULE = 'j_signup_validation'
+SIGNUP_BUNDLE = f'{MODULE}.assets_signup'
+SIGNUP_TEMPLATE = 'custom_signup_form'
+STATIC_PREFIX = f'{MODULE}/static/src/'
+
+
+def _bundle_paths(entries):
+    """Asset paths of a bundle's entries, including (directive, path) tuples."""
+    for entry in entries:
+        if isinstance(entry, (list, tuple)):
+            # ('include', bundle), ('remove', path), ('after', target, path), ...
+            directive = entry[0]
+            if directive == 'remove':
+                continue
+            yield directive, entry[-1]
+        else:
+            yield None, entry
+
+
+def check_manifest(module_path):
+    """
+    Returns:
+        tuple: (problems, signup asset paths)
+    """
+    with open(os.path.join(module_path, '__manifest__.py'), encoding='utf-8') as manifest_file:
+        manifest = ast.literal_eval(manifest_file.read())
+
+    assets = manifest.get('assets', {})
+    problems = []
+    if SIGNUP_BUNDLE not in assets:
+        problems.append(f"manifest: bundle {SIGNUP_BUNDLE} is not defined")
+        return problems, set()
+
+    signup_paths = {path for _directive, path in _bundle_paths(assets[SIGNUP_BUNDLE])}
+    for bundle, entries in assets.items():
+        if bundle == SIGNUP_BUNDLE:
+            continue
+        for directive, path in _bundle_paths(entries):
+            if directive == 'include' and path == SIGNUP_BUNDLE:
+                problems.append(f"manifest: {bundle} includes {SIGNUP_BUNDLE}")
+            elif path in signup_paths or (path.startswith(STATIC_PREFIX) and '*' in path):
+                problems.append(f"manifest: {bundle} loads signup asset {path}")
+    return problems, signup_paths
+
+
+def check_templates(module_path, signup_paths):
+    """
+    Returns:
+        list: Problems found in the module's XML files
+    """
+    problems = []
+    signup_urls = {'/' + path for path in signup_paths}
+    template_found = template_loads_bundle = False
+
+    for root_dir, _dirs, files in os.walk(module_path):
+        for name in sorted(files):
+            if not name.endswith('.xml'):
+                continue
+            path = os.path.join(root_dir, name)
+            relative = os.path.relpath(path, module_path)
+            try:
+                tree = ET.parse(path)
+            except ET.ParseError as e:
+                problems.append(f"{relative}: XML parse error: {e}")
+                continue
+
+            for template in tree.iter('template'):
+                is_signup = template.get('id') == SIGNUP_TEMPLATE
+                template_found |= is_signup
+                for node in template.iter():
+                    url = node.get('src') or node.get('href') or ''
+                    if url in signup_urls:
+                        problems.append(f"{relative}: template {template.get('id')} links {url} "
+                                        f"directly instead of loading {SIGNUP_BUNDLE}")
+                    bundle = node.get('t-call-assets')
+                    if bundle == SIGNUP_BUNDLE:
+                        if is_signup:
+                            template_loads_bundle = True
+                        else:
+                            problems.append(f"{relative}: template {template.get('id')} loads {SIGNUP_BUNDLE}")
+
+    if not template_found:
+        problems.append(f"templates: {SIGNUP_TEMPLATE} not found")
+    elif not template_loads_bundle:
+        problems.append(f"templates: {SIGNUP_TEMPLATE} does not load {SIGNUP_BUNDLE}")
+    return problems
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    module_path = argv[0] if argv else os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', MODULE)
+
+    problems, signup_paths = check_manifest(module_path)
+    problems += check_templates(module_path, signup_paths)
+
+    if problems:
+        print('Signup asset check failed:')
+        for problem in problems:
+            print(f'  - {problem}')
+        return 1
+    print(f'Signup asset check passed: {len(signup_paths)} files only in {SIGNUP_BUNDLE}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())